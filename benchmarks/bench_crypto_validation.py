@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cryptocurrency address validation throughput benchmark
+Generates a synthetic address corpus and times CryptoAnalyzer.validate_batch
+
+The unique-address rate is the real validation cost (every address is decoded
+and checksummed). The log-like rate is mostly memo hits on repeated addresses
+and says how fast recurring log data goes through, not how fast validation is.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+from crypto_analyzer import CryptoAnalyzer, base58check_encode, bech32_encode_segwit, eip55_checksum
+
+def random_bytes(rng, n: int) -> bytes:
+    """n random bytes from rng (Random.randbytes needs Python 3.9)"""
+    return rng.getrandbits(8 * n).to_bytes(n, 'big')
+
+def build_corpus(count: int, seed: int = 1337) -> list:
+    """Mixed corpus: P2PKH, P2SH, Bech32, Taproot, Ethereum, plus ~10% typos"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            address = base58check_encode(0x00, random_bytes(rng, 20))
+        elif kind == 1:
+            address = base58check_encode(0x05, random_bytes(rng, 20))
+        elif kind == 2:
+            address = bech32_encode_segwit('bc', 0, random_bytes(rng, 20))
+        elif kind == 3:
+            address = bech32_encode_segwit('bc', 1, random_bytes(rng, 32))
+        else:
+            address = '0x' + random_bytes(rng, 20).hex()
+            if i % 10 == 4:
+                address = eip55_checksum(address)
+        
+        if rng.random() < 0.1:
+            pos = rng.randrange(4, len(address))
+            address = address[:pos] + ('2' if address[pos] != '2' else '3') + address[pos + 1:]
+        corpus.append(address)
+    return corpus
+
+def run(label: str, addresses: list, repeat: int, workers: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        analyzer = CryptoAnalyzer()
+        start = time.perf_counter()
+        analyzer.validate_batch(addresses, workers=workers)
+        best = min(best, time.perf_counter() - start)
+    rate = len(addresses) / best
+    print(f"{label:<28} {len(addresses):>9} addrs  {best:8.3f}s  {rate:>12,.0f} addr/s")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser(description="Address validation throughput benchmark")
+    parser.add_argument('--count', type=int, default=200_000, help="Unique addresses to generate")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per scenario (best is reported)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Validation processes")
+    parser.add_argument('--min-rate', type=float, default=0,
+                        help="Exit non-zero if the unique-address rate per worker is below this")
+    args = parser.parse_args()
+    
+    print("Building corpus...")
+    unique = build_corpus(args.count)
+    # Log-like stream: the same addresses recur many times
+    rng = random.Random(7)
+    log_like = [rng.choice(unique[:args.count // 20 or 1]) for _ in range(args.count * 5)]
+    
+    print(f"Workers: {args.workers}")
+    print(f"\n{'Scenario':<28} {'Size':>15}  {'Time':>8}  {'Throughput':>17}")
+    unique_rate = run("unique (all validated)", unique, args.repeat, args.workers)
+    run("log-like (memo hits)", log_like, args.repeat, args.workers)
+    distinct = len(set(log_like))
+    # The process pool only starts for 10,000+ unseen addresses
+    workers = args.workers if args.workers > 1 and len(unique) >= 10_000 else 1
+    per_worker = unique_rate / workers
+    print(f"\nValidation cost: {per_worker:,.0f} unique addr/s per worker "
+          f"(log-like stream: {distinct:,} distinct of {len(log_like):,}, the rest answered from the memo)")
+    
+    if args.min_rate and per_worker < args.min_rate:
+        print(f"\n❌ Unique-address throughput {per_worker:,.0f}/s per worker below required {args.min_rate:,.0f}/s")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
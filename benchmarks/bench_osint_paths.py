@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the network-bound OSINT paths
+Runs the username probe, domain analysis, IP report and breach batch against local
+HTTP/DNS/WHOIS stand-ins and compares throughput and p50/p99 latency with stored baselines
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'tools'))
+
+# Full concurrency and no byte budget, whatever the phone's battery says
+os.environ.setdefault('OSINT_POWER_PROFILE', 'performance')
+
+from standins import Faults, StandIns
+from breach_checker import BreachChecker
+from email_domain_osint import EmailDomainOSINT
+from ip_network_osint import IPNetworkOSINT
+from rate_limiter import HostRateLimiter
+from username_osint import UsernameOSINT
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines.json')
+SCENARIOS = ('username_probe', 'domain_analysis', 'ip_report', 'breach_batch')
+
+class UnpacedLimiter(HostRateLimiter):
+    """Keeps the limiter's per-request SQLite bookkeeping but never sleeps.
+    
+    Pacing is policy (a few requests per second per host), not code speed;
+    with it every path would only measure the published rate limits.
+    """
+    def __init__(self):
+        super().__init__(':memory:')
+    
+    def acquire(self, host, max_wait=None) -> float:
+        self._update(host, lambda state, now: 0.0)
+        return 0.0
+
+def percentile(ordered, q) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), -int(-q * len(ordered) // 1)))
+    return ordered[rank - 1]
+
+def build_scenarios(standins, batch_size) -> dict:
+    """name -> (make_tool, op(tool), items per op, check(result))"""
+    universe = standins.universe
+    username = sorted(universe.usernames)[0]
+    domain = sorted(universe.domains)[0]
+    ip = universe.ips[0]
+    passwords = [f"bench-password-{i}" for i in range(batch_size - 1)] + ['password']
+    platforms = sum(1 for url in UsernameOSINT().platforms.values() if '{}' in url)
+    
+    def make(tool_class):
+        def factory():
+            tool = tool_class()
+            standins.attach(tool.session, UnpacedLimiter())
+            return tool
+        return factory
+    
+    # Checks read results with .get: under error injection a stage comes back as {'error': ...}
+    # and must count as a failed check, not stop the run
+    return {
+        'username_probe': (make(UsernameOSINT),
+                           lambda tool: tool.check_username_availability(username),
+                           platforms,
+                           lambda result: len(result.get('found_profiles', [])) == platforms),
+        'domain_analysis': (make(EmailDomainOSINT),
+                            lambda tool: tool.analyze_domain(domain),
+                            1,
+                            lambda result: bool(result.get('whois_info', {}).get('registrar'))
+                            and len(result.get('subdomains') or []) == 3),
+        'ip_report': (make(IPNetworkOSINT),
+                      lambda tool: tool.generate_ip_report(ip),
+                      1,
+                      lambda result: result.get('geolocation', {}).get('source') == 'ipapi.co'
+                      and bool(result.get('reverse_dns', {}).get('has_reverse_dns'))
+                      and 'error' not in result.get('whois_info', {'error': None})),
+        'breach_batch': (make(BreachChecker),
+                         lambda tool: tool.check_password_batch(passwords),
+                         batch_size,
+                         lambda result: bool(result) and result[-1].get('is_pwned') is True)
+    }
+
+@contextlib.contextmanager
+def quiet():
+    """Tools print their reports and the IP report asks about port scans: silence one, answer no to the other"""
+    stdin = sys.stdin
+    sys.stdin = io.StringIO('')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        sys.stdin = stdin
+
+def run_scenario(name, scenario, iterations, concurrency, strict) -> dict:
+    make_tool, op, items, check = scenario
+    tools = [make_tool() for _ in range(concurrency)]
+    with quiet():
+        # Warm-up: connection pools, imports, the limiter's table
+        op(tools[0])
+    
+    def worker(index):
+        tool = tools[index]
+        timings = []
+        failures = 0
+        for _ in range(index, iterations, concurrency):
+            start = time.perf_counter()
+            result = op(tool)
+            timings.append(time.perf_counter() - start)
+            if not check(result):
+                failures += 1
+        return timings, failures
+    
+    start = time.perf_counter()
+    with quiet(), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(worker, range(concurrency)))
+    wall = time.perf_counter() - start
+    
+    timings = sorted(t for worker_timings, _ in outcomes for t in worker_timings)
+    failures = sum(f for _, f in outcomes)
+    if strict and failures:
+        raise SystemExit(f"❌ {name}: {failures}/{iterations} results were wrong; the stand-ins or the path are broken")
+    return {
+        'iterations': iterations,
+        'items_per_op': items,
+        'throughput': items * iterations / wall,
+        'p50_ms': percentile(timings, 0.50) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'failed_checks': failures
+    }
+
+def compare(results, baseline, tolerance) -> list:
+    """Regressions against the baseline: slower p50/p99 or lower throughput by more than tolerance"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            regressions.append(f"{name} has no baseline")
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric} {result[metric]:.1f} > baseline {base[metric]:.1f}")
+        if result['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{name} throughput {result['throughput']:.1f}/s < baseline {base['throughput']:.1f}/s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OSINT path benchmark against local stand-in services")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help="Run only this path (repeatable)")
+    parser.add_argument('--iterations', type=int, default=20, help="Timed operations per scenario")
+    parser.add_argument('--concurrency', type=int, default=1, help="Operations running at once")
+    parser.add_argument('--batch-size', type=int, default=50, help="Passwords per breach batch")
+    parser.add_argument('--latency', type=float, default=0, help="Injected latency per exchange, ms")
+    parser.add_argument('--jitter', type=float, default=0, help="Extra random latency up to this, ms")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of exchanges that fail")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.3, help="Allowed regression fraction")
+    args = parser.parse_args()
+    
+    config = {'latency_ms': args.latency, 'jitter_ms': args.jitter, 'error_rate': args.error_rate,
+              'concurrency': args.concurrency, 'batch_size': args.batch_size}
+    faults = Faults(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate)
+    results = {}
+    with StandIns(faults=faults) as standins:
+        scenarios = build_scenarios(standins, args.batch_size)
+        print(f"Stand-ins: HTTP {standins.http_address[1]}  DNS {standins.dns_address[1]}  "
+              f"WHOIS {standins.whois_address[1]}  ({args.latency:g}ms +{args.jitter:g}ms, "
+              f"{args.error_rate:.0%} errors)")
+        print(f"\n{'Scenario':<18} {'Ops':>5} {'p50':>10} {'p99':>10} {'Throughput':>16} {'Failed':>7}")
+        for name in args.scenario or SCENARIOS:
+            result = run_scenario(name, scenarios[name], args.iterations, args.concurrency,
+                                  strict=args.error_rate == 0)
+            results[name] = result
+            print(f"{name:<18} {result['iterations']:>5} {result['p50_ms']:>8.1f}ms {result['p99_ms']:>8.1f}ms "
+                  f"{result['throughput']:>14,.1f}/s {result['failed_checks']:>7}")
+    
+    if args.update_baseline:
+        stored = {'config': config, 'results': results}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                previous = json.load(f)
+            if previous.get('config') == config:
+                # Scenarios not run this time keep their old baseline
+                stored['results'] = dict(previous.get('results', {}), **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return
+    
+    # Without a comparable baseline the gate cannot pass
+    if not os.path.exists(args.baseline):
+        print(f"\n❌ No baseline at {args.baseline}; run with --update-baseline to store one")
+        sys.exit(1)
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print(f"\n❌ Baseline was recorded with {baseline.get('config')}; "
+              f"rerun with that config or --update-baseline")
+        sys.exit(1)
+    regressions = compare(results, baseline.get('results', {}), args.tolerance)
+    if regressions:
+        print(f"\n❌ Regressions beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+    print(f"\n✅ Within {args.tolerance:.0%} of baseline")
+
+if __name__ == "__main__":
+    main()
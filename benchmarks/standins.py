@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the services the OSINT tools talk to
+HTTP (platform pages, ipapi/ip-api JSON, Tor exit list, pwnedpasswords ranges), DNS and WHOIS,
+with configurable latency and error injection
+"""
+import hashlib
+import json
+import os
+import random
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+import dns.reversename
+import dns.rrset
+import requests
+
+LOCALHOST = '127.0.0.1'
+RECORD_TTL = 300
+# Lines per pwnedpasswords range; the real API returns roughly 800-1000
+RANGE_SIZE = 800
+TOR_EXITS = 1200
+SUBDOMAINS = ('www', 'mail', 'api')
+
+class Faults:
+    """Latency and error injection shared by all stand-ins; seeded so runs are repeatable"""
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=1337):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def apply(self) -> bool:
+        """Sleep the injected latency; True when this exchange should fail"""
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            fail = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+class Universe:
+    """What the stand-ins know: existing usernames, domains, IPs and breached passwords"""
+    def __init__(self, usernames=('benchuser',), domains=('bench-example.com',), ips=('203.0.113.7',),
+                 breached=('password', '123456', 'letmein')):
+        self.usernames = set(usernames)
+        self.domains = set(domains)
+        self.ips = list(ips)
+        self.breached = {hashlib.sha1(p.encode()).hexdigest().upper(): 1000 + i for i, p in enumerate(breached)}
+        self.zone = self._build_zone()
+        rng = random.Random(7)
+        exits = {f"185.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" for _ in range(TOR_EXITS)}
+        self.tor_exits = '\n'.join(sorted(exits)) + '\n'
+    
+    def _build_zone(self) -> dict:
+        zone = {}
+        for i, domain in enumerate(sorted(self.domains)):
+            zone[domain] = {
+                'A': [f"198.51.100.{10 + i}"],
+                'AAAA': [f"2001:db8::{10 + i:x}"],
+                'MX': [f"10 mail.{domain}."],
+                'TXT': ['"v=spf1 -all"'],
+                'NS': [f"ns1.{domain}.", f"ns2.{domain}."]
+            }
+            for sub in SUBDOMAINS:
+                zone[f"{sub}.{domain}"] = {'A': [f"198.51.100.{10 + i}"]}
+        for ip in self.ips:
+            name = dns.reversename.from_address(ip).to_text().rstrip('.')
+            host = f"host-{ip.replace('.', '-')}.{sorted(self.domains)[0]}"
+            zone[name] = {'PTR': [f"{host}."]}
+            # Forward-confirmed, as gethostbyaddr through dnspython checks
+            zone[host] = {'A': [ip]}
+        return zone
+    
+    def password_range(self, prefix) -> str:
+        """Deterministic filler suffixes plus the breached hashes that share the prefix"""
+        rng = random.Random(prefix)
+        lines = [f"{rng.getrandbits(140):035X}:{rng.randrange(1, 50)}" for _ in range(RANGE_SIZE)]
+        lines += [f"{h[5:]}:{n}" for h, n in self.breached.items() if h.startswith(prefix)]
+        return '\r\n'.join(sorted(lines))
+
+class StandInHTTPHandler(BaseHTTPRequestHandler):
+    # Keep-alive, as the real services do, so connection reuse is part of what is measured
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; with Nagle each response would wait on a delayed ACK
+    disable_nagle_algorithm = True
+    universe = None
+    faults = None
+    
+    def do_GET(self):
+        if self.faults.apply():
+            self.reply(500, 'injected error')
+            return
+        host = (self.headers.get('Host') or '').split(':')[0].lower()
+        path = urlsplit(self.path).path
+        status, body, headers = self.route(host, path)
+        self.reply(status, body, headers)
+    
+    def route(self, host, path):
+        universe = self.universe
+        if host == 'ipapi.co':
+            ip = path.strip('/').split('/')[0]
+            return 200, json.dumps({'ip': ip, 'city': 'Bench City', 'region': 'Bench Region',
+                                    'country_name': 'Benchland', 'country_code': 'BL', 'postal': '00000',
+                                    'latitude': 1.5, 'longitude': 2.5, 'timezone': 'UTC',
+                                    'org': 'Bench ISP', 'asn': 'AS64500'}), {'Content-Type': 'application/json'}
+        if host == 'ip-api.com':
+            return 200, json.dumps({'status': 'success', 'country': 'Benchland', 'countryCode': 'BL',
+                                    'regionName': 'Bench Region', 'city': 'Bench City', 'zip': '00000',
+                                    'lat': 1.5, 'lon': 2.5, 'timezone': 'UTC', 'isp': 'Bench ISP',
+                                    'as': 'AS64500'}), {'Content-Type': 'application/json'}
+        if host == 'check.torproject.org':
+            return 200, universe.tor_exits, {}
+        if host == 'api.pwnedpasswords.com' and path.startswith('/range/'):
+            return 200, universe.password_range(path[len('/range/'):].upper()), {}
+        if host in universe.domains and path in ('', '/'):
+            return 200, '<html>bench</html>', {
+                'Strict-Transport-Security': 'max-age=63072000',
+                'Content-Security-Policy': "default-src 'self'",
+                'X-Frame-Options': 'DENY',
+                'X-Content-Type-Options': 'nosniff',
+                'Referrer-Policy': 'no-referrer'
+            }
+        url = f"{host}{self.path}".lower()
+        if any(username in url for username in universe.usernames):
+            return 200, '<html><h1>Profile</h1>If you have <strong>Telegram</strong>, you can contact</html>', {}
+        return 404, '<html>page not found</html>', {}
+    
+    def reply(self, status, body, headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass
+
+class StandInDNSHandler(socketserver.BaseRequestHandler):
+    universe = None
+    faults = None
+    
+    def handle(self):
+        data, sock = self.request
+        query = dns.message.from_wire(data)
+        response = dns.message.make_response(query)
+        if self.faults.apply():
+            response.set_rcode(dns.rcode.SERVFAIL)
+        else:
+            question = query.question[0]
+            name = question.name.to_text().rstrip('.').lower()
+            records = self.universe.zone.get(name)
+            rdtype = dns.rdatatype.to_text(question.rdtype)
+            if records is None:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            elif rdtype in records:
+                response.answer.append(dns.rrset.from_text_list(question.name, RECORD_TTL, 'IN', rdtype,
+                                                                records[rdtype]))
+        sock.sendto(response.to_wire(), self.client_address)
+
+class StandInWhoisHandler(socketserver.StreamRequestHandler):
+    universe = None
+    faults = None
+    
+    def handle(self):
+        query = self.rfile.readline().decode('utf-8', 'replace').strip()
+        if self.faults.apply():
+            # A registry that drops the connection
+            return
+        if query.replace('.', '').isdigit():
+            text = (f"NetRange:       {query.rsplit('.', 1)[0]}.0 - {query.rsplit('.', 1)[0]}.255\n"
+                    "OrgName:        Bench Networks\n"
+                    "Country:        BL\n"
+                    "RegDate:        2001-02-03\n"
+                    "Updated:        2024-05-06\n"
+                    "OrgAbuseEmail:  abuse@bench-example.com\n")
+        else:
+            text = (f"Domain Name: {query.upper()}\n"
+                    "Registrar: Bench Registrar, Inc.\n"
+                    "Creation Date: 1999-01-02T03:04:05Z\n"
+                    "Registry Expiry Date: 2031-01-02T03:04:05Z\n"
+                    f"Name Server: NS1.{query.upper()}\n"
+                    f"Name Server: NS2.{query.upper()}\n"
+                    "Registrant Organization: Bench Holdings\n"
+                    "Registrant Country: BL\n")
+        self.wfile.write(text.encode('utf-8'))
+
+class StandInAdapter(requests.adapters.HTTPAdapter):
+    """Sends every request to the stand-in HTTP server, keeping the original host in the Host header"""
+    def __init__(self, address):
+        super().__init__()
+        self.address = address
+    
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request = request.copy()
+        request.headers['Host'] = parts.netloc
+        request.url = urlunsplit(('http', f"{self.address[0]}:{self.address[1]}", parts.path or '/', parts.query, ''))
+        return super().send(request, **kwargs)
+
+class StandIns:
+    """Starts the HTTP, DNS and WHOIS stand-ins and points the process at them.
+    
+    DNS goes through dnspython's default resolver (and, for reverse
+    lookups, socket.gethostbyaddr via override_system_resolver); WHOIS
+    through OSINT_WHOIS_SERVER; HTTP through StandInAdapter, mounted on
+    each tool session with attach().
+    """
+    def __init__(self, universe=None, faults=None):
+        self.universe = universe or Universe()
+        self.faults = faults or Faults()
+        self._servers = []
+        self._saved_env = None
+    
+    def _serve(self, server_class, handler):
+        handler = type(handler.__name__, (handler,), {'universe': self.universe, 'faults': self.faults})
+        server = server_class((LOCALHOST, 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name=f"standin-{handler.__name__}", daemon=True).start()
+        self._servers.append(server)
+        return server.server_address
+    
+    def start(self):
+        self.http_address = self._serve(ThreadingHTTPServer, StandInHTTPHandler)
+        self.dns_address = self._serve(socketserver.ThreadingUDPServer, StandInDNSHandler)
+        self.whois_address = self._serve(socketserver.ThreadingTCPServer, StandInWhoisHandler)
+        
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [self.dns_address[0]]
+        resolver.port = self.dns_address[1]
+        dns.resolver.default_resolver = resolver
+        dns.resolver.override_system_resolver(resolver)
+        self._saved_env = os.environ.get('OSINT_WHOIS_SERVER')
+        os.environ['OSINT_WHOIS_SERVER'] = f"{self.whois_address[0]}:{self.whois_address[1]}"
+        return self
+    
+    def attach(self, session, limiter=None):
+        """Route a requests session to the stand-in HTTP server"""
+        adapter = StandInAdapter(self.http_address)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if limiter is not None:
+            session._limiter = limiter
+        return session
+    
+    def stop(self):
+        dns.resolver.restore_system_resolver()
+        dns.resolver.default_resolver = None
+        if self._saved_env is None:
+            os.environ.pop('OSINT_WHOIS_SERVER', None)
+        else:
+            os.environ['OSINT_WHOIS_SERVER'] = self._saved_env
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+        return False
@@ -6,6 +6,14 @@ Uses all available Termux APIs
 import subprocess
 import json
 from datetime import datetime
+from tools.deadline import Deadline, partial_result
+from tools.checkpoint import ENV_VAR as JOB_ENV_VAR, default_job_id
+from tools.report_store import get_report_store
+from tools.events import TerminalRenderer, run_with_events
+
+# Seconds each tool gets; the child sees the same deadline and saves what it has
+TOOL_BUDGET = 60
+CHILD_GRACE = 5
 
 class FullPermissionOSINT:
     def __init__(self):
@@ -79,16 +87,24 @@ class FullPermissionOSINT:
             'tools/ip_network_osint.py'
         ]
         
+        # Tool progress is rendered from its event stream while it runs
+        terminal = TerminalRenderer()
         for tool in tools:
             print(f"🔧 Running {tool}...")
+            deadline = Deadline(TOOL_BUDGET)
             try:
-                input_data = f"yes\n{target}\n"
-                result = subprocess.run(['python', tool], 
-                                      input=input_data, 
-                                      text=True, 
-                                      capture_output=True, 
-                                      timeout=60)
+                input_data = f"{target}\n"
+                result = run_with_events(['python', tool], 
+                                         input_data=input_data, 
+                                         timeout=deadline.remaining(),
+                                         # A rerun for the same target resumes what this run leaves unfinished
+                                         env=dict(deadline.env(grace=CHILD_GRACE),
+                                                  **{JOB_ENV_VAR: default_job_id(tool, target)}),
+                                         on_event=terminal)
                 print(f"✅ {tool} completed")
+            except subprocess.TimeoutExpired as e:
+                report_id = get_report_store().save_report(tool, target, partial_result(tool, e))
+                print(f"⏱️  {tool} hit the deadline; partial output saved as #{report_id}")
             except Exception as e:
                 print(f"❌ {tool} failed: {e}")
         
@@ -7,6 +7,16 @@ import json
 import subprocess
 import os
 from datetime import datetime
+from termux_feedback import get_feedback_queue
+from tools.scope_manifest import authorize
+from tools.report_store import get_report_store
+from tools.deadline import Deadline, partial_result
+from tools.checkpoint import ENV_VAR as JOB_ENV_VAR, default_job_id
+from tools.events import TerminalRenderer, get_event_bus, run_with_events
+
+# Seconds each launched tool gets; the child sees the same deadline and saves what it has
+TOOL_BUDGET = 60
+CHILD_GRACE = 5
 
 class OptimizedTermuxOSINT:
     def __init__(self):
@@ -18,19 +28,15 @@ class OptimizedTermuxOSINT:
             'brightness': 'termux-brightness'
         }
         self.session_id = f"osint_{int(datetime.now().timestamp())}"
+        self.feedback = get_feedback_queue(self.available_apis)
+        # Progress from launched tools arrives as events and is shown as it happens
+        self.events = get_event_bus()
+        self.events.subscribe(TerminalRenderer(prefix=True))
     
-    def notify(self, title, message):
+    def notify(self, title, message, summary=None):
         """Send notification (your available API)"""
-        try:
-            subprocess.run([
-                'termux-notification',
-                '--title', title,
-                '--content', message,
-                '--priority', 'high'
-            ])
-            print(f"📱 {title}: {message}")
-        except Exception as e:
-            print(f"📱 {title}: {message}")
+        self.feedback.notify(title, message, priority='high', summary=summary)
+        print(f"📱 {title}: {message}")
     
     def get_sms_data(self):
         """Get SMS data for OSINT analysis"""
@@ -56,7 +62,7 @@ class OptimizedTermuxOSINT:
         except:
             pass
     
-    def enhanced_consent_check(self, tool_name, target):
+    def enhanced_consent_check(self, tool_name, target, kind=None):
         """Enhanced consent with available APIs"""
         # Dim screen for privacy
         self.set_brightness(50)
@@ -72,9 +78,7 @@ class OptimizedTermuxOSINT:
         print(f"Available APIs: {list(self.available_apis.keys())}")
         print(f"{'='*50}")
         
-        consent = input("Do you have explicit permission? (yes/no): ")
-        
-        if consent.lower() == 'yes':
+        if authorize(tool_name, target, "Do you have explicit permission? (yes/no): ", kind=kind):
             self.notify("OSINT Authorized", f"Starting {tool_name}")
             # Restore brightness
             self.set_brightness(150)
@@ -85,41 +89,41 @@ class OptimizedTermuxOSINT:
             self.set_brightness(150)
             return False
     
-    def launch_tool_with_notifications(self, tool_name, script_path, target):
+    def launch_tool_with_notifications(self, tool_name, script_path, target, deadline=None):
         """Launch tool with notification updates"""
         self.notify("OSINT Started", f"Running {tool_name}")
+        deadline = deadline or Deadline(TOOL_BUDGET)
         
         try:
-            # Create input for automated consent
-            input_data = f"yes\n{target}\n"
+            # The tool checks the target against the scope manifest itself
+            input_data = f"{target}\n"
             
-            process = subprocess.Popen([
+            result = run_with_events([
                 'python', script_path
-            ], stdin=subprocess.PIPE, 
-               stdout=subprocess.PIPE, 
-               stderr=subprocess.PIPE, 
-               text=True)
-            
-            stdout, stderr = process.communicate(input=input_data, timeout=60)
+            ], input_data=input_data, timeout=max(0.1, deadline.remaining()),
+               # A rerun for the same target resumes whatever this run leaves unfinished
+               env=dict(deadline.env(grace=CHILD_GRACE), **{JOB_ENV_VAR: default_job_id(tool_name, target)}),
+               on_event=lambda event: self.events.forward(event, source=tool_name))
             
             # Success notification
-            self.notify("OSINT Complete", f"{tool_name} finished")
+            self.notify("OSINT Complete", f"{tool_name} finished", summary="{count} tools finished")
             
             # Save results
-            result_file = f"results_{tool_name.lower().replace(' ', '_')}_{int(datetime.now().timestamp())}.txt"
-            with open(result_file, 'w') as f:
-                f.write(f"=== {tool_name} Results ===\n")
-                f.write(f"Target: {target}\n")
-                f.write(f"Timestamp: {datetime.now()}\n\n")
-                f.write(stdout)
-                if stderr:
-                    f.write(f"\nErrors:\n{stderr}")
+            report_id = get_report_store().save_report(tool_name, target, {
+                'script': script_path,
+                'returncode': result.returncode,
+                'events': result.events,
+                'stdout': result.stdout,
+                'stderr': result.stderr
+            })
             
-            return result_file
+            return f"report #{report_id}"
             
-        except subprocess.TimeoutExpired:
-            self.notify("OSINT Timeout", f"{tool_name} timed out")
-            return None
+        except subprocess.TimeoutExpired as e:
+            # Keep the partial output instead of throwing it away
+            report_id = get_report_store().save_report(tool_name, target, partial_result(script_path, e))
+            self.notify("OSINT Timeout", f"{tool_name} timed out (partial output saved)")
+            return f"report #{report_id} (incomplete)"
         except Exception as e:
             self.notify("OSINT Error", f"{tool_name} failed: {str(e)}")
             return None
@@ -178,7 +182,7 @@ def main():
                 print(f"   📄 {result}")
     
     elif choice == 'S':
-        if osint.enhanced_consent_check("SMS Analysis", "device SMS data"):
+        if osint.enhanced_consent_check("SMS Analysis", "device SMS data", kind='device'):
             sms_data = osint.get_sms_data()
             if sms_data:
                 print(f"📱 Found {len(sms_data)} SMS messages")
@@ -6,6 +6,7 @@ Educational and authorized use only
 import sys
 import os
 from datetime import datetime
+from tools.combined_report import generate_combined_report as build_combined_report
 
 def display_menu():
     print(f"\n{'='*60}")
@@ -46,8 +47,27 @@ def run_tool(choice):
 
 def generate_combined_report():
     print("Combined Report Generator")
-    print("This would aggregate results from multiple tools")
-    # Implementation for combined reporting
+    
+    target = input("Target (leave blank to use a session id): ").strip()
+    session_id = None
+    if not target:
+        session_id = input("Session id: ").strip()
+        if not session_id:
+            print("A target or session id is required")
+            return
+    
+    fmt = input("Format - (j)son, (h)tml or (m)arkdown [j]: ").strip().lower()[:1]
+    fmt = {'h': 'html', 'm': 'markdown'}.get(fmt, 'json')
+    
+    stats = build_combined_report(target=target or None, session_id=session_id, fmt=fmt)
+    if not stats['reports']:
+        print("No stored reports found for that target/session")
+        os.remove(stats['output'])
+        return
+    
+    print(f"✅ Merged {stats['reports']} reports ({stats['sections']} sections)")
+    print(f"   Duplicate sub-results folded: {stats['duplicates']}")
+    print(f"📄 Saved to {stats['output']}")
 
 def main():
     print("🔍 OSINT Master Control Panel")
@@ -5,14 +5,21 @@ Quick OSINT Launcher - Optimized for your Termux setup
 import subprocess
 import threading
 import time
-from datetime import datetime
+from termux_feedback import get_feedback_queue
+from tools.report_store import get_report_store
+from tools.deadline import Deadline, partial_result
+from tools.checkpoint import ENV_VAR as JOB_ENV_VAR, default_job_id
+from tools.governor import BUDGET_ENV_VAR, get_governor
+from tools.events import TerminalRenderer, get_event_bus, run_with_events
 
-def notify(title, message):
+# Seconds for the whole run; every tool shares this one budget
+RUN_BUDGET = 120
+# Children are told to finish this much earlier so their reports reach the store
+CHILD_GRACE = 5
+
+def notify(title, message, summary=None):
     """Send notification"""
-    try:
-        subprocess.run(['termux-notification', '--title', title, '--content', message])
-    except:
-        pass
+    get_feedback_queue().notify(title, message, summary=summary)
     print(f"📱 {title}: {message}")
 
 def launch_all_tools(target):
@@ -25,33 +32,62 @@ def launch_all_tools(target):
     ]
     
     notify("OSINT Suite", f"Starting analysis of {target}")
+    session_id = f"quick_{int(time.time())}"
+    deadline = Deadline(RUN_BUDGET)
+    env = dict(deadline.env(grace=CHILD_GRACE), OSINT_SESSION_ID=session_id)
+    governor = get_governor()
+    print(f"⚙️  Power profile: {governor.profile()}")
+    # Each tool gets an equal share of the profile's byte budget
+    budget = governor.byte_budget()
+    if budget is not None:
+        env[BUDGET_ENV_VAR] = str(budget // len(tools))
+    slots = threading.Condition()
+    running = []
+    # Child tools stream events over a pipe; they are shown as they arrive, tagged by tool
+    bus = get_event_bus()
+    terminal = bus.subscribe(TerminalRenderer(prefix=True, show_stages=False))
     
     def run_tool(script):
+        tool_name = script.split('/')[-1].replace('.py', '')
         try:
-            input_data = f"yes\n{target}\n"
-            result = subprocess.run([
+            input_data = f"{target}\n"
+            result = run_with_events([
                 'python', script
-            ], input=input_data, text=True, capture_output=True, timeout=120)
-            
-            tool_name = script.split('/')[-1].replace('.py', '')
+            ], input_data=input_data, timeout=max(0.1, deadline.remaining()),
+               # A rerun for the same target resumes whatever this run leaves unfinished
+               env=dict(env, **{JOB_ENV_VAR: default_job_id(tool_name, target)}),
+               on_event=lambda event: bus.forward(event, source=tool_name))
             
-            # Save individual results
-            with open(f"quick_result_{tool_name}_{int(time.time())}.txt", 'w') as f:
-                f.write(f"Tool: {script}\n")
-                f.write(f"Target: {target}\n")
-                f.write(f"Time: {datetime.now()}\n\n")
-                f.write(result.stdout)
-                if result.stderr:
-                    f.write(f"\nErrors:\n{result.stderr}")
+            # Save individual results; events are the machine-readable record of the run
+            get_report_store().save_report(tool_name, target, {
+                'script': script,
+                'returncode': result.returncode,
+                'events': result.events,
+                'stdout': result.stdout,
+                'stderr': result.stderr
+            }, session_id=session_id)
             
-            notify("Tool Complete", f"{tool_name} finished")
+            notify("Tool Complete", f"{tool_name} finished", summary="{count} tools finished")
             
+        except subprocess.TimeoutExpired as e:
+            # Keep whatever the tool printed before it was stopped
+            get_report_store().save_report(tool_name, target, partial_result(script, e), session_id=session_id)
+            notify("Tool Timeout", f"{tool_name} stopped at the deadline (partial output saved)")
         except Exception as e:
             notify("Tool Error", f"{script} failed: {e}")
+        finally:
+            with slots:
+                running.remove(script)
+                slots.notify_all()
     
-    # Launch all tools in parallel
+    # Launch tools in parallel, as many at once as the power profile allows;
+    # the limit is re-read while waiting, so plugging in the charger speeds things up
     threads = []
     for tool in tools:
+        with slots:
+            while len(running) >= governor.workers():
+                slots.wait(5)
+            running.append(tool)
         thread = threading.Thread(target=run_tool, args=(tool,))
         thread.start()
         threads.append(thread)
@@ -60,9 +96,10 @@ def launch_all_tools(target):
     # Wait for completion
     for thread in threads:
         thread.join()
+    bus.unsubscribe(terminal)
     
     notify("OSINT Complete", "All tools finished!")
-    print("✅ All tools completed! Check quick_result_* files")
+    print(f"✅ All tools completed! See: python tools/report_store.py list --session {session_id}")
 
 def main():
     print("🚀 Quick OSINT Launcher")
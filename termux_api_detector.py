@@ -6,11 +6,61 @@ Detects available Termux APIs and integrates them into OSINT toolkit
 import subprocess
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from datetime import datetime
+from termux_device_context import DeviceContext, DEVICE_PROBES
+
+# Resolved relative to the package, not the current working directory
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'termux_api_config.json')
+MANIFEST_VERSION = 2
+# Overall deadline for the in-memory probe a tool runs when the manifest is stale
+PROBE_DEADLINE = 5
+
+API_COMMANDS = {
+    'battery': 'termux-battery-status',
+    'clipboard_get': 'termux-clipboard-get',
+    'clipboard_set': 'termux-clipboard-set',
+    'notification': 'termux-notification',
+    'vibrate': 'termux-vibrate',
+    'toast': 'termux-toast',
+    'tts': 'termux-tts-speak',
+    'camera_info': 'termux-camera-info',
+    'camera_photo': 'termux-camera-photo',
+    'location': 'termux-location',
+    'sensor': 'termux-sensor',
+    'wifi': 'termux-wifi-connectioninfo',
+    'wifi_scan': 'termux-wifi-scaninfo',
+    'telephony': 'termux-telephony-deviceinfo',
+    'contact_list': 'termux-contact-list',
+    'sms_list': 'termux-sms-list',
+    'call_log': 'termux-call-log',
+    'storage_get': 'termux-storage-get',
+    'dialog': 'termux-dialog',
+    'fingerprint': 'termux-fingerprint',
+    'microphone': 'termux-microphone-record',
+    'torch': 'termux-torch',
+    'volume': 'termux-volume',
+    'brightness': 'termux-brightness'
+}
+
+def get_termux_api_version():
+    """Installed termux-api package version, or None when not on Termux"""
+    try:
+        result = subprocess.run(['dpkg-query', '-W', '-f=${Version}', 'termux-api'],
+                                capture_output=True, text=True, timeout=5)
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return None
 
 class TermuxAPIDetector:
-    def __init__(self):
+    def __init__(self, deadline=15, max_workers=8, verbose=True):
         self.available_apis = {}
+        self.deadline = deadline
+        self.max_workers = max_workers
+        self.verbose = verbose
         self.detect_all_apis()
     
     def test_api_command(self, command, test_args=None):
@@ -31,44 +81,37 @@ class TermuxAPIDetector:
             return False
     
     def detect_all_apis(self):
-        """Detect all available Termux APIs"""
-        api_commands = {
-            'battery': 'termux-battery-status',
-            'clipboard_get': 'termux-clipboard-get',
-            'clipboard_set': 'termux-clipboard-set',
-            'notification': 'termux-notification',
-            'vibrate': 'termux-vibrate',
-            'toast': 'termux-toast',
-            'tts': 'termux-tts-speak',
-            'camera_info': 'termux-camera-info',
-            'camera_photo': 'termux-camera-photo',
-            'location': 'termux-location',
-            'sensor': 'termux-sensor',
-            'wifi': 'termux-wifi-connectioninfo',
-            'wifi_scan': 'termux-wifi-scaninfo',
-            'telephony': 'termux-telephony-deviceinfo',
-            'contact_list': 'termux-contact-list',
-            'sms_list': 'termux-sms-list',
-            'call_log': 'termux-call-log',
-            'storage_get': 'termux-storage-get',
-            'dialog': 'termux-dialog',
-            'fingerprint': 'termux-fingerprint',
-            'microphone': 'termux-microphone-record',
-            'torch': 'termux-torch',
-            'volume': 'termux-volume',
-            'brightness': 'termux-brightness'
-        }
+        """Detect all available Termux APIs concurrently within an overall deadline"""
+        if self.verbose:
+            print("🔍 Detecting available Termux APIs...")
         
-        print("🔍 Detecting available Termux APIs...")
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {executor.submit(self.test_api_command, command): api_name
+                   for api_name, command in API_COMMANDS.items()}
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                results[futures[future]] = future.result()
+        except FuturesTimeout:
+            # Whatever has not answered by the deadline counts as unavailable
+            pass
+        finally:
+            # shutdown(cancel_futures=True) needs Python 3.9
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
         
-        for api_name, command in api_commands.items():
-            if self.test_api_command(command):
+        for api_name, command in API_COMMANDS.items():
+            if results.get(api_name):
                 self.available_apis[api_name] = command
-                print(f"✅ {api_name}: {command}")
-            else:
-                print(f"❌ {api_name}: Not available")
+                if self.verbose:
+                    print(f"✅ {api_name}: {command}")
+            elif self.verbose:
+                timed_out = '' if api_name in results else ' (timed out)'
+                print(f"❌ {api_name}: Not available{timed_out}")
         
-        print(f"\n📊 Total APIs available: {len(self.available_apis)}")
+        if self.verbose:
+            print(f"\n📊 Total APIs available: {len(self.available_apis)}")
         return self.available_apis
     
     def get_device_info(self):
@@ -78,58 +121,95 @@ class TermuxAPIDetector:
             'available_apis': list(self.available_apis.keys())
         }
         
-        # Battery info
-        if 'battery' in self.available_apis:
-            try:
-                result = subprocess.run(['termux-battery-status'], 
-                                      capture_output=True, text=True)
-                device_info['battery'] = json.loads(result.stdout)
-            except:
-                device_info['battery'] = 'Error getting battery info'
-        
-        # WiFi info
-        if 'wifi' in self.available_apis:
-            try:
-                result = subprocess.run(['termux-wifi-connectioninfo'], 
-                                      capture_output=True, text=True)
-                device_info['wifi'] = json.loads(result.stdout)
-            except:
-                device_info['wifi'] = 'Error getting WiFi info'
+        probes = dict(DEVICE_PROBES)
+        probes['telephony'] = (['termux-telephony-deviceinfo'], 5)
+        context = DeviceContext(self.available_apis, probes=probes)
+        snapshot = context.snapshot(wait_for=tuple(context.probes), timeout=self.deadline)
         
-        # Telephony info
-        if 'telephony' in self.available_apis:
-            try:
-                result = subprocess.run(['termux-telephony-deviceinfo'], 
-                                      capture_output=True, text=True)
-                device_info['telephony'] = json.loads(result.stdout)
-            except:
-                device_info['telephony'] = 'Error getting telephony info'
-        
-        # Location (if permission granted)
-        if 'location' in self.available_apis:
-            try:
-                result = subprocess.run(['termux-location', '-p', 'network'], 
-                                      capture_output=True, text=True, timeout=10)
-                device_info['location'] = json.loads(result.stdout)
-            except:
-                device_info['location'] = 'Location not available or permission denied'
+        errors = {
+            'battery': 'Error getting battery info',
+            'wifi': 'Error getting WiFi info',
+            'telephony': 'Error getting telephony info',
+            'location': 'Location not available or permission denied'
+        }
+        for name in context.probes:
+            device_info[name] = snapshot.get(name) if snapshot.get(name) is not None else errors[name]
         
         return device_info
     
     def save_api_config(self):
         """Save API configuration for other tools"""
         config = {
+            'manifest_version': MANIFEST_VERSION,
+            'termux_api_version': get_termux_api_version(),
             'detected_at': datetime.now().isoformat(),
             'available_apis': self.available_apis,
             'device_info': self.get_device_info()
         }
         
-        with open('config/termux_api_config.json', 'w') as f:
-            json.dump(config, f, indent=2)
+        write_manifest(config)
         
-        print(f"💾 API configuration saved to config/termux_api_config.json")
+        if self.verbose:
+            print(f"💾 API configuration saved to {CONFIG_PATH}")
         return config
 
+def write_manifest(config):
+    """Atomically replace the manifest; concurrent writers each use their own temporary file"""
+    os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
+    tmp_path = f"{CONFIG_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(config, f, indent=2)
+        os.replace(tmp_path, CONFIG_PATH)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+_capabilities = None
+_capabilities_lock = threading.Lock()
+
+def load_capabilities(refresh=False):
+    """Load the capability manifest once per process.
+    
+    When it is missing, from an older manifest version, or was detected
+    against a different termux-api package than the one installed now, a
+    Termux device gets a quick probe (no device info) whose result replaces
+    the manifest, so later processes load it without probing. Elsewhere
+    the file is used as it is and never written.
+    """
+    global _capabilities
+    with _capabilities_lock:
+        if _capabilities is not None and not refresh:
+            return _capabilities
+        
+        try:
+            with open(CONFIG_PATH, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        
+        installed = get_termux_api_version()
+        stale = refresh or (
+            manifest is None
+            or manifest.get('manifest_version') != MANIFEST_VERSION
+            or manifest.get('termux_api_version') != installed
+        )
+        if stale and installed is not None:
+            detector = TermuxAPIDetector(deadline=PROBE_DEADLINE, verbose=False)
+            manifest = {
+                'manifest_version': MANIFEST_VERSION,
+                'termux_api_version': installed,
+                'detected_at': datetime.now().isoformat(),
+                'available_apis': detector.available_apis
+            }
+            try:
+                write_manifest(manifest)
+            except OSError as e:
+                print(f"⚠️  Could not cache the Termux API manifest: {e}")
+        
+        _capabilities = manifest or {'available_apis': {}}
+        return _capabilities
+
 def main():
     print("🔍 Termux API Detection and Integration")
     print("=" * 50)
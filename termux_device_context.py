@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Termux Device Context Service
+Collects termux-* device probes concurrently and shares one cached snapshot
+"""
+import json
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+# api name -> (command, timeout seconds)
+DEVICE_PROBES = {
+    'battery': (['termux-battery-status'], 5),
+    'wifi': (['termux-wifi-connectioninfo'], 5),
+    'location': (['termux-location', '-p', 'network', '-r', 'once'], 10)
+}
+
+class DeviceContext:
+    def __init__(self, available_apis, ttl=60, probes=None):
+        self.available_apis = available_apis or {}
+        self.ttl = ttl
+        self.probes = {
+            name: probe for name, probe in (probes or DEVICE_PROBES).items()
+            if name in self.available_apis
+        }
+        self._lock = threading.Lock()
+        # name -> (value, collected_at monotonic)
+        self._values = {}
+        # name -> threading.Event set when the in-flight probe finishes
+        self._in_flight = {}
+    
+    def _run_probe(self, name, event):
+        command, timeout = self.probes[name]
+        value = None
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+            value = json.loads(result.stdout)
+        except Exception:
+            pass
+        
+        with self._lock:
+            self._values[name] = (value, time.monotonic())
+            self._in_flight.pop(name, None)
+        event.set()
+    
+    def refresh(self, names=None, force=False):
+        """Start background collection of stale probes; returns {name: Event}"""
+        now = time.monotonic()
+        events = {}
+        with self._lock:
+            for name in (names or self.probes):
+                if name not in self.probes:
+                    continue
+                if name in self._in_flight:
+                    events[name] = self._in_flight[name]
+                    continue
+                cached = self._values.get(name)
+                if not force and cached and now - cached[1] < self.ttl:
+                    continue
+                
+                event = threading.Event()
+                self._in_flight[name] = event
+                events[name] = event
+                # Daemon threads: a slow location fix never delays interpreter exit
+                threading.Thread(target=self._run_probe, args=(name, event), daemon=True).start()
+        return events
+    
+    def snapshot(self, wait_for=(), timeout=None) -> dict:
+        """Return the current snapshot, waiting only for the named probes.
+        
+        Stale probes are refreshed concurrently in the background; probes not
+        listed in wait_for report their last known value (or None).
+        """
+        events = self.refresh()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in wait_for:
+            event = events.get(name)
+            if event is not None:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                event.wait(remaining)
+        
+        with self._lock:
+            snapshot = {name: self._values.get(name, (None, None))[0] for name in self.probes}
+        snapshot['collected_at'] = datetime.now().isoformat()
+        return snapshot
+    
+    def get(self, name, timeout=None):
+        """Return one probe value, waiting for it if it is being collected"""
+        return self.snapshot(wait_for=(name,), timeout=timeout).get(name)
+
+_shared_contexts = {}
+_shared_lock = threading.Lock()
+
+def get_device_context(available_apis, ttl=60) -> DeviceContext:
+    """Process-wide DeviceContext so every consumer reads the same snapshot"""
+    key = tuple(sorted(available_apis or {}))
+    with _shared_lock:
+        if key not in _shared_contexts:
+            _shared_contexts[key] = DeviceContext(available_apis, ttl=ttl)
+        return _shared_contexts[key]
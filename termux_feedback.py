@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Termux Feedback Queue
+Non-blocking, coalescing notifications/vibration/toast/TTS for OSINT tools
+"""
+import atexit
+import queue
+import subprocess
+import threading
+import time
+
+FEEDBACK_COMMANDS = {
+    'notification': 'termux-notification',
+    'vibrate': 'termux-vibrate',
+    'toast': 'termux-toast',
+    'tts': 'termux-tts-speak'
+}
+
+class FeedbackQueue:
+    def __init__(self, available_apis=None, coalesce_window=0.5, notification_id='chasm-osint'):
+        # None means "try everything"; missing binaries are disabled on first failure
+        self.enabled = set(FEEDBACK_COMMANDS) if available_apis is None else \
+            {api for api in FEEDBACK_COMMANDS if api in available_apis}
+        self.coalesce_window = coalesce_window
+        self.notification_id = notification_id
+        self.queue = queue.Queue()
+        self.commands_run = 0
+        self.worker = threading.Thread(target=self._run, name='termux-feedback', daemon=True)
+        self.worker.start()
+    
+    def notify(self, title, message, priority='normal', summary=None):
+        """Queue a notification; summary (e.g. "{count} tools finished") is used when a burst is coalesced"""
+        if 'notification' in self.enabled:
+            self.queue.put(('notification', {'title': title, 'message': message,
+                                             'priority': priority, 'summary': summary}))
+    
+    def vibrate(self, duration=500):
+        if 'vibrate' in self.enabled:
+            self.queue.put(('vibrate', duration))
+    
+    def toast(self, message):
+        if 'toast' in self.enabled:
+            self.queue.put(('toast', message))
+    
+    def speak(self, text):
+        if 'tts' in self.enabled:
+            self.queue.put(('tts', text))
+    
+    def flush(self, timeout=5):
+        """Block until everything queued so far has been delivered (or timeout)"""
+        done = threading.Event()
+        self.queue.put(('flush', done))
+        return done.wait(timeout)
+    
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            # Collect the rest of the burst before touching any termux-* binary
+            deadline = time.monotonic() + self.coalesce_window
+            while batch[-1][0] != 'flush':
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._deliver(batch)
+    
+    def _deliver(self, batch):
+        notifications = [payload for kind, payload in batch if kind == 'notification']
+        vibrations = [payload for kind, payload in batch if kind == 'vibrate']
+        toasts = [payload for kind, payload in batch if kind == 'toast']
+        speech = [payload for kind, payload in batch if kind == 'tts']
+        flushes = [payload for kind, payload in batch if kind == 'flush']
+        
+        if notifications:
+            self._execute('notification', self._notification_command(notifications))
+        if vibrations:
+            self._execute('vibrate', ['termux-vibrate', '-d', str(max(vibrations))])
+        if toasts:
+            message = toasts[-1] if len(toasts) == 1 else f"{toasts[-1]} (+{len(toasts) - 1} more)"
+            self._execute('toast', ['termux-toast', message])
+        if speech:
+            self._execute('tts', ['termux-tts-speak', '. '.join(speech)])
+        
+        for done in flushes:
+            done.set()
+    
+    def _notification_command(self, notifications):
+        latest = notifications[-1]
+        title = latest['title']
+        content = latest['message']
+        if len(notifications) > 1:
+            # Group the burst by title, keeping first-seen order
+            groups = {}
+            for n in notifications:
+                groups.setdefault(n['title'], []).append(n)
+            parts = []
+            for group in groups.values():
+                summary = group[-1]['summary']
+                messages = [n['message'] for n in group]
+                if summary and len(group) > 1:
+                    parts.append(f"{summary.format(count=len(group))} ({', '.join(messages)})")
+                else:
+                    parts.append(' | '.join(messages))
+            content = ' · '.join(parts)
+        
+        # One notification ID, updated in place instead of stacking new ones
+        command = ['termux-notification', '--id', self.notification_id,
+                   '--title', title, '--content', content[:500]]
+        if any(n['priority'] == 'high' for n in notifications):
+            command.extend(['--priority', 'high'])
+        return command
+    
+    def _execute(self, api, command):
+        if api not in self.enabled:
+            return
+        try:
+            subprocess.run(command, capture_output=True, timeout=10)
+            self.commands_run += 1
+        except FileNotFoundError:
+            self.enabled.discard(api)
+        except Exception:
+            pass
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+def get_feedback_queue(available_apis=None) -> FeedbackQueue:
+    """Process-wide feedback queue; drained (briefly) at interpreter exit"""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = FeedbackQueue(available_apis)
+            atexit.register(_shared_queue.flush, 2)
+        return _shared_queue
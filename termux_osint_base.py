@@ -5,59 +5,50 @@ Provides Termux API integration for all OSINT tools
 """
 import json
 import subprocess
-import os
 from datetime import datetime
+from termux_device_context import get_device_context
+from termux_feedback import get_feedback_queue
+from termux_api_detector import load_capabilities
+from tools.audit_logger import get_audit_logger
+from tools.scope_manifest import authorize
+from tools.report_store import get_report_store
+from tools.deadline import wait_budget
+from tools.governor import get_governor
 
 class TermuxOSINTBase:
     def __init__(self):
         self.termux_apis = self.load_termux_config()
         self.session_id = f"osint_{int(datetime.now().timestamp())}"
+        self.device_context = get_device_context(self.termux_apis)
+        self.feedback = get_feedback_queue(self.termux_apis)
+        # Battery and Wi-Fi readings pick this process's concurrency and byte budget
+        get_governor().use_device_context(self.device_context)
     
     def load_termux_config(self):
         """Load Termux API configuration"""
         try:
-            with open('config/termux_api_config.json', 'r') as f:
-                config = json.load(f)
-                return config.get('available_apis', {})
+            # Cached, versioned manifest; read once per process
+            return load_capabilities().get('available_apis', {})
         except:
             return {}
     
-    def notify(self, title, message, priority='normal'):
+    def notify(self, title, message, priority='normal', summary=None):
         """Send Android notification"""
-        if 'notification' in self.termux_apis:
-            try:
-                cmd = ['termux-notification', '--title', title, '--content', message]
-                if priority == 'high':
-                    cmd.extend(['--priority', 'high'])
-                subprocess.run(cmd)
-            except:
-                pass
+        self.feedback.notify(title, message, priority, summary)
         print(f"📱 {title}: {message}")
     
     def vibrate(self, duration=500):
         """Vibrate device"""
-        if 'vibrate' in self.termux_apis:
-            try:
-                subprocess.run(['termux-vibrate', '-d', str(duration)])
-            except:
-                pass
+        self.feedback.vibrate(duration)
     
     def toast(self, message):
         """Show toast message"""
-        if 'toast' in self.termux_apis:
-            try:
-                subprocess.run(['termux-toast', message])
-            except:
-                pass
+        self.feedback.toast(message)
         print(f"🍞 {message}")
     
     def speak(self, text):
         """Text-to-speech"""
-        if 'tts' in self.termux_apis:
-            try:
-                subprocess.run(['termux-tts-speak', text])
-            except:
-                pass
+        self.feedback.speak(text)
     
     def get_clipboard(self):
         """Get clipboard content"""
@@ -81,25 +72,11 @@ class TermuxOSINTBase:
     
     def get_location(self):
         """Get device location"""
-        if 'location' in self.termux_apis:
-            try:
-                result = subprocess.run(['termux-location', '-p', 'network'], 
-                                      capture_output=True, text=True, timeout=10)
-                return json.loads(result.stdout)
-            except:
-                pass
-        return None
+        return self.device_context.get('location')
     
     def get_wifi_info(self):
         """Get WiFi information"""
-        if 'wifi' in self.termux_apis:
-            try:
-                result = subprocess.run(['termux-wifi-connectioninfo'], 
-                                      capture_output=True, text=True)
-                return json.loads(result.stdout)
-            except:
-                pass
-        return None
+        return self.device_context.get('wifi')
     
     def scan_wifi(self):
         """Scan for WiFi networks"""
@@ -114,34 +91,18 @@ class TermuxOSINTBase:
     
     def get_battery_info(self):
         """Get battery information"""
-        if 'battery' in self.termux_apis:
-            try:
-                result = subprocess.run(['termux-battery-status'], 
-                                      capture_output=True, text=True)
-                return json.loads(result.stdout)
-            except:
-                pass
-        return None
+        return self.device_context.get('battery')
     
     def log_osint_activity(self, tool_name, target, action):
         """Log OSINT activity with device context"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'session_id': self.session_id,
-            'tool': tool_name,
-            'target': self.anonymize_target(target),
-            'action': action,
-            'device_context': {
-                'battery': self.get_battery_info(),
-                'wifi': self.get_wifi_info(),
-                'location': self.get_location()
-            }
-        }
-        
-        # Save to log file
-        os.makedirs('logs', exist_ok=True)
-        with open('logs/termux_osint_activity.log', 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Hash-chained, rotated audit trail shared with every tool
+        get_audit_logger().log(
+            tool_name, action,
+            target=self.anonymize_target(target),
+            session_id=self.session_id,
+            # Whatever the shared snapshot holds right now; never waits on a probe
+            device_context=self.device_context.snapshot()
+        )
     
     def anonymize_target(self, target):
         """Anonymize target for logging"""
@@ -153,6 +114,8 @@ class TermuxOSINTBase:
     
     def enhanced_consent_check(self, tool_name, target):
         """Enhanced consent check with Termux integration"""
+        # Start all probes now so they are collected while the user reads the prompt
+        self.device_context.refresh()
         self.notify("OSINT Tool", f"Authorization required for {tool_name}")
         self.vibrate(300)
         
@@ -161,20 +124,18 @@ class TermuxOSINTBase:
         print(f"{'='*50}")
         print(f"Tool: {tool_name}")
         print(f"Target: {target}")
-        print(f"Device: {self.get_battery_info()}")
+        print(f"Device: {self.device_context.get('battery', timeout=wait_budget(2))}")
         print(f"{'='*50}")
         
-        consent = input("Do you have explicit permission to analyze this target? (yes/no): ")
-        
-        if consent.lower() == 'yes':
+        # Scope manifest when one is configured, otherwise the interactive prompt;
+        # the decision itself is written to the audit log by authorize()
+        if authorize(tool_name, target, "Do you have explicit permission to analyze this target? (yes/no): "):
             self.notify("OSINT Authorized", f"Starting {tool_name}")
             self.vibrate(100)
-            self.log_osint_activity(tool_name, target, "authorized")
             return True
         else:
             self.notify("OSINT Cancelled", "Authorization denied")
             self.vibrate(1000)
-            self.log_osint_activity(tool_name, target, "denied")
             return False
     
     def save_enhanced_report(self, tool_name, target, results):
@@ -186,19 +147,14 @@ class TermuxOSINTBase:
             'session_id': self.session_id,
             'results': results,
             'device_context': {
-                'battery': self.get_battery_info(),
-                'wifi': self.get_wifi_info(),
+                **self.device_context.snapshot(wait_for=('battery', 'wifi'), timeout=wait_budget(5)),
                 'termux_apis': list(self.termux_apis.keys())
             }
         }
         
-        filename = f"reports/enhanced_{tool_name.lower().replace(' ', '_')}_{int(datetime.now().timestamp())}.json"
-        os.makedirs('reports', exist_ok=True)
-        
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=2, default=str)
+        report_id = get_report_store().save_report(tool_name, target, report, session_id=self.session_id)
         
         self.notify("Report Saved", f"{tool_name} results saved")
-        self.set_clipboard(filename)  # Copy filename to clipboard
+        self.set_clipboard(f"python tools/report_store.py show {report_id}")  # Copy lookup command to clipboard
         
-        return filename
+        return report_id
@@ -9,6 +9,8 @@ import json
 import time
 from datetime import datetime
 import os
+from termux_feedback import get_feedback_queue
+from tools.events import TerminalRenderer, get_event_bus, run_with_events
 
 class TermuxOSINTLauncher:
     def __init__(self):
@@ -23,18 +25,13 @@ class TermuxOSINTLauncher:
             '8': {'name': 'Metadata Extractor', 'script': 'tools/metadata_extractor.py'},
             '9': {'name': 'Crypto Analyzer', 'script': 'tools/crypto_analyzer.py'}
         }
+        self.events = get_event_bus()
+        self.events.subscribe(TerminalRenderer(prefix=True, show_stages=False))
     
     def send_notification(self, title, message):
         """Send Android notification via Termux API"""
-        try:
-            subprocess.run([
-                'termux-notification', 
-                '--title', title,
-                '--content', message
-            ])
-            print(f"📱 {title}: {message}")
-        except:
-            print(f"📱 {title}: {message}")
+        get_feedback_queue().notify(title, message)
+        print(f"📱 {title}: {message}")
     
     def get_clipboard_content(self):
         """Get clipboard content for auto-input"""
@@ -46,41 +43,23 @@ class TermuxOSINTLauncher:
             return None
     
     def launch_tool_simple(self, tool_key, target):
-        """Launch a single tool with target"""
+        """Launch a single tool with target in the background; its events are shown as they arrive"""
         tool = self.tools[tool_key]
         print(f"🔧 Starting {tool['name']} with target: {target}")
         
-        try:
-            # Create a simple script to run the tool
-            script_content = f"""
-import subprocess
-import sys
-
-# Run the tool
-process = subprocess.Popen([
-    'python', '{tool['script']}'
-], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-# Send input
-input_data = "yes\\n{target}\\n"
-stdout, stderr = process.communicate(input=input_data)
-
-print("=== {tool['name']} Results ===")
-print(stdout)
-if stderr:
-    print("Errors:", stderr)
-"""
-            
-            # Save and run the script
-            script_file = f"temp_script_{tool_key}.py"
-            with open(script_file, 'w') as f:
-                f.write(script_content)
-            
-            # Run in background
-            subprocess.Popen(['python', script_file])
-            
-        except Exception as e:
-            print(f"❌ Error launching {tool['name']}: {e}")
+        def run():
+            try:
+                # The target goes to the tool's stdin, never into generated code
+                result = run_with_events(['python', tool['script']], input_data=f"{target}\n",
+                                         on_event=lambda event: self.events.forward(event, source=tool['name']))
+                if result.returncode != 0:
+                    print(f"❌ {tool['name']} exited with status {result.returncode}")
+            except Exception as e:
+                print(f"❌ Error launching {tool['name']}: {e}")
+        
+        thread = threading.Thread(target=run, name=f"tool-{tool_key}")
+        thread.start()
+        return thread
     
     def launch_all_tools_simple(self, target):
         """Launch all tools with simplified approach"""
@@ -97,7 +76,7 @@ if stderr:
             time.sleep(1)  # Small delay between launches
         
         print(f"\n✅ All {len(self.tools)} tools launched!")
-        print("📊 Check terminal output for results")
+        print("📊 Findings appear below as each tool reports them")
         
         self.send_notification("OSINT Suite", "All tools launched successfully!")
 
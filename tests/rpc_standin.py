@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Stand-in JSON-RPC node for the blockchain backend tests
+Serves an in-memory ledger for the methods in BACKEND_PRESETS
+"""
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StubRPCServer:
+    """Local stand-in JSON-RPC server.
+    
+    Serves an in-memory ledger over HTTP/1.1 keep-alive and answers both
+    single and batch requests for the methods in BACKEND_PRESETS.
+    """
+    def __init__(self, ledger: dict = None, height: int = 800000, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0):
+        self.ledger = ledger or {}
+        self.height = height
+        self.latency = latency
+        self.requests_served = 0
+        self.calls_served = 0
+        self.connections = set()
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_POST(self):
+                server.connections.add(self.client_address)
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length))
+                if server.latency:
+                    time.sleep(server.latency)
+                
+                if isinstance(request, list):
+                    reply = [server.dispatch(item) for item in request]
+                    server.calls_served += len(request)
+                else:
+                    reply = server.dispatch(request)
+                    server.calls_served += 1
+                server.requests_served += 1
+                
+                body = json.dumps(reply).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}/"
+        self.thread = None
+    
+    def dispatch(self, request: dict) -> dict:
+        method = request.get('method')
+        params = request.get('params') or []
+        reply = {'jsonrpc': '2.0', 'id': request.get('id')}
+        
+        if method == 'getblockcount':
+            reply['result'] = self.height
+        elif method == 'eth_blockNumber':
+            reply['result'] = hex(self.height)
+        elif method in ('getaddressbalance', 'getaddresstxids'):
+            address = params[0]['addresses'][0]
+            entry = self.ledger.get(address, {})
+            if method == 'getaddressbalance':
+                reply['result'] = {'balance': entry.get('balance', 0), 'received': entry.get('received', 0)}
+            else:
+                reply['result'] = entry.get('txids', [])
+        elif method == 'eth_getBalance':
+            reply['result'] = hex(self.ledger.get(params[0], {}).get('balance', 0))
+        elif method == 'eth_getTransactionCount':
+            reply['result'] = hex(len(self.ledger.get(params[0], {}).get('txids', [])))
+        else:
+            reply['error'] = {'code': -32601, 'message': 'Method not found'}
+        return reply
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
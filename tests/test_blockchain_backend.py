@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+JSONRPCBackend and CryptoAnalyzer against a local stand-in node (no network needed)
+"""
+import pytest
+
+from rpc_standin import StubRPCServer
+from tools.blockchain_backend import BlockchainBackend, JSONRPCBackend
+from tools.crypto_analyzer import CryptoAnalyzer
+
+LEDGER = {
+    '1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2': {'balance': 150000, 'received': 250000, 'txids': ['aa' * 32, 'bb' * 32]},
+    'bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq': {'balance': 42, 'txids': ['cc' * 32]}
+}
+ADDRESSES = list(LEDGER) + ['3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy', '1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN3']
+ETH_ADDRESS = '0x52908400098527886E0F7030069857D2E4169EE7'
+
+@pytest.fixture
+def server():
+    with StubRPCServer(dict(LEDGER, **{ETH_ADDRESS: {'balance': 10 ** 18, 'txids': ['dd' * 32] * 3}}),
+                       height=800000) as server:
+        yield server
+
+@pytest.fixture
+def bitcoin(server):
+    backend = JSONRPCBackend(server.url, preset='bitcoin-addressindex', pool_size=2, height_ttl=0)
+    return backend, CryptoAnalyzer(backend=backend)
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        BlockchainBackend()
+
+def test_lookup_batches_valid_addresses(server, bitcoin):
+    backend, analyzer = bitcoin
+    first = analyzer.analyze_addresses(ADDRESSES)
+    
+    assert first[0]['balance']['balance'] == 150000
+    assert first[0]['transaction_history'] == ['aa' * 32, 'bb' * 32]
+    # The typo'd address fails its checksum and never reaches the backend
+    assert first[3]['balance'] == 'Requires API access'
+    # Three valid addresses: one height call, then one batch of six calls
+    assert server.requests_served == 2
+    assert server.calls_served == 7
+
+def test_same_height_is_served_from_cache(server, bitcoin):
+    backend, analyzer = bitcoin
+    analyzer.analyze_addresses(ADDRESSES)
+    analyzer.analyze_addresses(ADDRESSES)
+    
+    # Only the height is re-checked
+    assert server.requests_served == 3
+    assert backend.stats['cache_hits'] == 3
+
+def test_new_block_drops_old_cache(server, bitcoin):
+    backend, analyzer = bitcoin
+    analyzer.analyze_addresses(ADDRESSES)
+    server.height += 1
+    refreshed = analyzer.analyze_addresses(ADDRESSES[:1])
+    
+    assert refreshed[0]['blockchain_info']['height'] == 800001
+    assert list(backend.cache) == [800001]
+
+def test_requests_share_one_keepalive_connection(server, bitcoin):
+    backend, analyzer = bitcoin
+    for _ in range(3):
+        analyzer.analyze_addresses(ADDRESSES)
+    assert len(server.connections) == 1
+
+def test_ethereum_reports_transaction_count(server):
+    backend = JSONRPCBackend(server.url, preset='ethereum', height_ttl=0)
+    info = backend.get_address_info([ETH_ADDRESS])[ETH_ADDRESS]
+    
+    assert info['balance'] == 10 ** 18
+    assert info['transaction_count'] == 3
+    assert 'transaction_history' not in info
+
+def test_testnet_addresses_stay_off_a_mainnet_node(server, bitcoin):
+    backend, analyzer = bitcoin
+    testnet = ['tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx', 'mipcBbFg9gMiCh81Kj8tqqdgoZub1ZJRfn']
+    analyses = analyzer.analyze_addresses(testnet + ADDRESSES[:1])
+    
+    assert [analysis['validation']['network'] for analysis in analyses] == ['testnet', 'testnet', 'mainnet']
+    assert analyses[0]['balance'] == analyses[1]['balance'] == 'Requires API access'
+    # One height call, then balance and history for the mainnet address only
+    assert server.calls_served == 3
@@ -6,10 +6,25 @@ Educational and authorized use only
 import phonenumbers
 from phonenumbers import geocoder, carrier, timezone
 import requests
-import json
 import re
+import sys
 from datetime import datetime
 
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+try:
+    from tools.perf import instrumented, span, enable_from_argv, print_flame
+except ImportError:
+    from perf import instrumented, span, enable_from_argv, print_flame
+
 class AdvancedPhoneOSINT:
     def __init__(self):
         self.session = requests.Session()
@@ -123,6 +138,7 @@ class AdvancedPhoneOSINT:
             'method': "Respects privacy settings"
         }
     
+    @instrumented('generate_comprehensive_report')
     def generate_comprehensive_report(self, phone: str) -> dict:
         """Generate detailed OSINT report"""
         print(f"\n{'='*60}")
@@ -133,13 +149,16 @@ class AdvancedPhoneOSINT:
         print(f"{'='*60}")
         
         # Phone analysis
-        phone_analysis = self.analyze_phone_number(phone)
+        with span('phone_analysis'):
+            phone_analysis = self.analyze_phone_number(phone)
         
         # Spam check
-        spam_check = self.check_spam_databases(phone)
+        with span('spam_analysis'):
+            spam_check = self.check_spam_databases(phone)
         
         # Social media footprint
-        social_footprint = self.social_media_footprint(phone)
+        with span('social_footprint'):
+            social_footprint = self.social_media_footprint(phone)
         
         report = {
             'target': phone,
@@ -205,22 +224,21 @@ def main():
     print("Advanced Phone OSINT Tool")
     print("Educational and authorized use only!")
     
-    consent = input("\nDo you have explicit permission to analyze this number? (yes/no): ")
-    if consent.lower() != 'yes':
+    phone = input("Enter phone number (with country code): ")
+    if not authorize("Advanced Phone OSINT", phone, "\nDo you have explicit permission to analyze this number? (yes/no): "):
         print("Exiting - proper authorization required")
         return
     
-    phone = input("Enter phone number (with country code): ")
-    
     osint = AdvancedPhoneOSINT()
+    # python tools/advanced_phone_osint.py --perf
+    enable_from_argv(sys.argv[1:])
     report = osint.generate_comprehensive_report(phone)
+    print_flame(report)
     
     # Save detailed report
-    filename = f"advanced_report_{phone.replace('+', '').replace(' ', '').replace('-', '')}.json"
-    with open(filename, 'w') as f:
-        json.dump(report, f, indent=2, default=str)
+    report_id = get_report_store().save_report("Advanced Phone OSINT", phone, report)
     
-    print(f"\nDetailed report saved to {filename}")
+    print(f"\nDetailed report saved as #{report_id} (python tools/report_store.py show {report_id})")
 
 if __name__ == "__main__":
     main()
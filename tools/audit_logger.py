@@ -1,18 +1,571 @@
 #!/usr/bin/env python3
-class AuditLogger:
-
-from datetime import datetime
-import os
+"""
+Audit Logger
+Append-only, hash-chained activity log shared by every OSINT tool
+"""
+import argparse
+import atexit
+import fcntl
+import glob
+import gzip
+import hashlib
 import json
+import os
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+try:
+    from tools.perf import observe
+except ImportError:
+    from perf import observe
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOG_DIR = os.path.join(ROOT_DIR, 'logs', 'audit')
+ACTIVE_SEGMENT = 'current.jsonl'
+# Held (non-blocking) by whichever thread or process is compressing sealed segments
+COMPRESS_LOCK = '.compress.lock'
+GENESIS_HASH = '0' * 64
+ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+INDEX_VERSION = 1
+INDEX_BLOCK_BYTES = 64 * 1024
+# Blocks with more distinct sessions than this index them as unknown (null)
+MAX_BLOCK_SESSIONS = 32
+
+class AuditLogger:
+    """Crash-safe audit log.
+    
+    Every entry is handed to the kernel with a single O_APPEND write before
+    log() returns, so a crashed or killed process never loses an entry;
+    fsync is batched on a background thread (group commit), bounding what
+    a power loss can take to fsync_interval seconds. Pass durable=True to
+    fsync a specific entry before returning.
+    
+    Entries are hash chained (each carries the previous entry's hash), the
+    chain spans rotated segments, and an flock keeps the chain linear when
+    several tool processes log at once.
+    """
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, max_segment_bytes=8 * 1024 * 1024,
+                 max_segment_age=24 * 3600, fsync_interval=1.0, fsync_batch=256):
+        self.log_dir = log_dir
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        os.makedirs(log_dir, exist_ok=True)
+        
+        self.active_path = os.path.join(log_dir, ACTIVE_SEGMENT)
+        self.state_path = os.path.join(log_dir, 'chain.json')
+        self._lock = threading.Lock()
+        self._lock_fd = os.open(os.path.join(log_dir, '.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        self._fd = None
+        self._inode = None
+        self._end = 0
+        self._opened_at = 0.0
+        self._unsynced = 0
+        self._closed = False
+        self._compressor = None
+        self.last_hash = GENESIS_HASH
+        self.seq = 0
+        
+        self._acquire()
+        try:
+            self._open_active()
+        finally:
+            self._release()
+        self._compress_sealed_segments()
+        
+        self._wakeup = threading.Event()
+        self._syncer = threading.Thread(target=self._sync_loop, name='audit-fsync', daemon=True)
+        self._syncer.start()
+    
+    # -- locking / files ---------------------------------------------------
+    
+    def _acquire(self):
+        self._lock.acquire()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+    
+    def _release(self):
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        self._lock.release()
+    
+    def _open_active(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.active_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        st = os.fstat(self._fd)
+        self._inode = st.st_ino
+        self._opened_at = self._segment_started() if st.st_size else time.time()
+        self._recover_tail(st.st_size)
+    
+    def _segment_started(self):
+        """Time of the active segment's first entry (ctime moves with every append)"""
+        try:
+            with open(self.active_path, 'rb') as f:
+                return datetime.fromisoformat(json.loads(f.readline())['ts']).timestamp()
+        except (OSError, ValueError, KeyError):
+            return time.time()
+    
+    def _recover_tail(self, size):
+        """Re-read chain state from the end of the active segment (or the sealed state)"""
+        self._end = size
+        if size == 0:
+            try:
+                with open(self.state_path, 'r') as f:
+                    state = json.load(f)
+                self.last_hash, self.seq = state['last_hash'], state['seq']
+            except (OSError, ValueError, KeyError):
+                self.last_hash, self.seq = GENESIS_HASH, 0
+            return
+        
+        with open(self.active_path, 'rb') as f:
+            chunk = 4096
+            while True:
+                start = max(0, size - chunk)
+                f.seek(start)
+                tail = f.read(size - start)
+                if tail.count(b'\n') >= 2 or start == 0:
+                    break
+                chunk *= 4
+        
+        if not tail.endswith(b'\n'):
+            # Torn final write: drop the partial line so the segment stays parseable
+            cut = tail.rfind(b'\n') + 1
+            os.truncate(self.active_path, start + cut)
+            tail = tail[:cut]
+            self._end = start + cut
+        
+        lines = tail.splitlines()
+        if lines:
+            entry = json.loads(lines[-1])
+            self.last_hash, self.seq = entry['hash'], entry['seq']
+    
+    # -- hot path ----------------------------------------------------------
+    
+    def log(self, tool, action, target=None, session_id=None, durable=False, **fields):
+        """Append one entry; returns its hash"""
+        started = time.perf_counter()
+        self._acquire()
+        try:
+            try:
+                st = os.stat(self.active_path)
+            except FileNotFoundError:
+                st = None
+            if st is None or st.st_ino != self._inode:
+                # Another process rotated the segment under us
+                self._open_active()
+            elif st.st_size != self._end:
+                # Another process appended since our last write
+                self._recover_tail(st.st_size)
+            
+            if self._end >= self.max_segment_bytes or \
+                    (self._end and time.time() - self._opened_at >= self.max_segment_age):
+                self._rotate()
+            
+            self.seq += 1
+            entry = {
+                'seq': self.seq,
+                'ts': datetime.now().isoformat(),
+                'tool': tool,
+                'action': action,
+                'target': target,
+                'session_id': session_id
+            }
+            entry.update(fields)
+            entry['prev'] = self.last_hash
+            body = ENCODER.encode(entry)
+            digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+            line = f'{body[:-1]},"hash":"{digest}"}}\n'.encode('utf-8')
+            
+            os.write(self._fd, line)
+            self._end += len(line)
+            self.last_hash = digest
+            self._unsynced += 1
+            
+            if durable:
+                os.fsync(self._fd)
+                self._unsynced = 0
+            elif self._unsynced == self.fsync_batch:
+                self._wakeup.set()
+        finally:
+            self._release()
+        # Includes waiting for the flock, which is what a slow write looks like from the caller
+        observe('audit_write_seconds', time.perf_counter() - started)
+        return digest
+    
     def log_activity(self, tool_name, target, user_consent):
+        """Record a consent decision for a tool run"""
+        return self.log(tool_name, 'authorized' if user_consent else 'denied',
+                        target=target, consent_given=bool(user_consent), durable=True)
+    
+    # -- durability --------------------------------------------------------
+    
+    def _sync_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.fsync_interval)
+            self._wakeup.clear()
+            self.flush()
+    
+    def flush(self):
+        # fsync a duplicate descriptor outside the lock so writers never wait on the disk
+        with self._lock:
+            if not self._unsynced or self._fd is None:
+                return
+            fd = os.dup(self._fd)
+            self._unsynced = 0
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._wakeup.set()
+        # Let a running compression finish rather than leave temporary files behind at exit
+        if self._compressor is not None:
+            self._compressor.join()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+    
+    # -- rotation ----------------------------------------------------------
+    
+    def _rotate(self):
+        """Seal the active segment; called with both locks held"""
+        os.fsync(self._fd)
+        self._unsynced = 0
+        with open(self.active_path, 'rb') as f:
+            first_seq = json.loads(f.readline())['seq']
+        sealed = os.path.join(self.log_dir, f"segment-{first_seq:012d}.jsonl")
+        
+        self._write_state()
+        os.rename(self.active_path, sealed)
+        self._open_active()
+        
+        # One compressor per process; a running one rescans and picks this segment up
+        if self._compressor is None or not self._compressor.is_alive():
+            self._compressor = threading.Thread(target=self._compress_sealed_segments,
+                                                name='audit-compress', daemon=True)
+            self._compressor.start()
+    
+    def _write_state(self):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_hash': self.last_hash, 'seq': self.seq}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+    
+    def _compress_sealed_segments(self):
+        """gzip and index sealed segments; the plain file is removed only once both are durable.
+        
+        A non-blocking flock lets one thread in one process do this at a
+        time; everyone else returns at once and leaves it to the holder.
+        """
+        lock_fd = os.open(os.path.join(self.log_dir, COMPRESS_LOCK), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            # Left by a compressor that died mid-segment; nobody else can be writing them now
+            for tmp_path in glob.glob(os.path.join(self.log_dir, 'segment-*.tmp')):
+                os.unlink(tmp_path)
+            while True:
+                pending = self._pending_segments()
+                if not pending:
+                    return
+                for path in pending:
+                    self._compress_segment(path)
+        finally:
+            os.close(lock_fd)
+    
+    def _pending_segments(self):
+        pending = glob.glob(os.path.join(self.log_dir, 'segment-*.jsonl'))
+        # Segments sealed before the index existed are re-blocked the same way
+        pending += [path for path in glob.glob(os.path.join(self.log_dir, 'segment-*.jsonl.gz'))
+                    if not os.path.exists(index_path_for(path))]
+        return sorted(pending)
+    
+    def _compress_segment(self, path):
+        gz_path = path if path.endswith('.gz') else f"{path}.gz"
+        idx_path = index_path_for(gz_path)
+        suffix = f".{os.getpid()}.tmp"
+        try:
+            opener = gzip.open if path.endswith('.gz') else open
+            with opener(path, 'rb') as src, open(gz_path + suffix, 'wb') as raw:
+                index = write_indexed_segment(src, raw)
+                raw.flush()
+                os.fsync(raw.fileno())
+            with open(idx_path + suffix, 'w') as f:
+                json.dump(index, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            # The index names offsets in the new .gz, so it lands first and
+            # the .gz replace is what makes the pair current
+            os.replace(idx_path + suffix, idx_path)
+            os.replace(gz_path + suffix, gz_path)
+            if path != gz_path:
+                os.unlink(path)
+        finally:
+            for tmp_path in (gz_path + suffix, idx_path + suffix):
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+    
+    # -- reading -----------------------------------------------------------
+    
+    def segments(self):
+        """All segment paths, oldest first (sealed ones, then the active one)"""
+        sealed = {}
+        for path in glob.glob(os.path.join(self.log_dir, 'segment-*.jsonl')):
+            sealed[os.path.basename(path).split('.')[0]] = path
+        # While a segment is being compressed both files exist; the .gz wins
+        for path in glob.glob(os.path.join(self.log_dir, 'segment-*.jsonl.gz')):
+            sealed[os.path.basename(path).split('.')[0]] = path
+        ordered = [sealed[stem] for stem in sorted(sealed)]
+        return ordered + ([self.active_path] if os.path.exists(self.active_path) else [])
+    
+    def iter_entries(self):
+        for path in self.segments():
+            opener = gzip.open if path.endswith('.gz') else open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield line
+    
+    def verify(self) -> dict:
+        """Walk the whole chain; reports the first broken link, if any"""
+        prev = GENESIS_HASH
+        checked = 0
+        for line in self.iter_entries():
+            entry = json.loads(line)
+            digest = entry.pop('hash')
+            body = json.dumps(entry, separators=(',', ':'))
+            if entry.get('prev') != prev or hashlib.sha256(body.encode('utf-8')).hexdigest() != digest:
+                return {'valid': False, 'checked': checked, 'broken_at_seq': entry.get('seq')}
+            prev = digest
+            checked += 1
+        return {'valid': True, 'checked': checked, 'last_hash': prev}
+    
+    def query(self, tool=None, session_id=None, action=None, since=None, until=None):
+        """Stream matching entries, oldest first.
+        
+        since/until are ISO timestamps (until is exclusive). Sealed segments
+        are narrowed through their sparse index so only overlapping blocks are
+        read and decompressed; memory stays at one block whatever the log size.
+        """
+        # Cheap substring prefilter; entries are written by ENCODER so the
+        # encoded field appears verbatim in every matching line
+        needles = [f'"{key}":{ENCODER.encode(value)}'.encode('utf-8')
+                   for key, value in (('tool', tool), ('session_id', session_id), ('action', action))
+                   if value is not None]
+        
+        def matches(entry):
+            if tool is not None and entry.get('tool') != tool:
+                return False
+            if session_id is not None and entry.get('session_id') != session_id:
+                return False
+            if action is not None and entry.get('action') != action:
+                return False
+            if since is not None and entry['ts'] < since:
+                return False
+            if until is not None and entry['ts'] >= until:
+                return False
+            return True
+        
+        def scan(lines):
+            for line in lines:
+                if all(needle in line for needle in needles) and line.strip():
+                    entry = json.loads(line)
+                    if matches(entry):
+                        yield entry
+        
+        for path in self.segments():
+            if not path.endswith('.gz'):
+                with open(path, 'rb') as f:
+                    yield from scan(f)
+                continue
+            
+            index = load_segment_index(path)
+            if index is None:
+                # Unindexed (or mid-rewrite) segment: fall back to a streaming scan
+                with gzip.open(path, 'rb') as f:
+                    yield from scan(f)
+                continue
+            if not block_may_match(index, tool, session_id, action, since, until):
+                continue
+            
+            with open(path, 'rb') as f:
+                for block in index['blocks']:
+                    if not block_may_match(block, tool, session_id, action, since, until):
+                        continue
+                    f.seek(block['offset'])
+                    data = zlib.decompress(f.read(block['length']), 31)
+                    yield from scan(data.splitlines())
 
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        self.log_file = log_file
-    def __init__(self, log_file="logs/osint_audit.log"):
-            "consent_given": user_consent
-            "target": target,
-            "tool": tool_name,
-            "timestamp": datetime.now().isoformat(),
-        log_entry = {
+def index_path_for(gz_path):
+    return gz_path[:-len('.jsonl.gz')] + '.idx'
+
+def write_indexed_segment(src, raw) -> dict:
+    """Copy JSONL lines from src into raw as independent gzip members.
+    
+    Each member holds roughly INDEX_BLOCK_BYTES of entries and can be
+    decompressed on its own after a seek; the concatenation is still an
+    ordinary gzip file. Returns the sparse index describing the members.
+    """
+    index = {'version': INDEX_VERSION, 'blocks': []}
+    pending = []
+    pending_bytes = 0
+    offset = 0
+    
+    def emit():
+        nonlocal offset, pending, pending_bytes
+        data = b''.join(pending)
+        member = gzip.compress(data, mtime=0)
+        raw.write(member)
+        entries = [json.loads(line) for line in pending]
+        sessions = {entry.get('session_id') for entry in entries}
+        stamps = [entry['ts'] for entry in entries]
+        index['blocks'].append({
+            'offset': offset,
+            'length': len(member),
+            'first_seq': entries[0]['seq'],
+            'last_seq': entries[-1]['seq'],
+            'min_ts': min(stamps),
+            'max_ts': max(stamps),
+            'tools': sorted({str(entry.get('tool')) for entry in entries}),
+            'actions': sorted({str(entry.get('action')) for entry in entries}),
+            'sessions': sorted(sessions, key=str) if len(sessions) <= MAX_BLOCK_SESSIONS else None
+        })
+        offset += len(member)
+        pending = []
+        pending_bytes = 0
+    
+    for line in src:
+        if not line.strip():
+            continue
+        pending.append(line)
+        pending_bytes += len(line)
+        if pending_bytes >= INDEX_BLOCK_BYTES:
+            emit()
+    if pending:
+        emit()
+    
+    blocks = index['blocks']
+    if blocks:
+        index.update({
+            'first_seq': blocks[0]['first_seq'],
+            'last_seq': blocks[-1]['last_seq'],
+            'min_ts': min(block['min_ts'] for block in blocks),
+            'max_ts': max(block['max_ts'] for block in blocks),
+            'tools': sorted({name for block in blocks for name in block['tools']}),
+            'actions': sorted({name for block in blocks for name in block['actions']}),
+            'sessions': None
+        })
+    return index
+
+def load_segment_index(gz_path):
+    """Sparse index for a sealed segment, or None when missing or stale"""
+    try:
+        with open(index_path_for(gz_path), 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != INDEX_VERSION:
+        return None
+    blocks = index.get('blocks', [])
+    end = blocks[-1]['offset'] + blocks[-1]['length'] if blocks else 0
+    if end != os.path.getsize(gz_path):
+        return None
+    return index
+
+def block_may_match(block, tool, session_id, action, since, until) -> bool:
+    """Whether a block (or whole-segment summary) can hold a matching entry"""
+    if 'min_ts' not in block:
+        return False
+    if since is not None and block['max_ts'] < since:
+        return False
+    if until is not None and block['min_ts'] >= until:
+        return False
+    if tool is not None and tool not in block['tools']:
+        return False
+    if action is not None and action not in block['actions']:
+        return False
+    if session_id is not None and block['sessions'] is not None and session_id not in block['sessions']:
+        return False
+    return True
+
+def parse_time(value):
+    """ISO date/time, or a relative age such as 90d, 12h, 30m"""
+    if value is None:
+        return None
+    units = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+    if value[:-1].isdigit() and value[-1:] in units:
+        return (datetime.now() - timedelta(**{units[value[-1]]: int(value[:-1])})).isoformat()
+    return datetime.fromisoformat(value).isoformat()
+
+_shared_logger = None
+_shared_lock = threading.Lock()
+
+def get_audit_logger() -> AuditLogger:
+    """Process-wide audit logger"""
+    global _shared_logger
+    with _shared_lock:
+        if _shared_logger is None:
+            _shared_logger = AuditLogger()
+            atexit.register(_shared_logger.close)
+        return _shared_logger
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit log maintenance")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('verify', help="Check the hash chain end to end")
+    query = commands.add_parser('query', help="Stream entries matching filters")
+    query.add_argument('--tool')
+    query.add_argument('--session', dest='session_id')
+    query.add_argument('--action')
+    query.add_argument('--since', help="ISO timestamp or relative age (e.g. 90d)")
+    query.add_argument('--until', help="ISO timestamp or relative age, exclusive")
+    query.add_argument('--limit', type=int, default=0, help="Stop after N matches")
+    query.add_argument('--json', action='store_true', help="Print raw JSON lines")
+    args = parser.parse_args(argv)
+    
+    logger = get_audit_logger()
+    
+    if args.command == 'verify':
+        result = logger.verify()
+        if result['valid']:
+            print(f"✅ Audit chain intact ({result['checked']} entries)")
+        else:
+            print(f"❌ Audit chain broken at seq {result['broken_at_seq']} after {result['checked']} valid entries")
+            sys.exit(1)
+        return
+    
+    if args.command == 'query':
+        matched = 0
+        for entry in logger.query(tool=args.tool, session_id=args.session_id, action=args.action,
+                                  since=parse_time(args.since), until=parse_time(args.until)):
+            if args.json:
+                print(ENCODER.encode(entry))
+            else:
+                print(f"{entry['ts']}  #{entry['seq']}  {entry['tool']}  {entry['action']}  "
+                      f"target={entry.get('target')}  session={entry.get('session_id')}")
+            matched += 1
+            if matched == args.limit:
+                break
+        if not args.json:
+            print(f"🔍 {matched} matching entries")
+        return
+    
     print("Audit logger initialized")
-    logger = AuditLogger()
+    print(f"Log directory: {logger.log_dir}")
+    print(f"Segments: {len(logger.segments())}  Last seq: {logger.seq}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Blockchain Backend Adapters
+JSON-RPC access to a self-hosted node or indexer for CryptoAnalyzer
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+import requests
+from requests.adapters import HTTPAdapter
+
+# Method names and parameter shapes for common self-hosted backends.
+# 'fields' maps each per-address result field to (method, params builder(address, height)).
+BACKEND_PRESETS = {
+    # bitcoind / dashd forks built with -addressindex (Insight-style RPCs)
+    'bitcoin-addressindex': {
+        'chain': 'Bitcoin',
+        'height': ('getblockcount', []),
+        'fields': {
+            'balance': ('getaddressbalance', lambda address, height: [{'addresses': [address]}]),
+            'transaction_history': ('getaddresstxids',
+                                    lambda address, height: [{'addresses': [address], 'end': height}])
+        }
+    },
+    # Any Ethereum execution client (geth, erigon, nethermind, ...)
+    'ethereum': {
+        'chain': 'Ethereum',
+        'height': ('eth_blockNumber', []),
+        'fields': {
+            'balance': ('eth_getBalance', lambda address, height: [address, hex(height)]),
+            # Execution clients keep no per-address history; the nonce counts transactions sent
+            'transaction_count': ('eth_getTransactionCount', lambda address, height: [address, hex(height)])
+        }
+    }
+}
+
+class RPCError(Exception):
+    """JSON-RPC level error returned by the backend"""
+    def __init__(self, error):
+        self.error = error
+        message = error.get('message') if isinstance(error, dict) else error
+        super().__init__(f"RPC error: {message}")
+
+class BlockchainBackend(ABC):
+    """Interface for balance/history lookups used by CryptoAnalyzer"""
+    chain = None
+    # Only addresses of this network (mainnet, testnet, regtest) are sent to the node
+    network = 'mainnet'
+    
+    @abstractmethod
+    def get_block_height(self) -> int:
+        pass
+    
+    @abstractmethod
+    def get_address_info(self, addresses: list) -> dict:
+        """Return {address: {'height', 'balance', and 'transaction_history' or 'transaction_count'}}"""
+
+class JSONRPCBackend(BlockchainBackend):
+    def __init__(self, url: str, preset: str = 'bitcoin-addressindex', username: str = None,
+                 password: str = None, pool_size: int = 8, batch_size: int = 100,
+                 timeout: float = 10, height_ttl: float = 5.0, network: str = 'mainnet'):
+        self.url = url
+        self.methods = BACKEND_PRESETS[preset]
+        self.chain = self.methods['chain']
+        self.network = network
+        self.preset = preset
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.height_ttl = height_ttl
+        
+        # One keep-alive pool shared by every call on this backend
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+        if username is not None:
+            self.session.auth = (username, password or '')
+        
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._height = None
+        self._height_checked = 0.0
+        # height -> {address: info}; a result for a given height never changes
+        self.cache = {}
+        self.stats = {'rpc_requests': 0, 'rpc_calls': 0, 'cache_hits': 0, 'cache_misses': 0}
+    
+    def _request_ids(self, count: int) -> list:
+        with self._lock:
+            start = self._next_id
+            self._next_id += count
+        return list(range(start, start + count))
+    
+    def call(self, method: str, params=None):
+        """Single JSON-RPC call"""
+        return self.batch_call([(method, params or [])])[0]
+    
+    def batch_call(self, calls: list) -> list:
+        """Send [(method, params), ...] as one JSON-RPC batch; results keep call order"""
+        ids = self._request_ids(len(calls))
+        payload = [
+            {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+            for request_id, (method, params) in zip(ids, calls)
+        ]
+        body = payload[0] if len(payload) == 1 else payload
+        
+        response = self.session.post(self.url, data=json.dumps(body), timeout=self.timeout)
+        response.raise_for_status()
+        self.stats['rpc_requests'] += 1
+        self.stats['rpc_calls'] += len(calls)
+        
+        replies = response.json()
+        if isinstance(replies, dict):
+            replies = [replies]
+        by_id = {reply.get('id'): reply for reply in replies}
+        
+        results = []
+        for request_id in ids:
+            reply = by_id.get(request_id)
+            if reply is None:
+                results.append(RPCError({'message': f'No reply for request {request_id}'}))
+            elif reply.get('error'):
+                results.append(RPCError(reply['error']))
+            else:
+                results.append(reply.get('result'))
+        return results
+    
+    def get_block_height(self) -> int:
+        now = time.monotonic()
+        if self._height is None or now - self._height_checked >= self.height_ttl:
+            method, params = self.methods['height']
+            height = self.call(method, params)
+            if isinstance(height, Exception):
+                raise height
+            self._height = int(height, 16) if isinstance(height, str) else int(height)
+            self._height_checked = now
+        return self._height
+    
+    def get_address_info(self, addresses: list) -> dict:
+        height = self.get_block_height()
+        
+        with self._lock:
+            at_height = self.cache.setdefault(height, {})
+            # Results for older heights are never read again
+            for old_height in [h for h in self.cache if h < height]:
+                del self.cache[old_height]
+        
+        missing = [address for address in dict.fromkeys(addresses) if address not in at_height]
+        self.stats['cache_hits'] += len(addresses) - len(missing)
+        self.stats['cache_misses'] += len(missing)
+        
+        fields = self.methods['fields']
+        failed = {}
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            calls = [(method, params(address, height))
+                     for address in chunk for method, params in fields.values()]
+            results = self.batch_call(calls)
+            
+            for i, address in enumerate(chunk):
+                replies = results[i * len(fields):(i + 1) * len(fields)]
+                info = {'height': height}
+                for field, reply in zip(fields, replies):
+                    info[field] = self._normalize_result(reply)
+                # Errors are not cached so they are retried on the next lookup
+                if any(isinstance(reply, Exception) for reply in replies):
+                    info['incomplete'] = True
+                    failed[address] = info
+                else:
+                    at_height[address] = info
+        
+        return {address: failed.get(address) or at_height[address] for address in addresses}
+    
+    def _normalize_result(self, result):
+        if isinstance(result, Exception):
+            return {'error': str(result)}
+        # Ethereum quantities are hex strings
+        if isinstance(result, str) and result.startswith('0x'):
+            return int(result, 16)
+        return result
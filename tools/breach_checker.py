@@ -4,12 +4,36 @@ Data Breach Checker
 Educational and authorized use only
 """
 import hashlib
-import requests
 from datetime import datetime
 
+try:
+    from tools.audit_logger import get_audit_logger
+except ImportError:
+    from audit_logger import get_audit_logger
+
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+try:
+    from tools.rate_limiter import RateLimitedSession
+except ImportError:
+    from rate_limiter import RateLimitedSession
+
+try:
+    from tools.deadline import run_stages, stage_timeout
+except ImportError:
+    from deadline import run_stages, stage_timeout
+
 class BreachChecker:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = RateLimitedSession()
     
     def check_haveibeenpwned(self, email: str) -> dict:
         """Check HaveIBeenPwned API (requires API key)"""
@@ -27,43 +51,68 @@ class BreachChecker:
         suffix = sha1_hash[5:]
         
         try:
-            response = self.session.get(f"https://api.pwnedpasswords.com/range/{prefix}")
-            if response.status_code == 200:
-                hashes = response.text.split('\n')
-                for hash_line in hashes:
-                    if hash_line.startswith(suffix):
-                        count = int(hash_line.split(':')[1])
-                        return {
-                            'is_pwned': True,
-                            'count': count,
-                            'recommendation': 'Change password immediately'
-                        }
-                return {
-                    'is_pwned': False,
-                    'count': 0,
-                    'recommendation': 'Password appears safe'
-                }
+            counts = self.fetch_range(prefix)
         except:
+            counts = None
+        return self.verdict(counts, suffix)
+    
+    def check_password_batch(self, passwords: list) -> list:
+        """check_password_hash for many passwords; each hash-prefix range is fetched once"""
+        hashes = [hashlib.sha1(password.encode()).hexdigest().upper() for password in passwords]
+        prefixes = sorted({sha1_hash[:5] for sha1_hash in hashes})
+        ranges, _ = run_stages({f"range {prefix}": lambda prefix=prefix: self.fetch_range(prefix)
+                                for prefix in prefixes})
+        return [self.verdict(ranges[f"range {sha1_hash[:5]}"], sha1_hash[5:]) for sha1_hash in hashes]
+    
+    def fetch_range(self, prefix: str):
+        """Hash suffix -> breach count for one range; None when the API did not answer"""
+        response = self.session.get(f"https://api.pwnedpasswords.com/range/{prefix}",
+                                    timeout=stage_timeout(10))
+        if response.status_code != 200:
+            return None
+        counts = {}
+        for hash_line in response.text.splitlines():
+            suffix, _, count = hash_line.partition(':')
+            if count:
+                counts[suffix.strip()] = int(count)
+        return counts
+    
+    def verdict(self, counts, suffix: str) -> dict:
+        if not isinstance(counts, dict) or 'error' in counts:
             return {'error': 'Could not check password'}
+        if suffix in counts:
+            return {
+                'is_pwned': True,
+                'count': counts[suffix],
+                'recommendation': 'Change password immediately'
+            }
+        return {
+            'is_pwned': False,
+            'count': 0,
+            'recommendation': 'Password appears safe'
+        }
 
 def main():
     print("Data Breach Checker")
     print("Educational and authorized use only!")
     
-    consent = input("\nDo you have permission to check this data? (yes/no): ")
-    if consent.lower() != 'yes':
-        print("Exiting - proper authorization required")
-        return
-    
     checker = BreachChecker()
     
     choice = input("Check (e)mail or (p)assword? ")
     if choice.lower() == 'e':
         email = input("Enter email: ")
+        if not authorize("Breach Checker", email, "\nDo you have permission to check this data? (yes/no): "):
+            print("Exiting - proper authorization required")
+            return
         result = checker.check_haveibeenpwned(email)
         print(f"Result: {result}")
+        report_id = get_report_store().save_report("Breach Checker", email, result)
+        print(f"Report saved as #{report_id}")
     elif choice.lower() == 'p':
         password = input("Enter password: ")
+        # Only a 5-character hash prefix leaves the device and no third party is
+        # involved, so this is logged but not scope-checked; never log the password
+        get_audit_logger().log("Breach Checker", 'local-check', target="password-hash-check")
         result = checker.check_password_hash(password)
         print(f"Password breach status: {result}")
 
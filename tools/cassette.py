@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Record/Replay Cassettes
+Every HTTP, DNS and WHOIS exchange of a run, recorded to a compact file and replayed offline
+"""
+import argparse
+import atexit
+import base64
+import gzip
+import hashlib
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+
+import dns.message
+import dns.name
+import dns.resolver
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Cassette file for this run; child tools inherit it for replay, never for recording
+ENV_VAR = 'OSINT_CASSETTE'
+# record | replay
+MODE_ENV_VAR = 'OSINT_CASSETTE_MODE'
+# fast: answer at once; exact: each exchange takes as long as it did when recorded
+TIMING_ENV_VAR = 'OSINT_REPLAY_TIMING'
+MODES = ('record', 'replay')
+TIMINGS = ('fast', 'exact')
+FORMAT_VERSION = 1
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """A replayed run asked for an exchange the cassette never saw; tools treat it as the network being down"""
+
+def encode_bytes(data) -> dict:
+    try:
+        return {'text': data.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(data).decode('ascii')}
+
+def decode_bytes(value) -> bytes:
+    if 'base64' in value:
+        return base64.b64decode(value['base64'])
+    return value['text'].encode('utf-8')
+
+def error_entry(error) -> list:
+    return [f"{type(error).__module__}.{type(error).__qualname__}", str(error)]
+
+def rebuild_error(recorded) -> Exception:
+    """The recorded exception, or a CassetteMiss when its class cannot be imported here"""
+    path, message = recorded
+    module, _, name = path.rpartition('.')
+    try:
+        cls = getattr(importlib.import_module(module), name)
+    except (ImportError, AttributeError, ValueError):
+        return CassetteMiss(f"{path}: {message}")
+    if not (isinstance(cls, type) and issubclass(cls, Exception)):
+        return CassetteMiss(f"{path}: {message}")
+    try:
+        return cls(message)
+    except TypeError:
+        # Exceptions with extra constructor arguments (subprocess.TimeoutExpired)
+        error = cls.__new__(cls)
+        Exception.__init__(error, message)
+        return error
+
+class Cassette:
+    """One cassette file, open for recording or replaying.
+    
+    The file is gzipped JSON lines: a header, then one entry per exchange
+    with its kind (http, dns, whois), key (method and URL, name and record
+    type, query), start offset 't' and duration 'd' in seconds, and either
+    the answer 'v' or the exception 'e' it raised. Replay hands out the
+    entries for a key in recorded order; once they run out the last one is
+    repeated, so a retry or a second identical lookup still gets an answer.
+    """
+    def __init__(self, path, mode, timing='fast'):
+        if mode not in MODES:
+            raise ValueError(f"Cassette mode must be one of {MODES}, not {mode!r}")
+        if timing not in TIMINGS:
+            raise ValueError(f"Replay timing must be one of {TIMINGS}, not {timing!r}")
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._adapters = {}
+        self._file = None
+        if self.recording:
+            self.header = {'cassette': FORMAT_VERSION, 'recorded': datetime.now().isoformat(),
+                           'argv': sys.argv}
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+            self._write(self.header)
+        else:
+            self.header, entries = load(path)
+            self._entries = {}
+            for entry in entries:
+                self._entries.setdefault((entry['k'], entry['q']), deque()).append(entry)
+            self._last = {}
+    
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+    
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + '\n')
+    
+    def exchange(self, kind, key, fetch, encode=None, decode=None):
+        """fetch() recorded under (kind, key), or its recorded answer when replaying.
+        
+        encode turns the answer into JSON for the file and decode turns it
+        back into what fetch would have returned.
+        """
+        if self.recording:
+            return self._record(kind, key, fetch, encode)
+        return self._replay(kind, key, decode)
+    
+    def _record(self, kind, key, fetch, encode):
+        started = time.monotonic()
+        entry = {'k': kind, 'q': key, 't': round(started - self.started, 4)}
+        try:
+            value = fetch()
+        except Exception as error:
+            entry.update(d=round(time.monotonic() - started, 4), e=error_entry(error))
+            self._write(entry)
+            raise
+        entry.update(d=round(time.monotonic() - started, 4), v=encode(value) if encode else value)
+        self._write(entry)
+        return value
+    
+    def _replay(self, kind, key, decode):
+        with self._lock:
+            queue = self._entries.get((kind, key))
+            if queue:
+                entry = self._last[(kind, key)] = queue.popleft()
+            else:
+                entry = self._last.get((kind, key))
+        if entry is None:
+            raise CassetteMiss(f"{kind} {key} is not in {self.path}")
+        if self.timing == 'exact' and entry['d'] > 0:
+            time.sleep(entry['d'])
+        if 'e' in entry:
+            raise rebuild_error(entry['e'])
+        value = entry['v']
+        return decode(value) if decode else value
+    
+    def wrap(self, adapter):
+        """The CassetteAdapter in front of a session's transport adapter"""
+        with self._lock:
+            wrapped = self._adapters.get(adapter)
+            if wrapped is None:
+                wrapped = self._adapters[adapter] = CassetteAdapter(self, adapter)
+            return wrapped
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def load(path):
+    """(header, entries) of a cassette; a recording cut short by a killed process loads up to where it stopped"""
+    lines = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                lines.append(line)
+        except (EOFError, zlib.error):
+            pass
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    if not entries or entries[0].get('cassette') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} cassette")
+    return entries[0], entries[1:]
+
+class CassetteAdapter(requests.adapters.BaseAdapter):
+    """Transport adapter that records what the wrapped adapter sends and receives, or replays it"""
+    def __init__(self, cassette, inner):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+    
+    def send(self, request, **kwargs):
+        key = f"{request.method} {request.url}"
+        if request.body:
+            body = request.body.encode('utf-8') if isinstance(request.body, str) else request.body
+            if isinstance(body, bytes):
+                key += f" {hashlib.sha1(body).hexdigest()[:12]}"
+        return self.cassette.exchange('http', key, lambda: self.inner.send(request, **kwargs),
+                                      encode=encode_response,
+                                      decode=lambda value: self.build_response(request, value))
+    
+    def build_response(self, request, value):
+        response = requests.Response()
+        response.status_code = value['status']
+        response.reason = value['reason']
+        response.headers = CaseInsensitiveDict(value['headers'])
+        response.url = value['url']
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = decode_bytes(value['body'])
+        response._content_consumed = True
+        response.raw = io.BytesIO(response._content)
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(0)
+        return response
+    
+    def close(self):
+        self.inner.close()
+
+def encode_response(response) -> dict:
+    return {'status': response.status_code, 'reason': response.reason, 'url': response.url,
+            'headers': dict(response.headers), 'body': encode_bytes(response.content)}
+
+def encode_answer(answer) -> dict:
+    return {'qname': answer.qname.to_text(), 'rdtype': int(answer.rdtype), 'rdclass': int(answer.rdclass),
+            'wire': base64.b64encode(answer.response.to_wire()).decode('ascii')}
+
+def decode_answer(value):
+    return dns.resolver.Answer(dns.name.from_text(value['qname']), value['rdtype'], value['rdclass'],
+                               dns.message.from_wire(base64.b64decode(value['wire'])))
+
+_shared_cassette = None
+_shared_lock = threading.Lock()
+
+def get_cassette():
+    """Process-wide cassette from OSINT_CASSETTE and OSINT_CASSETTE_MODE; None when runs go to the network"""
+    global _shared_cassette
+    if _shared_cassette is not None:
+        return _shared_cassette
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    with _shared_lock:
+        if _shared_cassette is None:
+            _shared_cassette = Cassette(path, os.environ.get(MODE_ENV_VAR, 'replay'),
+                                        os.environ.get(TIMING_ENV_VAR, 'fast'))
+            if _shared_cassette.recording:
+                atexit.register(_shared_cassette.close)
+                # One writer per file: tools this process starts (a launcher's parallel
+                # children) would otherwise truncate and interleave the same cassette
+                os.environ.pop(ENV_VAR, None)
+                os.environ.pop(MODE_ENV_VAR, None)
+        return _shared_cassette
+
+def exchange(kind, key, fetch, encode=None, decode=None):
+    """fetch() through the run's cassette, or straight through without one"""
+    cassette = get_cassette()
+    if cassette is None:
+        return fetch()
+    return cassette.exchange(kind, key, fetch, encode, decode)
+
+def resolve(name, record_type, lifetime):
+    """dns.resolver.resolve through the cassette"""
+    return exchange('dns', f"{name} {record_type}",
+                    lambda: dns.resolver.resolve(name, record_type, lifetime=lifetime),
+                    encode=encode_answer, decode=decode_answer)
+
+def reverse_lookup(ip) -> str:
+    """socket.gethostbyaddr(ip)[0] through the cassette"""
+    return exchange('dns', f"{ip} PTR", lambda: socket.gethostbyaddr(ip)[0])
+
+def cassette_from_argv(argv):
+    """--record FILE or --replay FILE (with --replay-timing exact|fast) from a tool's argv"""
+    for flag, mode in (('--record', 'record'), ('--replay', 'replay')):
+        if flag in argv:
+            index = argv.index(flag)
+            if index + 1 < len(argv):
+                os.environ[ENV_VAR] = argv[index + 1]
+                os.environ[MODE_ENV_VAR] = mode
+    if '--replay-timing' in argv:
+        index = argv.index('--replay-timing')
+        if index + 1 < len(argv):
+            os.environ[TIMING_ENV_VAR] = argv[index + 1]
+    cassette = get_cassette()
+    if cassette is not None:
+        if cassette.recording:
+            print(f"📼 Recording every exchange of this process to {cassette.path}")
+        else:
+            print(f"📼 Replaying {cassette.path} ({cassette.timing} timing, no network)")
+    return cassette
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise what a cassette recorded")
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+    
+    header, entries = load(args.path)
+    print(f"📼 {args.path}  recorded {header.get('recorded', '?')}")
+    print(f"   Command: {' '.join(header.get('argv', []))}")
+    if not entries:
+        print("   (no exchanges)")
+        return
+    span = max(entry['t'] + entry['d'] for entry in entries)
+    print(f"   {len(entries)} exchanges over {span:.2f}s, {os.path.getsize(args.path) / 1024:.1f} KiB on disk")
+    
+    kinds = {}
+    for entry in entries:
+        stats = kinds.setdefault(entry['k'], {'count': 0, 'errors': 0, 'seconds': 0.0})
+        stats['count'] += 1
+        stats['errors'] += 'e' in entry
+        stats['seconds'] += entry['d']
+    for kind, stats in sorted(kinds.items()):
+        print(f"   {kind:<6} {stats['count']:>5} exchanges  {stats['errors']:>3} errors  "
+              f"{stats['seconds']:7.2f}s total")
+
+if __name__ == "__main__":
+    main()
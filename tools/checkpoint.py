@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Journal
+Append-only record of finished work units, so an interrupted job resumes where it stopped
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+try:
+    from tools.deadline import current_deadline, run_stages
+    from tools.perf import count
+except ImportError:
+    from deadline import current_deadline, run_stages
+    from perf import count
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECKPOINT_DIR = os.path.join(ROOT_DIR, 'reports', 'checkpoints')
+# Launchers export this so the tools they start journal under a job ID the launcher can reuse
+ENV_VAR = 'OSINT_JOB_ID'
+ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+# Journals started longer ago than this are discarded instead of resumed: launchers reuse one
+# job ID per tool and target, and WHOIS/DNS/profile results from days ago are not this run's
+MAX_JOURNAL_AGE = timedelta(hours=6)
+
+def safe_name(job_id) -> str:
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in job_id)
+
+class CheckpointJournal:
+    """Finished units of one job, journaled as JSON lines.
+    
+    The first line identifies the job (tool and target); every later line
+    is one finished unit and its result. Appends are flushed but not
+    fsynced: Android kills the process, not the kernel, so flushed lines
+    survive. A torn last line from a kill mid-write is ignored on load.
+    complete() compacts the journal into one summary file and removes
+    it, so the next run with the same job ID starts fresh; so does a
+    journal started more than max_age ago.
+    """
+    def __init__(self, job_id, tool, target, directory=CHECKPOINT_DIR, max_age=MAX_JOURNAL_AGE):
+        self.job_id = job_id
+        self.tool = tool
+        self.target = target
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+        safe_id = safe_name(job_id)
+        self.path = os.path.join(directory, f"{safe_id}.jsonl")
+        self.summary_path = os.path.join(directory, f"{safe_id}.json")
+        self._lock = threading.Lock()
+        self.done = {}
+        self.resumed = self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if not self.resumed:
+            self._write({'job': job_id, 'tool': tool, 'target': target,
+                         'started': datetime.now().isoformat()})
+    
+    def _load(self) -> bool:
+        """Read an unfinished journal for this job; False when there is nothing to resume"""
+        if not os.path.exists(self.path):
+            return False
+        lines = 0
+        torn = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if header.get('tool') != self.tool or header.get('target') != self.target:
+                print(f"⚠️  Checkpoint {self.job_id} belongs to {header.get('tool')} / {header.get('target')}; starting over")
+                os.remove(self.path)
+                return False
+            try:
+                age = datetime.now() - datetime.fromisoformat(header['started'])
+            except (KeyError, TypeError, ValueError):
+                age = None
+            if age is None or age > self.max_age:
+                started = header.get('started', 'an unknown time')
+                print(f"⚠️  Checkpoint {self.job_id} was started {started}; too old to resume, starting over")
+                os.remove(self.path)
+                return False
+            for line in f:
+                if not line.endswith('\n'):
+                    # Killed mid-write; appending after it would corrupt the next line too
+                    torn = True
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.done[entry['unit']] = entry['result']
+                lines += 1
+        if torn or lines > 2 * len(self.done):
+            self._compact(header)
+        return True
+    
+    def _compact(self, header):
+        """Rewrite the journal with one line per unit (units recorded more than once keep the last result)"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(ENCODER.encode(header) + '\n')
+            for unit, result in self.done.items():
+                f.write(ENCODER.encode({'unit': unit, 'result': result}) + '\n')
+        os.replace(tmp_path, self.path)
+    
+    def _write(self, entry):
+        self._file.write(ENCODER.encode(entry) + '\n')
+        self._file.flush()
+    
+    def __contains__(self, unit):
+        return unit in self.done
+    
+    def get(self, unit, default=None):
+        if unit in self.done:
+            # A unit restored from the journal is work this run did not have to redo
+            count({'cache': 'journal'}, cache_hits=1)
+        return self.done.get(unit, default)
+    
+    def record(self, unit, result):
+        """Journal a finished unit; only record results that should not be redone"""
+        with self._lock:
+            self.done[unit] = result
+            self._write({'unit': unit, 'result': result})
+    
+    def complete(self, summary=None):
+        """Compact the finished job into one summary file and drop the journal"""
+        with self._lock:
+            self._file.close()
+            tmp_path = f"{self.summary_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'job': self.job_id, 'tool': self.tool, 'target': self.target,
+                           'completed': datetime.now().isoformat(), 'units': len(self.done),
+                           'summary': summary}, f, indent=2, default=str)
+            os.replace(tmp_path, self.summary_path)
+            os.remove(self.path)
+    
+    def close(self):
+        """Stop journaling but keep the journal for a later resume"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+def run_journaled_stages(journal, stages, **kwargs) -> tuple:
+    """run_stages, skipping stages the journal already has and journaling each one that succeeds"""
+    if journal is None:
+        return run_stages(stages, **kwargs)
+    restored = {name: journal.get(f"stage:{name}") for name in stages if f"stage:{name}" in journal}
+    
+    def on_result(name, value):
+        # Failed lookups, and stages that may have been cut short by the deadline,
+        # are not journaled, so a resumed job runs them again
+        if not (isinstance(value, dict) and 'error' in value) and not current_deadline().expired():
+            journal.record(f"stage:{name}", value)
+    
+    results, status = run_stages({name: stage for name, stage in stages.items() if name not in restored},
+                                 on_result=on_result, **kwargs)
+    status['resumed'] = list(restored)
+    return {name: restored[name] if name in restored else results[name] for name in stages}, status
+
+def finish_journal(journal, report, report_id):
+    """Compact the journal once the job's report is whole; keep it for a resume otherwise"""
+    if journal is None:
+        return
+    if (report.get('_deadline') or {}).get('complete', True) and not report.get('incomplete'):
+        journal.complete({'report_id': report_id})
+    else:
+        journal.close()
+        print(f"⏸️  Report is incomplete; rerun with --job {journal.job_id} to resume")
+
+def default_job_id(tool, target) -> str:
+    """Job ID launchers use: the same tool and target resume the same job"""
+    slug = ''.join(c if c.isalnum() else '_' for c in tool.lower())
+    return f"{slug}-{hashlib.sha256(str(target).encode('utf-8')).hexdigest()[:12]}"
+
+def job_from_argv(argv):
+    """--job ID from a tool's argv, else the launcher's OSINT_JOB_ID"""
+    if '--job' in argv:
+        index = argv.index('--job')
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return os.environ.get(ENV_VAR) or None
+
+def open_journal(job_id, tool, target):
+    """Journal for job_id, or None when the run is not a resumable job"""
+    if not job_id:
+        return None
+    journal = CheckpointJournal(job_id, tool, target)
+    if journal.resumed:
+        print(f"♻️  Resuming job {job_id}: {len(journal.done)} units already done")
+    return journal
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List or clear checkpoint journals")
+    parser.add_argument('--clear', metavar='JOB', help="Delete the journal for JOB")
+    args = parser.parse_args(argv)
+    
+    if args.clear:
+        path = os.path.join(CHECKPOINT_DIR, f"{safe_name(args.clear)}.jsonl")
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"✅ Cleared {args.clear}")
+        else:
+            print(f"❌ No journal for {args.clear}")
+        return
+    
+    if not os.path.isdir(CHECKPOINT_DIR):
+        print("No checkpoints")
+        return
+    for name in sorted(os.listdir(CHECKPOINT_DIR)):
+        if not name.endswith('.jsonl'):
+            continue
+        with open(os.path.join(CHECKPOINT_DIR, name), 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline() or '{}')
+            units = sum(1 for _ in f)
+        print(f"{name[:-6]:<40} {header.get('tool')}  {header.get('target')}  {units} units  "
+              f"started {header.get('started')}")
+
+if __name__ == "__main__":
+    main()
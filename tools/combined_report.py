@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Combined Report Generator
+Merges stored per-tool reports for a target or session into one document
+"""
+import hashlib
+import html
+import json
+import os
+from datetime import datetime
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+FORMATS = {'json': '.json', 'html': '.html', 'markdown': '.md'}
+# Keys that differ between otherwise identical sub-results
+VOLATILE_KEYS = {'timestamp', 'generated', 'scan_time'}
+# Containers smaller than this (canonical JSON bytes) are never replaced by a reference
+MIN_DEDUPE_BYTES = 64
+# How deep inside a section repeated sub-results are looked for
+DEDUPE_DEPTH = 2
+
+def content_hash(data):
+    """Hash of the canonical JSON form, ignoring volatile keys"""
+    def strip(value):
+        if isinstance(value, dict):
+            return {key: strip(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+        if isinstance(value, list):
+            return [strip(item) for item in value]
+        return value
+    canonical = json.dumps(strip(data), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest(), len(canonical)
+
+class Deduplicator:
+    """Replaces sub-results already emitted elsewhere in the report with a reference"""
+    def __init__(self):
+        self.seen = {}
+        self.duplicates = 0
+        self.bytes_saved = 0
+    
+    def apply(self, data, location, depth=0):
+        if not isinstance(data, (dict, list)) or depth > DEDUPE_DEPTH:
+            return data
+        digest, size = content_hash(data)
+        if size >= MIN_DEDUPE_BYTES:
+            if digest in self.seen:
+                self.duplicates += 1
+                self.bytes_saved += size
+                return {'$ref': digest[:16], 'same_as': self.seen[digest]}
+            self.seen[digest] = location
+        if isinstance(data, dict):
+            return {key: self.apply(value, f"{location}.{key}", depth + 1) for key, value in data.items()}
+        return [self.apply(value, f"{location}[{i}]", depth + 1) for i, value in enumerate(data)]
+
+class JSONRenderer:
+    def begin(self, out, meta):
+        out.write('{\n"combined_report": ' + json.dumps(meta, default=str) + ',\n"sections": [\n')
+        self.first = True
+    
+    def section(self, out, report, name, data):
+        entry = {'report_id': report['id'], 'tool': report['tool'], 'target': report['target'],
+                 'timestamp': report['timestamp'], 'section': name, 'data': data}
+        out.write(('' if self.first else ',\n') + json.dumps(entry, default=str))
+        self.first = False
+    
+    def end(self, out, stats):
+        out.write('\n],\n"stats": ' + json.dumps(stats) + '\n}\n')
+
+class MarkdownRenderer:
+    def begin(self, out, meta):
+        out.write(f"# Combined OSINT Report: {meta['subject']}\n\n")
+        out.write(f"Generated: {meta['generated']}\n\n")
+        self.current = None
+    
+    def section(self, out, report, name, data):
+        if report['id'] != self.current:
+            self.current = report['id']
+            out.write(f"\n## {report['tool']} — {report['target']} (#{report['id']}, {report['timestamp']})\n")
+        out.write(f"\n### {name}\n\n")
+        if isinstance(data, dict) and '$ref' in data:
+            out.write(f"_Same as `{data['same_as']}`_\n")
+        else:
+            out.write("```json\n" + json.dumps(data, indent=2, default=str) + "\n```\n")
+    
+    def end(self, out, stats):
+        out.write(f"\n---\n\n{stats['reports']} reports, {stats['sections']} sections, "
+                  f"{stats['duplicates']} duplicate sub-results folded\n")
+
+class HTMLRenderer:
+    def begin(self, out, meta):
+        title = html.escape(f"Combined OSINT Report: {meta['subject']}")
+        out.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title>\n"
+                  "<style>body{font-family:sans-serif;margin:2em}pre{background:#f4f4f4;padding:1em;"
+                  "overflow:auto}.ref{color:#777}</style></head><body>\n")
+        out.write(f"<h1>{title}</h1>\n<p>Generated: {html.escape(meta['generated'])}</p>\n")
+        self.current = None
+    
+    def section(self, out, report, name, data):
+        if report['id'] != self.current:
+            self.current = report['id']
+            out.write(f"<h2>{html.escape(report['tool'])} — {html.escape(str(report['target']))} "
+                      f"(#{report['id']}, {html.escape(report['timestamp'])})</h2>\n")
+        if isinstance(data, dict) and '$ref' in data:
+            out.write(f"<h3>{html.escape(name)}</h3>\n<p class=\"ref\">Same as "
+                      f"<code>{html.escape(data['same_as'])}</code></p>\n")
+        else:
+            body = html.escape(json.dumps(data, indent=2, default=str))
+            out.write(f"<details open><summary><strong>{html.escape(name)}</strong></summary>"
+                      f"<pre>{body}</pre></details>\n")
+    
+    def end(self, out, stats):
+        out.write(f"<hr><p>{stats['reports']} reports, {stats['sections']} sections, "
+                  f"{stats['duplicates']} duplicate sub-results folded</p>\n</body></html>\n")
+
+RENDERERS = {'json': JSONRenderer, 'html': HTMLRenderer, 'markdown': MarkdownRenderer}
+
+def generate_combined_report(target=None, session_id=None, fmt='json', output_path=None, store=None) -> dict:
+    """Stream every stored section for a target or session into one rendered file.
+    
+    Sections are read, de-duplicated and written one at a time, so memory
+    stays flat however many reports are merged; only section hashes are kept.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown format {fmt}; choose from {', '.join(RENDERERS)}")
+    store = store or get_report_store()
+    subject = target or f"session {session_id}"
+    if output_path is None:
+        slug = ''.join(c if c.isalnum() else '_' for c in str(target or session_id))
+        output_path = f"reports/combined_{slug}_{int(datetime.now().timestamp())}{FORMATS[fmt]}"
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    
+    renderer = RENDERERS[fmt]()
+    dedupe = Deduplicator()
+    stats = {'reports': 0, 'sections': 0}
+    last_report = None
+    tmp_path = f"{output_path}.tmp"
+    
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        renderer.begin(out, {'subject': subject, 'target': target, 'session_id': session_id,
+                             'generated': datetime.now().isoformat()})
+        for report, name, data in store.iter_sections(target=target, session_id=session_id):
+            if report['id'] != last_report:
+                last_report = report['id']
+                stats['reports'] += 1
+            stats['sections'] += 1
+            renderer.section(out, report, name, dedupe.apply(data, f"#{report['id']}.{name}"))
+        stats.update(duplicates=dedupe.duplicates, bytes_saved=dedupe.bytes_saved)
+        renderer.end(out, stats)
+    os.replace(tmp_path, output_path)
+    
+    stats['output'] = output_path
+    return stats
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Report Deadlines
+One time budget per report run, visible to every stage and child process
+"""
+import contextvars
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from tools.events import emit
+    from tools.governor import get_governor
+    from tools.perf import span
+except ImportError:
+    from events import emit
+    from governor import get_governor
+    from perf import span
+
+# Absolute wall-clock deadline (unix seconds) handed to child tool processes
+ENV_VAR = 'OSINT_DEADLINE'
+# Smallest timeout handed to a network call, so a nearly-spent budget still
+# fails fast with a timeout instead of a zero/negative argument
+MIN_TIMEOUT = 0.05
+
+class DeadlineExceeded(Exception):
+    """The run's time budget is spent"""
+
+class Deadline:
+    """A fixed point in time; an unbounded deadline never expires"""
+    def __init__(self, budget=None, at=None):
+        if at is None and budget is not None:
+            at = time.time() + budget
+        self.at = at
+        self.budget = budget
+    
+    def remaining(self) -> float:
+        return math.inf if self.at is None else self.at - time.time()
+    
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+    
+    def timeout(self, cap):
+        """cap, shortened to the remaining budget; raises once the budget is spent"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        return max(MIN_TIMEOUT, min(cap, remaining)) if cap is not None else remaining
+    
+    def env(self, grace=0.0) -> dict:
+        """Environment for a child process that should finish before we stop waiting on it"""
+        env = dict(os.environ)
+        if self.at is not None:
+            env[ENV_VAR] = repr(self.at - grace)
+        return env
+
+UNBOUNDED = Deadline()
+_ABANDONED = object()
+_current = contextvars.ContextVar('osint_deadline', default=None)
+# Set per stage by run_stages; records that a call had its timeout cut short
+_clipped = contextvars.ContextVar('osint_clipped', default=None)
+
+def current_deadline() -> Deadline:
+    """Innermost deadline_scope, else the one inherited from a parent process, else unbounded"""
+    deadline = _current.get()
+    if deadline is not None:
+        return deadline
+    inherited = os.environ.get(ENV_VAR)
+    if inherited:
+        try:
+            return Deadline(at=float(inherited))
+        except ValueError:
+            pass
+    return UNBOUNDED
+
+@contextmanager
+def deadline_scope(budget=None):
+    """Run the block under a budget; nested scopes can only shorten the outer deadline"""
+    outer = current_deadline()
+    deadline = outer
+    if budget is not None:
+        candidate = Deadline(budget)
+        if candidate.remaining() < outer.remaining():
+            deadline = candidate
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+def stage_timeout(cap):
+    """Per-call timeout: the call's own cap, never beyond the current run's deadline"""
+    clipped = _clipped.get()
+    try:
+        timeout = current_deadline().timeout(cap)
+    except DeadlineExceeded:
+        # Stages usually turn exceptions into error dicts; remember why
+        if clipped is not None:
+            clipped.append(cap)
+        raise
+    if clipped is not None and cap is not None and timeout < cap:
+        # The stage may swallow the resulting timeout, so remember its data can be partial
+        clipped.append(cap)
+    return timeout
+
+def wait_budget(cap) -> float:
+    """Like stage_timeout for optional waits: shortened to what is left, 0 once spent, never raises"""
+    return max(0.0, min(cap, current_deadline().remaining()))
+
+def run_stages(stages, max_workers=None, on_result=None) -> tuple:
+    """Run independent report stages concurrently under the current deadline.
+    
+    stages maps a name to a zero-argument callable. Returns (results,
+    status): stages still running at the deadline are abandoned (their
+    daemon threads are bounded by stage_timeout anyway) and get an error
+    placeholder; status is the '_deadline' section listing what is missing
+    and which stages ran with timeouts cut short by the budget.
+    on_result(name, value) is called from the worker as each stage finishes,
+    so results can be checkpointed before the whole run is over. Without
+    max_workers the power governor's worker count is used, re-read before
+    each stage starts so a run slows down when the phone leaves Wi-Fi.
+    """
+    deadline = current_deadline()
+    results = {}
+    partial = []
+    done = threading.Condition()
+    pending = list(stages.items())
+    running = []
+    closed = False
+    
+    def worker(name, stage):
+        clipped = []
+        _clipped.set(clipped)
+        started = time.perf_counter()
+        emit('stage_started', stage=name)
+        try:
+            with span(name):
+                value = stage()
+        except DeadlineExceeded:
+            value = _ABANDONED
+        except Exception as e:
+            value = {'error': str(e)}
+        if on_result is not None and value is not _ABANDONED:
+            on_result(name, value)
+        with done:
+            running.remove(name)
+            if closed:
+                return
+            if value is not _ABANDONED:
+                results[name] = value
+                failed = isinstance(value, dict) and 'error' in value
+                if failed:
+                    emit('error', stage=name, message=str(value['error']))
+                emit('stage_finished', stage=name, status='error' if failed else 'ok',
+                     seconds=round(time.perf_counter() - started, 3))
+                # A shortened timeout only cost data if the budget ran out while the stage ran
+                if clipped and deadline.expired():
+                    partial.append(name)
+            done.notify_all()
+    
+    with done:
+        while pending or running:
+            while pending and len(running) < get_governor().workers(max_workers) and not deadline.expired():
+                name, stage = pending.pop(0)
+                running.append(name)
+                context = contextvars.copy_context()
+                threading.Thread(target=context.run, args=(worker, name, stage),
+                                 name=f"stage-{name}", daemon=True).start()
+            if deadline.expired():
+                break
+            done.wait(None if deadline.at is None else max(0.0, deadline.remaining()))
+        
+        closed = True
+        missing = [name for name in stages if name not in results]
+        for name in missing:
+            emit('stage_finished', stage=name, status='incomplete')
+        placeholder = {'error': 'deadline exceeded', 'incomplete': True}
+        # Same key order as stages, so reports read the same however the race went
+        results = {name: results.get(name, dict(placeholder)) for name in stages}
+        status = {
+            'budget': deadline.budget,
+            'complete': not missing and not partial,
+            'missing': missing,
+            'partial': list(partial)
+        }
+    return results, status
+
+def merge_status(*statuses) -> dict:
+    """Combine stage statuses from nested runs into one '_deadline' section"""
+    merged = {'budget': None, 'complete': True, 'missing': [], 'partial': []}
+    for status in statuses:
+        if not status:
+            continue
+        merged['budget'] = merged['budget'] or status.get('budget')
+        merged['complete'] = merged['complete'] and status.get('complete', True)
+        merged['missing'] += status.get('missing', [])
+        merged['partial'] += status.get('partial', [])
+        if 'resumed' in status:
+            merged.setdefault('resumed', []).extend(status['resumed'])
+    return merged
+
+def partial_result(script, error) -> dict:
+    """Report for a child tool stopped by subprocess.TimeoutExpired, from what it printed so far"""
+    def text(value):
+        # TimeoutExpired carries bytes even for text-mode pipes on some Pythons
+        return value.decode('utf-8', 'replace') if isinstance(value, bytes) else (value or '')
+    return {
+        'script': script,
+        'returncode': None,
+        'events': getattr(error, 'events', []),
+        'stdout': text(error.stdout),
+        'stderr': text(error.stderr),
+        'incomplete': True,
+        'error': f"deadline exceeded after {error.timeout:.1f}s"
+    }
+
+def budget_from_argv(argv, default=None):
+    """--deadline SECONDS from a tool's argv"""
+    if '--deadline' in argv:
+        index = argv.index('--deadline')
+        if index + 1 < len(argv):
+            return float(argv[index + 1])
+    return default
@@ -4,15 +4,77 @@ Email and Domain OSINT Tool
 Educational and authorized use only
 """
 import re
-import requests
-import whois
 import dns.resolver
-import json
+import sys
 from datetime import datetime
 
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+try:
+    from tools.incremental import IncrementalScanner, record_ttl, print_diff, HOUR, DAY
+except ImportError:
+    from incremental import IncrementalScanner, record_ttl, print_diff, HOUR, DAY
+
+try:
+    from tools.deadline import deadline_scope, merge_status, stage_timeout, budget_from_argv
+except ImportError:
+    from deadline import deadline_scope, merge_status, stage_timeout, budget_from_argv
+
+try:
+    from tools.checkpoint import run_journaled_stages, open_journal, finish_journal, job_from_argv
+except ImportError:
+    from checkpoint import run_journaled_stages, open_journal, finish_journal, job_from_argv
+
+try:
+    from tools.events import emit
+except ImportError:
+    from events import emit
+
+try:
+    from tools.governor import get_governor
+except ImportError:
+    from governor import get_governor
+
+try:
+    from tools.rate_limiter import RateLimitedSession
+except ImportError:
+    from rate_limiter import RateLimitedSession
+
+try:
+    from tools.whois_lookup import domain_whois, QUERY_TIMEOUT
+except ImportError:
+    from whois_lookup import domain_whois, QUERY_TIMEOUT
+
+try:
+    from tools.cassette import resolve as cassette_resolve, cassette_from_argv
+except ImportError:
+    from cassette import resolve as cassette_resolve, cassette_from_argv
+
+try:
+    from tools.perf import instrumented, count, timed, enable_from_argv, print_flame
+except ImportError:
+    from perf import instrumented, count, timed, enable_from_argv, print_flame
+
+# Per-query resolver lifetime (dnspython's default), shortened by the run's deadline
+DNS_LIFETIME = 5
+
+def resolve(name, record_type):
+    """One DNS query under the run's deadline, counted as a request"""
+    count({'host': 'dns'}, requests=1)
+    with timed('request_seconds', host='dns'):
+        return cassette_resolve(name, record_type, stage_timeout(DNS_LIFETIME))
+
 class EmailDomainOSINT:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = RateLimitedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -37,23 +99,47 @@ class EmailDomainOSINT:
         
         return result
     
-    def analyze_domain(self, domain: str) -> dict:
+    @instrumented('analyze_domain')
+    def analyze_domain(self, domain: str, incremental: bool = False, journal=None) -> dict:
         """Comprehensive domain analysis"""
+        if incremental:
+            return self.analyze_domain_incremental(domain)
+        
+        sections, status = run_journaled_stages(journal, {
+            'whois_info': lambda: self.get_whois_info(domain),
+            'dns_records': lambda: self.get_dns_records(domain),
+            'mx_records': lambda: self.get_mx_records(domain),
+            'subdomains': lambda: self.find_common_subdomains(domain, journal),
+            'security_headers': lambda: self.check_security_headers(domain)
+        })
         analysis = {
             'domain': domain,
-            'whois_info': self.get_whois_info(domain),
-            'dns_records': self.get_dns_records(domain),
-            'mx_records': self.get_mx_records(domain),
-            'subdomains': self.find_common_subdomains(domain),
-            'security_headers': self.check_security_headers(domain)
+            **sections,
+            '_deadline': status
         }
         
         return analysis
     
+    def analyze_domain_incremental(self, domain: str) -> dict:
+        """Refresh only expired sections of the last stored analysis (WHOIS daily, DNS by record TTL, headers hourly)"""
+        ttls = {}
+        sections = {
+            'domain': (lambda: domain, None),
+            'whois_info': (lambda: self.get_whois_info(domain), DAY),
+            'dns_records': (lambda: self.get_dns_records(domain, ttls),
+                            record_ttl(ttls, ['A', 'AAAA', 'CNAME', 'TXT', 'NS'], HOUR)),
+            'mx_records': (lambda: self.get_mx_records(domain, ttls), record_ttl(ttls, ['MX'], HOUR)),
+            'subdomains': (lambda: self.find_common_subdomains(domain), DAY),
+            'security_headers': (lambda: self.check_security_headers(domain), HOUR)
+        }
+        return IncrementalScanner("Email Domain OSINT").run(domain, sections)
+    
     def get_whois_info(self, domain: str) -> dict:
         """Get WHOIS information"""
+        count({'host': 'whois'}, requests=1)
         try:
-            w = whois.whois(domain)
+            with timed('request_seconds', host='whois'):
+                w = domain_whois(domain, timeout=stage_timeout(QUERY_TIMEOUT))
             return {
                 'registrar': str(w.registrar) if w.registrar else None,
                 'creation_date': str(w.creation_date) if w.creation_date else None,
@@ -65,47 +151,63 @@ class EmailDomainOSINT:
         except Exception as e:
             return {'error': f"WHOIS lookup failed: {e}"}
     
-    def get_dns_records(self, domain: str) -> dict:
-        """Get DNS records"""
+    def get_dns_records(self, domain: str, ttls: dict = None) -> dict:
+        """Get DNS records; answer TTLs are recorded in ttls when given"""
         records = {}
         record_types = ['A', 'AAAA', 'CNAME', 'TXT', 'NS']
         
         for record_type in record_types:
             try:
-                answers = dns.resolver.resolve(domain, record_type)
+                answers = resolve(domain, record_type)
                 records[record_type] = [str(rdata) for rdata in answers]
+                if ttls is not None:
+                    ttls[record_type] = answers.rrset.ttl
             except:
                 records[record_type] = []
         
         return records
     
-    def get_mx_records(self, domain: str) -> list:
+    def get_mx_records(self, domain: str, ttls: dict = None) -> list:
         """Get MX records for email servers"""
         try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
+            mx_records = resolve(domain, 'MX')
+            if ttls is not None:
+                ttls['MX'] = mx_records.rrset.ttl
             return [{'priority': mx.preference, 'server': str(mx.exchange)} for mx in mx_records]
         except:
             return []
     
-    def find_common_subdomains(self, domain: str) -> list:
-        """Check for common subdomains"""
+    def find_common_subdomains(self, domain: str, journal=None) -> list:
+        """Check for common subdomains; names already resolved in the job's journal are not re-queried"""
         common_subs = ['www', 'mail', 'ftp', 'admin', 'api', 'blog', 'dev', 'test', 'staging']
         found_subdomains = []
         
         for sub in common_subs:
+            subdomain = f"{sub}.{domain}"
+            if journal is not None and f"subdomain:{subdomain}" in journal:
+                if journal.get(f"subdomain:{subdomain}"):
+                    found_subdomains.append(subdomain)
+                    emit('record_found', kind='subdomain', value=subdomain)
+                continue
             try:
-                subdomain = f"{sub}.{domain}"
-                dns.resolver.resolve(subdomain, 'A')
+                resolve(subdomain, 'A')
                 found_subdomains.append(subdomain)
+                emit('record_found', kind='subdomain', value=subdomain)
+                exists = True
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                exists = False
             except:
-                pass
+                # Timeouts and resolver failures are retried on resume
+                continue
+            if journal is not None:
+                journal.record(f"subdomain:{subdomain}", exists)
         
         return found_subdomains
     
     def check_security_headers(self, domain: str) -> dict:
         """Check security headers"""
         try:
-            response = self.session.get(f"https://{domain}", timeout=10)
+            response = self.session.get(f"https://{domain}", timeout=stage_timeout(10))
             headers = response.headers
             
             security_headers = {
@@ -137,7 +239,8 @@ class EmailDomainOSINT:
             'privacy_note': 'Most platforms protect email privacy'
         }
     
-    def generate_email_report(self, email: str) -> dict:
+    @instrumented('generate_email_report')
+    def generate_email_report(self, email: str, journal=None) -> dict:
         """Generate comprehensive email OSINT report"""
         print(f"\n{'='*60}")
         print(f"EMAIL & DOMAIN OSINT REPORT")
@@ -161,7 +264,8 @@ class EmailDomainOSINT:
         # Domain analysis if email is valid
         if email_validation['is_valid_format']:
             domain = email_validation['domain']
-            report['domain_analysis'] = self.analyze_domain(domain)
+            report['domain_analysis'] = self.analyze_domain(domain, journal=journal)
+            report['_deadline'] = merge_status(report['domain_analysis'].pop('_deadline', None))
         
         self.display_email_report(report)
         return report
@@ -191,27 +295,38 @@ def main():
     print("Email & Domain OSINT Tool")
     print("Educational and authorized use only!")
     
-    consent = input("\nDo you have permission to analyze this email/domain? (yes/no): ")
-    if consent.lower() != 'yes':
+    target = input("Enter email address or domain: ")
+    if not authorize("Email Domain OSINT", target, "\nDo you have permission to analyze this email/domain? (yes/no): "):
         print("Exiting - proper authorization required")
         return
     
-    target = input("Enter email address or domain: ")
-    
     osint = EmailDomainOSINT()
     
-    if '@' in target:
-        report = osint.generate_email_report(target)
-        filename = f"email_report_{target.replace('@', '_at_').replace('.', '_')}.json"
-    else:
-        report = osint.analyze_domain(target)
-        filename = f"domain_report_{target.replace('.', '_')}.json"
+    # python tools/email_domain_osint.py --incremental|--fresh (domains only) --deadline 60 --job ID --perf
+    #   --record FILE | --replay FILE [--replay-timing exact]
+    enable_from_argv(sys.argv[1:])
+    cassette_from_argv(sys.argv[1:])
+    incremental = '--incremental' in sys.argv[1:]
+    if not incremental and '--fresh' not in sys.argv[1:] and '@' not in target and get_governor().prefer_cache():
+        print(f"🔋 {get_governor().profile()} power profile: reusing cached sections (--fresh to refetch)")
+        incremental = True
+    # Incremental runs reuse the stored report instead of a checkpoint journal
+    journal = None if incremental else open_journal(job_from_argv(sys.argv[1:]), "Email Domain OSINT", target)
+    
+    with deadline_scope(budget_from_argv(sys.argv[1:])):
+        if '@' in target:
+            report = osint.generate_email_report(target, journal=journal)
+        else:
+            report = osint.analyze_domain(target, incremental=incremental, journal=journal)
+            if incremental:
+                print_diff(report)
+    print_flame(report)
     
     # Save report
-    with open(filename, 'w') as f:
-        json.dump(report, f, indent=2, default=str)
+    report_id = get_report_store().save_report("Email Domain OSINT", target, report)
+    finish_journal(journal, report, report_id)
     
-    print(f"\nReport saved to {filename}")
+    print(f"\nReport saved as #{report_id} (python tools/report_store.py show {report_id})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Event Bus
+Typed progress and result events from tools, rendered as JSON Lines or terminal lines
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    from tools.perf import span
+except ImportError:
+    from perf import span
+
+# A launcher passes the write end of a pipe in this variable; the tool streams JSON Lines into it
+FD_ENV_VAR = 'OSINT_EVENT_FD'
+# Or a file path to append JSON Lines to
+LOG_ENV_VAR = 'OSINT_EVENT_LOG'
+EVENT_TYPES = ('stage_started', 'stage_finished', 'record_found', 'error', 'result')
+ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+
+class EventBus:
+    """Synchronous in-process publish/subscribe.
+    
+    emit() builds one dict per event (type, seq, time, bound fields such
+    as tool and target, then the event's own fields) and hands it to each
+    subscriber in order under a lock, so renderers never interleave lines.
+    With no subscribers an emit costs one dict and a lock.
+    """
+    def __init__(self):
+        self.subscribers = []
+        self.context = {}
+        self.seq = 0
+        self._lock = threading.Lock()
+    
+    def subscribe(self, handler):
+        with self._lock:
+            self.subscribers.append(handler)
+        return handler
+    
+    def unsubscribe(self, handler):
+        with self._lock:
+            if handler in self.subscribers:
+                self.subscribers.remove(handler)
+    
+    def bind(self, **fields):
+        """Fields added to every later event (tool, target)"""
+        self.context.update(fields)
+    
+    def emit(self, event_type, **fields):
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type {event_type}")
+        with self._lock:
+            if not self.subscribers:
+                return None
+            self.seq += 1
+            event = {'type': event_type, 'seq': self.seq, 'time': datetime.now().isoformat(),
+                     **self.context, **fields}
+            for handler in self.subscribers:
+                try:
+                    handler(event)
+                except Exception:
+                    # A broken consumer (closed pipe) must never fail the tool
+                    pass
+        return event
+    
+    def forward(self, event, **fields):
+        """Re-publish an event received from a child tool, tagged with fields (which tool sent it)"""
+        with self._lock:
+            event = {**event, **fields}
+            for handler in self.subscribers:
+                try:
+                    handler(event)
+                except Exception:
+                    pass
+        return event
+    
+    @contextmanager
+    def stage(self, name, **fields):
+        """stage_started/stage_finished around a block; an exception also emits an error"""
+        started = time.perf_counter()
+        self.emit('stage_started', stage=name, **fields)
+        try:
+            yield
+        except Exception as e:
+            self.emit('error', stage=name, message=str(e))
+            self.emit('stage_finished', stage=name, status='error',
+                      seconds=round(time.perf_counter() - started, 3), **fields)
+            raise
+        self.emit('stage_finished', stage=name, status='ok',
+                  seconds=round(time.perf_counter() - started, 3), **fields)
+
+class JSONLRenderer:
+    """One JSON object per line, flushed per event so readers see it immediately"""
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def __call__(self, event):
+        self.stream.write(ENCODER.encode(event) + '\n')
+        self.stream.flush()
+
+class TerminalRenderer:
+    """Short human-readable lines; prefix=True labels each line with the tool (or launcher source) it came from"""
+    def __init__(self, stream=None, prefix=False, show_stages=True):
+        self.stream = stream or sys.stdout
+        self.prefix = prefix
+        self.show_stages = show_stages
+    
+    def format(self, event):
+        kind = event['type']
+        if kind == 'stage_started':
+            return f"… {event['stage']}" if self.show_stages else None
+        if kind == 'stage_finished':
+            if event.get('status') == 'ok' and not self.show_stages:
+                return None
+            mark = {'ok': '✓', 'error': '❌', 'incomplete': '⏱️ '}.get(event.get('status'), '•')
+            return f"{mark} {event['stage']} ({event.get('seconds', 0):.1f}s)"
+        if kind == 'record_found':
+            return f"★ {event.get('kind', 'record')}: {event.get('value')}"
+        if kind == 'error':
+            where = f"{event['stage']}: " if event.get('stage') else ''
+            return f"❌ {where}{event.get('message')}"
+        if kind == 'result':
+            return f"📄 report #{event.get('report_id')} saved ({event.get('tool')})"
+        return None
+    
+    def __call__(self, event):
+        line = self.format(event)
+        if line is None:
+            return
+        label = event.get('source') or event.get('tool')
+        if self.prefix and label:
+            line = f"[{label}] {line}"
+        self.stream.write(f"   {line}\n")
+        self.stream.flush()
+
+_shared_bus = None
+_shared_lock = threading.Lock()
+
+def get_event_bus() -> EventBus:
+    """Process-wide bus; streams JSON Lines to OSINT_EVENT_FD / OSINT_EVENT_LOG when a launcher asks"""
+    global _shared_bus
+    with _shared_lock:
+        if _shared_bus is None:
+            _shared_bus = EventBus()
+            fd = os.environ.get(FD_ENV_VAR)
+            path = os.environ.get(LOG_ENV_VAR)
+            try:
+                if fd:
+                    _shared_bus.subscribe(JSONLRenderer(os.fdopen(int(fd), 'w', encoding='utf-8')))
+                elif path:
+                    _shared_bus.subscribe(JSONLRenderer(open(path, 'a', encoding='utf-8')))
+            except (OSError, ValueError):
+                pass
+        return _shared_bus
+
+def emit(event_type, **fields):
+    return get_event_bus().emit(event_type, **fields)
+
+@contextmanager
+def stage(name, **fields):
+    """A named report stage: stage events plus a perf span"""
+    with span(name), get_event_bus().stage(name, **fields):
+        yield
+
+def run_with_events(args, input_data=None, env=None, timeout=None, on_event=None):
+    """subprocess.run for a tool, reading its events from a pipe while it runs.
+    
+    Returns a CompletedProcess with an extra .events list. On timeout the
+    child is killed and subprocess.TimeoutExpired is raised with stdout,
+    stderr and .events holding everything received so far.
+    """
+    read_fd, write_fd = os.pipe()
+    env = dict(env if env is not None else os.environ, **{FD_ENV_VAR: str(write_fd)})
+    process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, env=env, pass_fds=(write_fd,))
+    os.close(write_fd)
+    events = []
+    
+    def pump():
+        with os.fdopen(read_fd, 'r', encoding='utf-8') as stream:
+            for line in stream:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                events.append(event)
+                if on_event is not None:
+                    on_event(event)
+    
+    reader = threading.Thread(target=pump, name='event-pump', daemon=True)
+    reader.start()
+    try:
+        stdout, stderr = process.communicate(input_data, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        process.kill()
+        e.stdout, e.stderr = process.communicate()
+        reader.join(1)
+        e.events = events
+        raise
+    reader.join(1)
+    result = subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+    result.events = events
+    return result
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Power and Network Governor
+Picks worker concurrency, byte budgets and cache preference from battery and Wi-Fi state
+"""
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import requests
+
+# Profile settings: workers is the concurrency cap, byte_budget the bytes one process
+# may download (None = unlimited), ttl_scale stretches incremental-scan TTLs
+PROFILES = {
+    'performance': {'workers': 8, 'byte_budget': None, 'ttl_scale': 1, 'prefer_cache': False},
+    'balanced': {'workers': 4, 'byte_budget': 50 * 1024 * 1024, 'ttl_scale': 1, 'prefer_cache': False},
+    'saver': {'workers': 2, 'byte_budget': 5 * 1024 * 1024, 'ttl_scale': 4, 'prefer_cache': True},
+    'critical': {'workers': 1, 'byte_budget': 1024 * 1024, 'ttl_scale': 12, 'prefer_cache': True}
+}
+# Forces a profile (benchmarks, desktops, or a user who knows better)
+PROFILE_ENV_VAR = 'OSINT_POWER_PROFILE'
+# Per-process byte budget handed down by a launcher that splits its own budget
+BUDGET_ENV_VAR = 'OSINT_BYTE_BUDGET'
+# Seconds between device readings; readings are taken in the background after the first
+REFRESH_INTERVAL = 60
+PROBE_TIMEOUT = 3
+PROBES = {
+    'battery': ['termux-battery-status'],
+    'wifi': ['termux-wifi-connectioninfo']
+}
+
+class ByteBudgetExceeded(requests.exceptions.RequestException):
+    """This run has downloaded as much as the current power profile allows"""
+
+def choose_profile(battery=None, charging=None, network=None) -> str:
+    """Profile for a reading; unknown readings (not on Termux) get 'balanced'"""
+    if battery is None:
+        return 'balanced' if network != 'wifi' else 'performance'
+    if charging:
+        return 'performance' if network == 'wifi' else 'balanced'
+    if battery < 10:
+        return 'critical'
+    if battery < 20:
+        return 'saver'
+    if network == 'wifi':
+        return 'performance' if battery >= 50 else 'balanced'
+    return 'balanced' if battery >= 50 else 'saver'
+
+def read_conditions(battery_info, wifi_info) -> dict:
+    """Normalize termux-battery-status / termux-wifi-connectioninfo output"""
+    conditions = {'battery': None, 'charging': None, 'network': 'unknown'}
+    if isinstance(battery_info, dict) and battery_info.get('percentage') is not None:
+        conditions['battery'] = battery_info['percentage']
+        conditions['charging'] = battery_info.get('status') in ('CHARGING', 'FULL') or \
+            battery_info.get('plugged', 'UNPLUGGED') != 'UNPLUGGED'
+    if isinstance(wifi_info, dict):
+        connected = wifi_info.get('supplicant_state') == 'COMPLETED' and \
+            wifi_info.get('ip') not in (None, '', '0.0.0.0')
+        # Not on Wi-Fi but the API answered: assume mobile data, the expensive case
+        conditions['network'] = 'wifi' if connected else 'mobile'
+    return conditions
+
+def probe_termux() -> dict:
+    """Battery and Wi-Fi readings straight from termux-api (None where unavailable)"""
+    readings = {}
+    for name, command in PROBES.items():
+        readings[name] = None
+        if shutil.which(command[0]) is None:
+            continue
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+            readings[name] = json.loads(result.stdout)
+        except Exception:
+            pass
+    return readings
+
+class Governor:
+    """Current power profile for this process, re-read as the device's state changes.
+    
+    The first reading is taken synchronously; after that a stale reading is
+    refreshed on a daemon thread and callers keep the last profile until it
+    lands, so asking for the worker count never blocks a run. Bytes counted
+    with charge() are checked against the profile's budget, which can shrink
+    mid-run when the phone leaves Wi-Fi or the battery drops.
+    """
+    def __init__(self, reader=None, refresh_interval=REFRESH_INTERVAL):
+        self.reader = reader or probe_termux
+        self.refresh_interval = refresh_interval
+        self.forced = os.environ.get(PROFILE_ENV_VAR) or None
+        budget = os.environ.get(BUDGET_ENV_VAR)
+        self.budget_override = int(budget) if budget else None
+        self.bytes_used = 0
+        # Long-running processes (the monitor) set this so the budget applies per window, not per life
+        self.budget_window = None
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+        self._first_read = threading.Lock()
+        self._conditions = None
+        self._profile = None
+        self._read_at = None
+        self._refreshing = False
+    
+    def use_device_context(self, context):
+        """Read from a shared DeviceContext (TermuxOSINTBase) instead of probing separately"""
+        self.reader = lambda: context.snapshot(wait_for=tuple(PROBES), timeout=PROBE_TIMEOUT)
+        self._read_at = None
+    
+    def _read(self):
+        try:
+            readings = self.reader() or {}
+        except Exception:
+            readings = {}
+        conditions = read_conditions(readings.get('battery'), readings.get('wifi'))
+        profile = self.forced if self.forced in PROFILES else choose_profile(**conditions)
+        with self._lock:
+            previous = self._profile
+            self._conditions = conditions
+            self._profile = profile
+            self._read_at = time.monotonic()
+            self._refreshing = False
+        if previous is not None and previous != profile:
+            print(f"⚙️  Power profile {previous} → {profile} ({describe(conditions)})")
+    
+    def _ensure_fresh(self):
+        if self._read_at is None:
+            # Nothing to fall back on yet: the first caller reads, the rest wait for it
+            with self._first_read:
+                if self._read_at is None:
+                    self._read()
+            return
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._read_at < self.refresh_interval:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._read, name='governor-probe', daemon=True).start()
+    
+    def profile(self) -> str:
+        self._ensure_fresh()
+        return self._profile
+    
+    def settings(self) -> dict:
+        return PROFILES[self.profile()]
+    
+    def conditions(self) -> dict:
+        self._ensure_fresh()
+        return dict(self._conditions)
+    
+    def workers(self, cap=None) -> int:
+        """Concurrency for the next unit of work (re-evaluated on every call)"""
+        workers = self.settings()['workers']
+        return max(1, min(workers, cap)) if cap is not None else workers
+    
+    def prefer_cache(self) -> bool:
+        return self.settings()['prefer_cache']
+    
+    def ttl_scale(self) -> float:
+        return self.settings()['ttl_scale']
+    
+    def byte_budget(self):
+        budget = self.settings()['byte_budget']
+        if self.budget_override is not None:
+            budget = self.budget_override if budget is None else min(budget, self.budget_override)
+        return budget
+    
+    def _roll_window(self):
+        if self.budget_window is not None and time.monotonic() - self._window_start >= self.budget_window:
+            self.bytes_used = 0
+            self._window_start = time.monotonic()
+    
+    def check_budget(self):
+        """Raise ByteBudgetExceeded once this process has used up its budget"""
+        with self._lock:
+            self._roll_window()
+        budget = self.byte_budget()
+        if budget is not None and self.bytes_used >= budget:
+            raise ByteBudgetExceeded(f"byte budget of {budget} bytes used up ({self.profile()} profile)")
+    
+    def charge(self, nbytes):
+        with self._lock:
+            self._roll_window()
+            self.bytes_used += nbytes
+    
+    def summary(self) -> dict:
+        return {'profile': self.profile(), 'conditions': self.conditions(),
+                'bytes_used': self.bytes_used, 'byte_budget': self.byte_budget()}
+
+def describe(conditions) -> str:
+    if conditions['battery'] is None:
+        return f"no battery reading, {conditions['network']}"
+    state = 'charging' if conditions['charging'] else 'on battery'
+    return f"{conditions['battery']}% {state}, {conditions['network']}"
+
+_shared_governor = None
+_shared_lock = threading.Lock()
+
+def get_governor() -> Governor:
+    """Process-wide governor (OSINT_POWER_PROFILE forces a profile)"""
+    global _shared_governor
+    with _shared_lock:
+        if _shared_governor is None:
+            _shared_governor = Governor()
+        return _shared_governor
+
+def main():
+    governor = get_governor()
+    settings = governor.settings()
+    print(f"⚙️  Profile: {governor.profile()} ({describe(governor.conditions())})")
+    print(f"   Workers: {settings['workers']}")
+    budget = governor.byte_budget()
+    print(f"   Byte budget: {'unlimited' if budget is None else f'{budget // 1024} KiB'}")
+    print(f"   Prefer cached data: {settings['prefer_cache']} (TTL x{settings['ttl_scale']})")
+
+if __name__ == "__main__":
+    main()
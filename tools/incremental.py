@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Incremental Re-scan
+Refreshes only the report sections whose TTL has expired and diffs the result
+"""
+from datetime import datetime, timedelta
+
+try:
+    from tools.report_store import get_report_store
+    from tools.governor import get_governor
+    from tools.deadline import run_stages
+    from tools.perf import count
+except ImportError:
+    from report_store import get_report_store
+    from governor import get_governor
+    from deadline import run_stages
+    from perf import count
+
+HOUR = 3600
+DAY = 24 * HOUR
+# Failed lookups, and ones cut short by the run's deadline, are retried sooner than their section's normal TTL
+ERROR_TTL = 300
+# Upper bound for TTLs taken from DNS answers
+MAX_RECORD_TTL = DAY
+# Which cache a report section counts against in metrics; anything else is an HTTP lookup
+SECTION_CACHES = {
+    'whois_info': 'whois',
+    'dns_records': 'dns',
+    'mx_records': 'dns',
+    'subdomains': 'dns',
+    'reverse_dns': 'dns',
+    'geolocation': 'geo'
+}
+
+def diff_values(old, new, path=''):
+    """Structured changes between two JSON-like values.
+    
+    Dicts are compared key by key, lists of scalars as sets (order from a
+    resolver or API is not meaningful), everything else by equality.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in old.keys() | new.keys():
+            child = f"{path}.{key}" if path else str(key)
+            if key not in new:
+                changes.append({'path': child, 'op': 'removed', 'old': old[key]})
+            elif key not in old:
+                changes.append({'path': child, 'op': 'added', 'new': new[key]})
+            else:
+                changes.extend(diff_values(old[key], new[key], child))
+        return sorted(changes, key=lambda change: change['path'])
+    if isinstance(old, list) and isinstance(new, list) and \
+            all(not isinstance(item, (dict, list)) for item in old + new):
+        added = [item for item in new if item not in old]
+        removed = [item for item in old if item not in new]
+        changes = []
+        if added:
+            changes.append({'path': path, 'op': 'added_items', 'new': added})
+        if removed:
+            changes.append({'path': path, 'op': 'removed_items', 'old': removed})
+        return changes
+    if old != new:
+        return [{'path': path, 'op': 'changed', 'old': old, 'new': new}]
+    return []
+
+class IncrementalScanner:
+    """Re-runs a tool against a target, reusing fresh sections of the last stored report.
+    
+    sections maps a section name to (fetch, ttl): fetch() returns the new
+    value and ttl is seconds, or a callable evaluated after fetch() for
+    TTLs that come from the data itself (DNS record TTLs). A ttl of None
+    means the section is never refreshed automatically once present, and a
+    fetch of None carries the previous value over untouched. Due sections
+    are fetched with run_stages under the current deadline; ones it
+    abandons or cuts short are stored with ERROR_TTL and listed in the
+    report's '_deadline' section.
+    """
+    def __init__(self, tool_name, store=None):
+        self.tool_name = tool_name
+        self.store = store or get_report_store()
+    
+    def load_previous(self, target):
+        rows = self.store.find(target=target, tool=self.tool_name, limit=1)
+        return self.store.get_report(rows[0]['id']) if rows else None
+    
+    def run(self, target, sections, force=False) -> dict:
+        now = datetime.now()
+        previous = self.load_previous(target)
+        old_freshness = (previous or {}).get('_freshness') or {}
+        freshness = {}
+        report = {}
+        refreshed = []
+        reused = []
+        diff = {}
+        # On a low battery or mobile data, cached sections are kept well past their TTL
+        scale = get_governor().ttl_scale()
+        
+        due = {}
+        for name, (fetch, ttl) in sections.items():
+            state = old_freshness.get(name)
+            if fetch is None:
+                report[name] = (previous or {}).get(name)
+                freshness[name] = state or {'fetched': None, 'expires': None}
+                reused.append(name)
+                continue
+            
+            fresh = previous is not None and name in previous and state is not None and (
+                state['expires'] is None or now < stretched_expiry(state, scale))
+            if fresh and not force:
+                report[name] = previous[name]
+                freshness[name] = state
+                reused.append(name)
+                count({'cache': SECTION_CACHES.get(name, 'http')}, cache_hits=1)
+                continue
+            
+            count({'cache': SECTION_CACHES.get(name, 'http')}, cache_misses=1)
+            report[name] = None
+            due[name] = fetch
+        
+        values, status = run_stages(due)
+        cut_short = set(status['missing']) | set(status['partial'])
+        for name, value in values.items():
+            ttl = sections[name][1]
+            if name in cut_short:
+                # Truncated data must not be reused as fresh for a whole TTL
+                seconds = ERROR_TTL
+            else:
+                seconds = ttl() if callable(ttl) else ttl
+                if isinstance(value, dict) and 'error' in value and seconds is not None:
+                    seconds = min(seconds, ERROR_TTL)
+            report[name] = value
+            freshness[name] = {
+                'fetched': now.isoformat(),
+                'expires': (now + timedelta(seconds=seconds)).isoformat() if seconds is not None else None
+            }
+            refreshed.append(name)
+            if previous is not None and name in previous and name not in cut_short:
+                changes = diff_values(previous[name], value)
+                if changes:
+                    diff[name] = changes
+        
+        report['_freshness'] = freshness
+        report['_incremental'] = {
+            'previous_report': previous['_report']['id'] if previous else None,
+            'refreshed': refreshed,
+            'reused': reused
+        }
+        report['_diff'] = diff
+        report['_deadline'] = status
+        return report
+
+def stretched_expiry(state, scale) -> datetime:
+    """A section's expiry with its TTL multiplied by scale"""
+    expires = datetime.fromisoformat(state['expires'])
+    if scale == 1 or not state.get('fetched'):
+        return expires
+    fetched = datetime.fromisoformat(state['fetched'])
+    return fetched + (expires - fetched) * scale
+
+def record_ttl(ttls, keys, default):
+    """TTL callable: smallest TTL a fetch recorded in ttls for keys, capped at MAX_RECORD_TTL"""
+    def ttl():
+        values = [ttls[key] for key in keys if key in ttls]
+        return min(min(values), MAX_RECORD_TTL) if values else default
+    return ttl
+
+def print_diff(report):
+    """Terminal summary of an incremental run"""
+    info = report['_incremental']
+    print(f"\n♻️  INCREMENTAL SCAN (previous report: {info['previous_report'] or 'none'})")
+    print(f"   Refreshed: {', '.join(info['refreshed']) or 'nothing'}")
+    print(f"   Reused: {', '.join(info['reused']) or 'nothing'}")
+    status = report.get('_deadline') or {}
+    if not status.get('complete', True):
+        print(f"   ⏱️  Cut short by the deadline: {', '.join(status['missing'] + status['partial'])} (retried in {ERROR_TTL // 60} min)")
+    if not report['_diff']:
+        print("   No changes since the previous run")
+        return
+    for section, changes in report['_diff'].items():
+        for change in changes:
+            detail = {key: change[key] for key in ('old', 'new') if key in change}
+            print(f"   Δ {section}.{change['path']} {change['op']}: {detail}" if change['path']
+                  else f"   Δ {section} {change['op']}: {detail}")
@@ -3,16 +3,70 @@
 IP Address and Network OSINT Tool
 Educational and authorized use only
 """
-import requests
-import json
+import errno
 import socket
-import subprocess
+import sys
 from datetime import datetime
 import ipaddress
 
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+try:
+    from tools.deadline import deadline_scope, run_stages, merge_status, stage_timeout, budget_from_argv
+except ImportError:
+    from deadline import deadline_scope, run_stages, merge_status, stage_timeout, budget_from_argv
+
+try:
+    from tools.checkpoint import run_journaled_stages, open_journal, finish_journal, job_from_argv
+except ImportError:
+    from checkpoint import run_journaled_stages, open_journal, finish_journal, job_from_argv
+
+try:
+    from tools.events import emit
+except ImportError:
+    from events import emit
+
+try:
+    from tools.governor import get_governor
+except ImportError:
+    from governor import get_governor
+
+try:
+    from tools.rate_limiter import RateLimitedSession
+except ImportError:
+    from rate_limiter import RateLimitedSession
+
+try:
+    from tools.whois_lookup import ip_whois
+except ImportError:
+    from whois_lookup import ip_whois
+
+try:
+    from tools.cassette import reverse_lookup, cassette_from_argv
+except ImportError:
+    from cassette import reverse_lookup, cassette_from_argv
+
+try:
+    from tools.perf import instrumented, count, timed, enable_from_argv, print_flame
+except ImportError:
+    from perf import instrumented, count, timed, enable_from_argv, print_flame
+
+try:
+    from tools.incremental import IncrementalScanner, print_diff, HOUR, DAY
+except ImportError:
+    from incremental import IncrementalScanner, print_diff, HOUR, DAY
+
 class IPNetworkOSINT:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = RateLimitedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -43,7 +97,7 @@ class IPNetworkOSINT:
         """Get IP geolocation information"""
         try:
             # Using free ipapi.co service
-            response = self.session.get(f"https://ipapi.co/{ip}/json/", timeout=10)
+            response = self.session.get(f"https://ipapi.co/{ip}/json/", timeout=stage_timeout(10))
             if response.status_code == 200:
                 data = response.json()
                 return {
@@ -64,7 +118,7 @@ class IPNetworkOSINT:
         
         # Fallback to ip-api.com
         try:
-            response = self.session.get(f"http://ip-api.com/json/{ip}", timeout=10)
+            response = self.session.get(f"http://ip-api.com/json/{ip}", timeout=stage_timeout(10))
             if response.status_code == 200:
                 data = response.json()
                 if data.get('status') == 'success':
@@ -89,10 +143,12 @@ class IPNetworkOSINT:
     def get_whois_info(self, ip: str) -> dict:
         """Get WHOIS information for IP"""
         try:
-            # Using whois command if available
-            result = subprocess.run(['whois', ip], capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                whois_data = result.stdout
+            # Using whois command if available (or OSINT_WHOIS_SERVER)
+            count({'host': 'whois'}, requests=1)
+            with timed('request_seconds', host='whois'):
+                whois_data = ip_whois(ip, timeout=stage_timeout(30))
+            if whois_data is not None:
+                count({'host': 'whois'}, bytes=len(whois_data))
                 
                 # Parse key information
                 parsed = {
@@ -136,8 +192,8 @@ class IPNetworkOSINT:
         
         return reputation
     
-    def port_scan_common(self, ip: str) -> dict:
-        """Scan common ports (ethical scanning only)"""
+    def port_scan_common(self, ip: str, journal=None) -> dict:
+        """Scan common ports (ethical scanning only); ports already in the job's journal are not re-probed"""
         common_ports = [21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995]
         open_ports = []
         
@@ -145,15 +201,24 @@ class IPNetworkOSINT:
         print("[WARNING] Only scan IPs you own or have permission to test")
         
         for port in common_ports:
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(2)
-                result = sock.connect_ex((ip, port))
-                if result == 0:
+            if journal is not None and f"port:{port}" in journal:
+                if journal.get(f"port:{port}"):
                     open_ports.append(port)
-                sock.close()
-            except:
-                pass
+                    emit('record_found', kind='open_port', value=port, ip=ip)
+                continue
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(stage_timeout(2))
+                    count(requests=1)
+                    result = sock.connect_ex((ip, port))
+            except OSError:
+                continue
+            if result == 0:
+                open_ports.append(port)
+                emit('record_found', kind='open_port', value=port, ip=ip)
+            # Only a definite answer is final; timeouts and unreachable hosts are probed again on resume
+            if journal is not None and result in (0, errno.ECONNREFUSED):
+                journal.record(f"port:{port}", result == 0)
         
         return {
             'scanned_ports': common_ports,
@@ -164,13 +229,15 @@ class IPNetworkOSINT:
     
     def reverse_dns_lookup(self, ip: str) -> dict:
         """Perform reverse DNS lookup"""
+        count({'host': 'dns'}, requests=1)
         try:
-            hostname = socket.gethostbyaddr(ip)[0]
+            with timed('request_seconds', host='dns'):
+                hostname = reverse_lookup(ip)
             return {
                 'hostname': hostname,
                 'has_reverse_dns': True
             }
-        except socket.herror:
+        except (socket.herror, socket.gaierror):
             return {
                 'hostname': None,
                 'has_reverse_dns': False
@@ -180,7 +247,7 @@ class IPNetworkOSINT:
         """Check if IP is a Tor exit node"""
         try:
             # Check against public Tor exit node list
-            response = self.session.get("https://check.torproject.org/torbulkexitlist", timeout=10)
+            response = self.session.get("https://check.torproject.org/torbulkexitlist", timeout=stage_timeout(10))
             if response.status_code == 200:
                 tor_ips = response.text.split('\n')
                 is_tor = ip in tor_ips
@@ -206,7 +273,8 @@ class IPNetworkOSINT:
             'recommendation': 'Use services like IPQualityScore or similar'
         }
     
-    def generate_ip_report(self, ip: str) -> dict:
+    @instrumented('generate_ip_report')
+    def generate_ip_report(self, ip: str, incremental: bool = False, journal=None) -> dict:
         """Generate comprehensive IP OSINT report"""
         print(f"\n{'='*60}")
         print(f"IP ADDRESS & NETWORK OSINT REPORT")
@@ -222,36 +290,66 @@ class IPNetworkOSINT:
             print(f"❌ Invalid IP address: {ip}")
             return {'error': 'Invalid IP address'}
         
-        # Gather information
-        geolocation = self.get_geolocation(ip)
-        whois_info = self.get_whois_info(ip)
-        reputation = self.check_reputation(ip)
-        reverse_dns = self.reverse_dns_lookup(ip)
-        tor_check = self.check_tor_exit_node(ip)
-        vpn_check = self.check_vpn_proxy(ip)
+        if incremental:
+            report = self.generate_ip_report_incremental(ip, ip_validation)
+            self.display_ip_report(report)
+            return report
+        
+        # Gather information; independent lookups share the run's deadline
+        gathered, status = run_journaled_stages(journal, {
+            'geolocation': lambda: self.get_geolocation(ip),
+            'whois_info': lambda: self.get_whois_info(ip),
+            'reputation': lambda: self.check_reputation(ip),
+            'reverse_dns': lambda: self.reverse_dns_lookup(ip),
+            'tor_check': lambda: self.check_tor_exit_node(ip),
+            'vpn_check': lambda: self.check_vpn_proxy(ip)
+        })
         
         # Port scan only if explicitly authorized
         port_scan = None
-        scan_consent = input(f"\nDo you have permission to port scan {ip}? (yes/no): ")
+        scan_status = None
+        try:
+            scan_consent = input(f"\nDo you have permission to port scan {ip}? (yes/no): ")
+        except EOFError:
+            # Non-interactive run (launcher, scheduler): never scan without an explicit yes
+            scan_consent = 'no'
         if scan_consent.lower() == 'yes':
-            port_scan = self.port_scan_common(ip)
+            scanned, scan_status = run_stages({'port_scan': lambda: self.port_scan_common(ip, journal)})
+            port_scan = scanned['port_scan']
         
         report = {
             'target': ip,
             'timestamp': datetime.now().isoformat(),
             'ip_validation': ip_validation,
-            'geolocation': geolocation,
-            'whois_info': whois_info,
-            'reputation': reputation,
-            'reverse_dns': reverse_dns,
-            'tor_check': tor_check,
-            'vpn_check': vpn_check,
-            'port_scan': port_scan
+            **gathered,
+            'port_scan': port_scan,
+            '_deadline': merge_status(status, scan_status)
         }
         
         self.display_ip_report(report)
         return report
     
+    def generate_ip_report_incremental(self, ip: str, ip_validation: dict) -> dict:
+        """Refresh only expired sections of the last stored report.
+        
+        Port scans are never repeated automatically: the previous scan is
+        carried over, and a fresh one needs a normal (non-incremental) run.
+        """
+        sections = {
+            'target': (lambda: ip, None),
+            'ip_validation': (lambda: ip_validation, None),
+            'geolocation': (lambda: self.get_geolocation(ip), DAY),
+            'whois_info': (lambda: self.get_whois_info(ip), DAY),
+            'reputation': (lambda: self.check_reputation(ip), HOUR),
+            'reverse_dns': (lambda: self.reverse_dns_lookup(ip), HOUR),
+            'tor_check': (lambda: self.check_tor_exit_node(ip), HOUR),
+            'vpn_check': (lambda: self.check_vpn_proxy(ip), DAY),
+            'port_scan': (None, None)
+        }
+        report = IncrementalScanner("IP Network OSINT").run(ip, sections)
+        report['timestamp'] = datetime.now().isoformat()
+        return report
+    
     def display_ip_report(self, report):
         """Display formatted IP report"""
         validation = report['ip_validation']
@@ -274,13 +372,13 @@ class IPNetworkOSINT:
         reverse_dns = report['reverse_dns']
         print(f"\n🔍 REVERSE DNS:")
         print(f"   Hostname: {reverse_dns.get('hostname', 'None')}")
-        print(f"   Has rDNS: {reverse_dns['has_reverse_dns']}")
+        print(f"   Has rDNS: {reverse_dns.get('has_reverse_dns', False)}")
         
         tor_check = report['tor_check']
         print(f"\n🧅 TOR CHECK:")
-        print(f"   Tor Exit Node: {tor_check['is_tor_exit']}")
+        print(f"   Tor Exit Node: {tor_check.get('is_tor_exit', 'Unknown')}")
         
-        if report['port_scan']:
+        if report['port_scan'] and 'error' not in report['port_scan']:
             port_scan = report['port_scan']
             print(f"\n🔌 PORT SCAN:")
             print(f"   Open Ports: {port_scan['open_ports']}")
@@ -290,23 +388,34 @@ def main():
     print("IP Address & Network OSINT Tool")
     print("Educational and authorized use only!")
     
-    consent = input("\nDo you have permission to analyze this IP address? (yes/no): ")
-    if consent.lower() != 'yes':
+    ip = input("Enter IP address: ")
+    if not authorize("IP Network OSINT", ip, "\nDo you have permission to analyze this IP address? (yes/no): "):
         print("Exiting - proper authorization required")
         return
     
-    ip = input("Enter IP address: ")
-    
     osint = IPNetworkOSINT()
-    report = osint.generate_ip_report(ip)
+    # python tools/ip_network_osint.py --incremental|--fresh --deadline 60 --job ID --perf
+    #   --record FILE | --replay FILE [--replay-timing exact]
+    enable_from_argv(sys.argv[1:])
+    cassette_from_argv(sys.argv[1:])
+    incremental = '--incremental' in sys.argv[1:]
+    if not incremental and '--fresh' not in sys.argv[1:] and get_governor().prefer_cache():
+        print(f"🔋 {get_governor().profile()} power profile: reusing cached sections (--fresh to refetch)")
+        incremental = True
+    # Incremental runs reuse the stored report instead of a checkpoint journal
+    journal = None if incremental else open_journal(job_from_argv(sys.argv[1:]), "IP Network OSINT", ip)
+    with deadline_scope(budget_from_argv(sys.argv[1:])):
+        report = osint.generate_ip_report(ip, incremental=incremental, journal=journal)
+    if incremental and 'error' not in report:
+        print_diff(report)
+    print_flame(report)
     
     if 'error' not in report:
         # Save report
-        filename = f"ip_report_{ip.replace('.', '_')}.json"
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=2, default=str)
+        report_id = get_report_store().save_report("IP Network OSINT", ip, report)
+        finish_journal(journal, report, report_id)
         
-        print(f"\nReport saved to {filename}")
+        print(f"\nReport saved as #{report_id} (python tools/report_store.py show {report_id})")
 
 if __name__ == "__main__":
     main()
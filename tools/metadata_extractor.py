@@ -4,34 +4,81 @@ File Metadata Extractor
 Educational and authorized use only
 """
 import os
+import re
+import math
+import struct
+import sys
+import mmap
+import zlib
+import gzip
+import zipfile
+import argparse
+import operator
+import xml.etree.ElementTree as ET
+from array import array
+from collections import namedtuple
+from itertools import compress, repeat
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from PIL import Image
-from PIL.ExifTags import TAGS
+from PIL.ExifTags import TAGS, GPSTAGS
+from PIL.TiffImagePlugin import IFDRational
 import json
-from datetime import datetime
+from datetime import datetime, timezone
+
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.jpe', '.tif', '.tiff', '.png', '.webp', '.heic', '.heif'}
+PDF_EXTENSIONS = {'.pdf'}
+OOXML_EXTENSIONS = {'.docx', '.docm', '.xlsx', '.xlsm', '.pptx', '.pptm'}
+SCANNABLE_EXTENSIONS = IMAGE_EXTENSIONS | PDF_EXTENSIONS | OOXML_EXTENSIONS
+
+# Upper bound for any single docProps part or XMP packet we are willing to read
+MAX_METADATA_PART = 1024 * 1024
+# Upper bound for a PDF stream, compressed or decompressed (XMP packets, object streams)
+MAX_STREAM_BYTES = MAX_METADATA_PART * 16
 
 class MetadataExtractor:
-    def __init__(self):
-        pass
+    def __init__(self, index_path='reports/metadata_index.json'):
+        self.index_path = index_path
     
     def extract_image_metadata(self, image_path: str) -> dict:
         """Extract metadata from image files"""
         try:
-            image = Image.open(image_path)
-            exifdata = image.getexif()
-            
-            metadata = {
-                'filename': os.path.basename(image_path),
-                'format': image.format,
-                'mode': image.mode,
-                'size': image.size,
-                'exif_data': {}
-            }
-            
-            for tag_id in exifdata:
-                tag = TAGS.get(tag_id, tag_id)
-                data = exifdata.get(tag_id)
-                metadata['exif_data'][tag] = str(data)
+            # Image.open only parses the header and metadata segments; pixel
+            # data is decoded lazily on load(), which is never called here.
+            with Image.open(image_path) as image:
+                exifdata = image.getexif()
+                
+                metadata = {
+                    'filename': os.path.basename(image_path),
+                    'format': image.format,
+                    'mode': image.mode,
+                    'size': image.size,
+                    'exif_data': {}
+                }
+                
+                for tag_id in exifdata:
+                    tag = TAGS.get(tag_id, tag_id)
+                    data = exifdata.get(tag_id)
+                    metadata['exif_data'][tag] = exif_value(data)
+                
+                # The GPSInfo tag itself is only an IFD offset; expand it
+                if 0x8825 in exifdata:
+                    gps_ifd = exifdata.get_ifd(0x8825)
+                    metadata['exif_data']['GPSInfo'] = {
+                        GPSTAGS.get(tag_id, tag_id): exif_value(value)
+                        for tag_id, value in gps_ifd.items()
+                    }
             
+            metadata['gps'] = self.extract_gps_coordinates(metadata['exif_data'])
             return metadata
         except Exception as e:
             return {'error': f'Could not extract metadata: {e}'}
@@ -41,29 +88,858 @@ class MetadataExtractor:
         gps_info = {}
         
         if 'GPSInfo' in exif_data:
-            # GPS coordinate extraction logic
             gps_info['has_gps'] = True
             gps_info['warning'] = 'GPS coordinates found - privacy risk'
+            
+            gps = exif_data['GPSInfo']
+            if isinstance(gps, dict):
+                gps_info['latitude'] = dms_to_decimal(gps.get('GPSLatitude'), gps.get('GPSLatitudeRef'))
+                gps_info['longitude'] = dms_to_decimal(gps.get('GPSLongitude'), gps.get('GPSLongitudeRef'))
+                
+                altitude = gps.get('GPSAltitude')
+                if isinstance(altitude, (int, float)):
+                    # GPSAltitudeRef 1 means below sea level
+                    if gps.get('GPSAltitudeRef') in (1, '\x01'):
+                        altitude = -altitude
+                    gps_info['altitude'] = float(altitude)
+                else:
+                    gps_info['altitude'] = None
+                
+                gps_info['timestamp'] = gps_timestamp(gps.get('GPSDateStamp'), gps.get('GPSTimeStamp'))
         else:
             gps_info['has_gps'] = False
         
         return gps_info
+    
+    def extract_pdf_metadata(self, pdf_path: str) -> dict:
+        """Extract Info dictionary and XMP metadata from a PDF"""
+        try:
+            with open(pdf_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                metadata = PDFMetadataReader(buf).read_metadata()
+            metadata['filename'] = os.path.basename(pdf_path)
+            return metadata
+        except Exception as e:
+            return {'error': f'Could not extract PDF metadata: {e}'}
+    
+    def extract_office_metadata(self, doc_path: str) -> dict:
+        """Extract docProps core/app properties from an OOXML document"""
+        core_fields = {
+            '{http://purl.org/dc/elements/1.1/}creator': 'author',
+            '{http://purl.org/dc/elements/1.1/}title': 'title',
+            '{http://purl.org/dc/elements/1.1/}subject': 'subject',
+            '{http://schemas.openxmlformats.org/package/2006/metadata/core-properties}lastModifiedBy': 'last_modified_by',
+            '{http://schemas.openxmlformats.org/package/2006/metadata/core-properties}revision': 'revision',
+            '{http://schemas.openxmlformats.org/package/2006/metadata/core-properties}lastPrinted': 'last_printed',
+            '{http://purl.org/dc/terms/}created': 'created',
+            '{http://purl.org/dc/terms/}modified': 'modified'
+        }
+        app_ns = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+        app_fields = {
+            app_ns + 'Application': 'application',
+            app_ns + 'AppVersion': 'app_version',
+            app_ns + 'Company': 'company',
+            app_ns + 'Manager': 'manager',
+            app_ns + 'Template': 'template',
+            app_ns + 'TotalTime': 'total_edit_minutes'
+        }
+        
+        try:
+            with open(doc_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                # ZipFile only reads the central directory and the members we
+                # open, both straight out of the mapping.
+                with zipfile.ZipFile(MappedFile(buf)) as archive:
+                    metadata = {
+                        'filename': os.path.basename(doc_path),
+                        'format': 'OOXML',
+                        'core': self._read_docprops(archive, 'docProps/core.xml', core_fields),
+                        'app': self._read_docprops(archive, 'docProps/app.xml', app_fields)
+                    }
+            revision = metadata['core'].get('revision')
+            if revision and revision.isdigit():
+                metadata['core']['revision'] = int(revision)
+            return metadata
+        except Exception as e:
+            return {'error': f'Could not extract document metadata: {e}'}
+    
+    def _read_docprops(self, archive, name: str, fields: dict) -> dict:
+        try:
+            info = archive.getinfo(name)
+        except KeyError:
+            return {}
+        if info.file_size > MAX_METADATA_PART:
+            return {'error': f'{name} exceeds {MAX_METADATA_PART} bytes'}
+        
+        properties = {}
+        with archive.open(info) as part:
+            for _, element in ET.iterparse(part):
+                key = fields.get(element.tag)
+                if key and element.text:
+                    properties[key] = element.text.strip()
+        return properties
+    
+    def extract_metadata(self, path: str) -> dict:
+        """Dispatch to the right extractor based on file extension"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension in PDF_EXTENSIONS:
+            return self.extract_pdf_metadata(path)
+        if extension in OOXML_EXTENSIONS:
+            return self.extract_office_metadata(path)
+        return self.extract_image_metadata(path)
+    
+    def iter_files(self, root: str):
+        """Recursively yield scannable image and document files under root"""
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if os.path.splitext(name)[1].lower() in SCANNABLE_EXTENSIONS:
+                    yield os.path.join(dirpath, name)
+    
+    def load_index(self) -> dict:
+        """Load the persistent (path -> [size, mtime_ns]) scan index"""
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_index(self, index: dict):
+        """Atomically write the scan index"""
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+    
+    def batch_extract(self, root: str, output_path: str, workers: int = None,
+                      force: bool = False) -> dict:
+        """Scan a directory tree in parallel, streaming results as JSON Lines"""
+        index = {} if force else self.load_index()
+        summary = {
+            'root': root,
+            'output': output_path,
+            'scanned': 0,
+            'skipped_unchanged': 0,
+            'errors': 0,
+            'with_gps': 0,
+            # Keyed to the index: the rows of files it skips as unchanged live here
+            'gps_table': f"{os.path.splitext(self.index_path)[0]}.gps"
+        }
+        # Unchanged files are skipped, so their rows come from the previous run's table
+        previous = GPSTable()
+        if not force and os.path.exists(summary['gps_table']):
+            try:
+                previous = GPSTable.load(summary['gps_table'])
+            except (OSError, ValueError, KeyError):
+                previous = GPSTable()
+        gps_table = GPSTable()
+        # Files found under root this run, and those scanned again (successfully or not)
+        seen = set()
+        rescanned = set()
+        
+        workers = workers or os.cpu_count() or 1
+        # Bound the number of in-flight files so memory stays flat on huge trees
+        max_pending = workers * 4
+        pending = {}
+        
+        def drain(done):
+            for future in done:
+                path, stat_key = pending.pop(future)
+                metadata = future.result()
+                metadata['path'] = path
+                out.write(json.dumps(metadata, separators=(',', ':'), default=str) + '\n')
+                rescanned.add(path)
+                
+                if 'error' in metadata:
+                    summary['errors'] += 1
+                    continue
+                
+                summary['scanned'] += 1
+                index[path] = stat_key
+                if 'gps' in metadata:
+                    gps_table.append(path, metadata['gps'])
+                    if metadata['gps']['has_gps']:
+                        summary['with_gps'] += 1
+                
+                if summary['scanned'] % 500 == 0:
+                    out.flush()
+                    self.save_index(index)
+        
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # A .gz output gets compact gzipped JSON Lines; each run appends a new gzip member
+        opener = gzip.open if output_path.endswith('.gz') else open
+        with opener(output_path, 'at') as out, ProcessPoolExecutor(max_workers=workers) as executor:
+            for path in self.iter_files(root):
+                seen.add(path)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    summary['errors'] += 1
+                    rescanned.add(path)
+                    continue
+                
+                stat_key = [st.st_size, st.st_mtime_ns]
+                if index.get(path) == stat_key:
+                    summary['skipped_unchanged'] += 1
+                    continue
+                
+                pending[executor.submit(_extract_worker, path)] = (path, stat_key)
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    drain(done)
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                drain(done)
+        
+        # Files deleted from under root drop out of the index and the table
+        prefix = os.path.join(root, '')
+        for path in [path for path in index if path.startswith(prefix) and path not in seen]:
+            del index[path]
+        self.save_index(index)
+        merged = previous.filter(path in seen or not path.startswith(prefix) for path in previous.paths)
+        merged = merged.without(rescanned)
+        merged.extend(gps_table)
+        gps_table = merged
+        gps_table.save(summary['gps_table'])
+        summary['location_leaks'] = sum(gps_table.has_location())
+        return summary
+
+def exif_value(value):
+    """Convert a PIL EXIF value to a JSON-friendly value without losing its type"""
+    if isinstance(value, IFDRational):
+        if value.denominator == 0:
+            return None
+        return float(value)
+    if isinstance(value, (tuple, list)):
+        return [exif_value(item) for item in value]
+    if isinstance(value, bytes):
+        text = value.rstrip(b'\x00')
+        if text and all(32 <= b < 127 for b in text):
+            return text.decode('ascii')
+        # Single-byte enumerations (e.g. GPSAltitudeRef) stay numeric
+        if len(value) == 1:
+            return value[0]
+        return value.hex()
+    if isinstance(value, str):
+        return value.rstrip('\x00')
+    return value
+
+def dms_to_decimal(dms, ref):
+    """Convert EXIF (degrees, minutes, seconds) and a hemisphere ref to decimal degrees"""
+    if not isinstance(dms, (list, tuple)) or not dms:
+        return None
+    parts = [float(part) if part is not None else 0.0 for part in dms] + [0.0, 0.0]
+    decimal = parts[0] + parts[1] / 60.0 + parts[2] / 3600.0
+    if ref in ('S', 'W'):
+        decimal = -decimal
+    return round(decimal, 7)
+
+def gps_timestamp(date_stamp, time_stamp):
+    """Combine GPSDateStamp and GPSTimeStamp into a UTC datetime"""
+    if not isinstance(date_stamp, str):
+        return None
+    try:
+        day = datetime.strptime(date_stamp.strip(), '%Y:%m:%d')
+    except ValueError:
+        return None
+    hours, minutes, seconds = ((list(time_stamp) if isinstance(time_stamp, (list, tuple)) else []) + [0, 0, 0])[:3]
+    seconds = float(seconds or 0)
+    return day.replace(hour=int(hours or 0), minute=int(minutes or 0), second=int(seconds),
+                       microsecond=int((seconds % 1) * 1e6), tzinfo=timezone.utc)
+
+class GPSTable:
+    """Columnar, array-backed table of GPS fields for a batch of files.
+    
+    Numeric columns are array('d') with NaN marking missing values. Masks
+    and filters run as map/compress loops over the arrays, so no Python
+    code executes per row (to_numpy() gives zero-copy numpy views when
+    numpy is installed).
+    """
+    COLUMNS = ('latitude', 'longitude', 'altitude', 'timestamp')
+    
+    def __init__(self):
+        self.paths = []
+        self.latitude = array('d')
+        self.longitude = array('d')
+        self.altitude = array('d')
+        self.timestamp = array('d')
+    
+    def __len__(self):
+        return len(self.paths)
+    
+    def append(self, path: str, gps: dict):
+        nan = math.nan
+        self.paths.append(path)
+        for column in ('latitude', 'longitude', 'altitude'):
+            value = gps.get(column)
+            getattr(self, column).append(nan if value is None else value)
+        timestamp = gps.get('timestamp')
+        self.timestamp.append(timestamp.timestamp() if isinstance(timestamp, datetime) else nan)
+    
+    def has_location(self) -> list:
+        """Boolean mask of rows carrying both latitude and longitude"""
+        # NaN is the only value not equal to itself
+        return list(map(operator.and_, map(operator.eq, self.latitude, self.latitude),
+                        map(operator.eq, self.longitude, self.longitude)))
+    
+    def within(self, south: float, west: float, north: float, east: float) -> list:
+        """Boolean mask of rows inside a bounding box (NaN compares false, so rows without a fix drop out)"""
+        lat, lon = self.latitude, self.longitude
+        in_lat = map(operator.and_, map(operator.le, repeat(south), lat), map(operator.le, lat, repeat(north)))
+        in_lon = map(operator.and_, map(operator.le, repeat(west), lon), map(operator.le, lon, repeat(east)))
+        return list(map(operator.and_, in_lat, in_lon))
+    
+    def filter(self, mask) -> 'GPSTable':
+        mask = list(mask)
+        table = GPSTable()
+        table.paths = list(compress(self.paths, mask))
+        for column in self.COLUMNS:
+            setattr(table, column, array('d', compress(getattr(self, column), mask)))
+        return table
+    
+    def without(self, paths) -> 'GPSTable':
+        """Copy of the table minus the rows for the given paths"""
+        paths = set(paths)
+        return self.filter(map(operator.not_, map(paths.__contains__, self.paths)))
+    
+    def extend(self, other: 'GPSTable'):
+        self.paths.extend(other.paths)
+        for column in self.COLUMNS:
+            getattr(self, column).extend(getattr(other, column))
+    
+    def rows(self):
+        for i, path in enumerate(self.paths):
+            yield {'path': path, **{column: getattr(self, column)[i] for column in self.COLUMNS}}
+    
+    def to_numpy(self) -> dict:
+        """Zero-copy numpy views of the numeric columns (requires numpy)"""
+        import numpy
+        columns = {column: numpy.frombuffer(getattr(self, column), dtype=numpy.float64)
+                   for column in self.COLUMNS}
+        columns['path'] = numpy.array(self.paths, dtype=object)
+        return columns
+    
+    def save(self, path: str):
+        """Write a JSON header line followed by the raw little-endian columns"""
+        header = {'rows': len(self), 'columns': list(self.COLUMNS), 'paths': self.paths}
+        with open(path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            for column in self.COLUMNS:
+                data = getattr(self, column)
+                if sys.byteorder != 'little':
+                    data = array('d', data)
+                    data.byteswap()
+                f.write(data.tobytes())
+    
+    @classmethod
+    def load(cls, path: str) -> 'GPSTable':
+        table = cls()
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            table.paths = header['paths']
+            for column in header['columns']:
+                data = array('d')
+                data.frombytes(f.read(header['rows'] * struct.calcsize('d')))
+                if sys.byteorder != 'little':
+                    data.byteswap()
+                setattr(table, column, data)
+        return table
+
+PDFRef = namedtuple('PDFRef', ['num', 'gen'])
+
+class MappedFile:
+    """Seekable file-like view over an mmap (mmap lacks seekable() before 3.13)"""
+    def __init__(self, buf):
+        self.buf = buf
+    
+    def seekable(self):
+        return True
+    
+    def __getattr__(self, name):
+        return getattr(self.buf, name)
+
+class PDFMetadataReader:
+    """Minimal random-access PDF reader over a memory map.
+    
+    Only the trailer, the cross-reference sections and the handful of
+    objects holding metadata are ever touched, so memory use does not
+    depend on the size of the document.
+    """
+    WHITESPACE = b' \t\r\n\x00\x0c'
+    TOKEN_RE = re.compile(rb'[^\s()<>\[\]{}/%]+')
+    OBJ_HEADER_RE = re.compile(rb'\s*(\d+)\s+(\d+)\s+obj')
+    REF_RE = re.compile(rb'\s+(\d+)\s+R(?![^\s()<>\[\]{}/%])')
+    OCTAL_RE = re.compile(rb'[0-7]{1,3}')
+    INFO_KEYS = ['Title', 'Author', 'Subject', 'Keywords', 'Creator', 'Producer',
+                 'CreationDate', 'ModDate', 'Trapped']
+    XMP_FIELDS = {
+        '{http://purl.org/dc/elements/1.1/}creator': 'creator',
+        '{http://purl.org/dc/elements/1.1/}title': 'title',
+        '{http://ns.adobe.com/xap/1.0/}CreatorTool': 'creator_tool',
+        '{http://ns.adobe.com/xap/1.0/}CreateDate': 'create_date',
+        '{http://ns.adobe.com/xap/1.0/}ModifyDate': 'modify_date',
+        '{http://ns.adobe.com/xap/1.0/}MetadataDate': 'metadata_date',
+        '{http://ns.adobe.com/pdf/1.3/}Producer': 'producer',
+        '{http://ns.adobe.com/xap/1.0/mm/}DocumentID': 'document_id',
+        '{http://ns.adobe.com/xap/1.0/mm/}InstanceID': 'instance_id',
+        '{http://ns.adobe.com/xap/1.0/mm/}VersionID': 'version_id'
+    }
+    
+    def __init__(self, buf):
+        self.buf = buf
+        self.xref_sections = []
+        self.objstm_cache = {}
+    
+    # -- tokenizer ---------------------------------------------------------
+    
+    def skip_ws(self, pos):
+        buf = self.buf
+        end = len(buf)
+        while pos < end:
+            c = buf[pos:pos + 1]
+            if c in self.WHITESPACE:
+                pos += 1
+            elif c == b'%':
+                while pos < end and buf[pos:pos + 1] not in b'\r\n':
+                    pos += 1
+            else:
+                break
+        return pos
+    
+    def parse_value(self, pos):
+        """Parse one PDF object starting at pos; returns (value, end_pos)"""
+        buf = self.buf
+        pos = self.skip_ws(pos)
+        head = buf[pos:pos + 2]
+        
+        if head == b'<<':
+            pos += 2
+            result = {}
+            while True:
+                pos = self.skip_ws(pos)
+                if buf[pos:pos + 2] == b'>>':
+                    return result, pos + 2
+                if buf[pos:pos + 1] != b'/':
+                    raise ValueError(f'Malformed dictionary at offset {pos}')
+                key, pos = self.parse_value(pos)
+                value, pos = self.parse_value(pos)
+                result[key] = value
+        
+        c = head[:1]
+        if c == b'<':
+            end = buf.find(b'>', pos)
+            hex_digits = re.sub(rb'\s', b'', buf[pos + 1:end])
+            if len(hex_digits) % 2:
+                hex_digits += b'0'
+            return bytes.fromhex(hex_digits.decode('ascii')), end + 1
+        
+        if c == b'[':
+            pos += 1
+            items = []
+            while True:
+                pos = self.skip_ws(pos)
+                if buf[pos:pos + 1] == b']':
+                    return items, pos + 1
+                value, pos = self.parse_value(pos)
+                items.append(value)
+        
+        if c == b'(':
+            return self.parse_literal_string(pos + 1)
+        
+        if c == b'/':
+            match = self.TOKEN_RE.match(buf, pos + 1)
+            raw = match.group(0) if match else b''
+            name = re.sub(rb'#([0-9A-Fa-f]{2})', lambda m: bytes([int(m.group(1), 16)]), raw)
+            return name.decode('latin-1'), pos + 1 + len(raw)
+        
+        match = self.TOKEN_RE.match(buf, pos)
+        if not match:
+            raise ValueError(f'Unexpected token at offset {pos}')
+        token = match.group(0)
+        pos = match.end()
+        
+        if token == b'true':
+            return True, pos
+        if token == b'false':
+            return False, pos
+        if token == b'null':
+            return None, pos
+        if b'.' in token:
+            return float(token), pos
+        
+        number = int(token)
+        # "num gen R" is an indirect reference
+        ref = self.REF_RE.match(buf, pos)
+        if ref:
+            return PDFRef(number, int(ref.group(1))), ref.end()
+        return number, pos
+    
+    def parse_literal_string(self, pos):
+        buf = self.buf
+        out = bytearray()
+        depth = 1
+        escapes = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+        while True:
+            c = buf[pos:pos + 1]
+            if not c:
+                break
+            pos += 1
+            if c == b'\\':
+                nxt = buf[pos:pos + 1]
+                pos += 1
+                if nxt in escapes:
+                    out += escapes[nxt]
+                elif nxt.isdigit():
+                    octal = self.OCTAL_RE.match(buf, pos - 1)
+                    out.append(int(octal.group(0), 8) & 0xFF)
+                    pos = octal.end()
+                elif nxt == b'\r':
+                    if buf[pos:pos + 1] == b'\n':
+                        pos += 1
+                elif nxt != b'\n':
+                    out += nxt
+            elif c == b'(':
+                depth += 1
+                out += c
+            elif c == b')':
+                depth -= 1
+                if depth == 0:
+                    break
+                out += c
+            else:
+                out += c
+        return bytes(out), pos
+    
+    # -- cross-reference ---------------------------------------------------
+    
+    def load_xref(self):
+        """Walk startxref and the /Prev chain; returns the newest trailer"""
+        buf = self.buf
+        tail_start = max(0, len(buf) - 2048)
+        marker = buf.rfind(b'startxref', tail_start)
+        if marker < 0:
+            raise ValueError('startxref not found')
+        offset, _ = self.parse_value(marker + len(b'startxref'))
+        
+        trailer = None
+        seen = set()
+        while isinstance(offset, int) and offset not in seen and 0 <= offset < len(buf):
+            seen.add(offset)
+            section_trailer = self.read_xref_section(offset)
+            if trailer is None:
+                trailer = section_trailer
+            offset = section_trailer.get('Prev')
+        
+        if trailer is None:
+            raise ValueError('No cross-reference section found')
+        return trailer
+    
+    def read_xref_section(self, offset):
+        buf = self.buf
+        pos = self.skip_ws(offset)
+        
+        if buf[pos:pos + 4] == b'xref':
+            pos += 4
+            subsections = []
+            while True:
+                pos = self.skip_ws(pos)
+                if buf[pos:pos + 7] == b'trailer':
+                    break
+                start, pos = self.parse_value(pos)
+                count, pos = self.parse_value(pos)
+                pos = self.skip_ws(pos)
+                # Entries are fixed 20-byte records, so we only remember where
+                # the table begins and jump straight to entries on lookup.
+                subsections.append((start, count, pos))
+                pos += count * 20
+            trailer, _ = self.parse_value(pos + 7)
+            self.xref_sections.append(('table', subsections))
+            if 'XRefStm' in trailer:
+                self.read_xref_section(trailer['XRefStm'])
+            return trailer
+        
+        # Cross-reference stream (PDF 1.5+)
+        header = self.OBJ_HEADER_RE.match(buf, pos)
+        if not header:
+            raise ValueError(f'No xref at offset {offset}')
+        stream_dict, data = self.read_stream(header.end())
+        widths = stream_dict['W']
+        index = stream_dict.get('Index', [0, stream_dict['Size']])
+        self.xref_sections.append(('stream', (widths, index, data)))
+        return stream_dict
+    
+    def lookup(self, num):
+        """Return ('offset', pos) or ('objstm', (stream_num, index))"""
+        buf = self.buf
+        for kind, section in self.xref_sections:
+            if kind == 'table':
+                for start, count, base in section:
+                    if start <= num < start + count:
+                        entry = buf[base + (num - start) * 20:base + (num - start) * 20 + 18]
+                        if entry[17:18] == b'n':
+                            return 'offset', int(entry[:10])
+                        return None
+            else:
+                widths, index, data = section
+                row_size = sum(widths)
+                row = 0
+                for i in range(0, len(index), 2):
+                    start, count = index[i], index[i + 1]
+                    if start <= num < start + count:
+                        row += num - start
+                        fields = []
+                        p = row * row_size
+                        for width in widths:
+                            fields.append(int.from_bytes(data[p:p + width], 'big') if width else None)
+                            p += width
+                        entry_type = 1 if fields[0] is None else fields[0]
+                        if entry_type == 1:
+                            return 'offset', fields[1]
+                        if entry_type == 2:
+                            return 'objstm', (fields[1], fields[2])
+                        return None
+                    row += count
+        
+        # Damaged or missing xref: fall back to a search of the mapped file
+        match = re.compile(rb'(?<!\d)%d\s+0\s+obj' % num).search(buf)
+        if match:
+            return 'offset', match.start()
+        return None
+    
+    def resolve(self, value):
+        """Follow indirect references to their object value"""
+        depth = 0
+        while isinstance(value, PDFRef) and depth < 16:
+            value = self.get_object(value.num)
+            depth += 1
+        return value
+    
+    def get_object(self, num):
+        location = self.lookup(num)
+        if location is None:
+            return None
+        kind, where = location
+        if kind == 'offset':
+            header = self.OBJ_HEADER_RE.match(self.buf, where)
+            if not header:
+                return None
+            value, _ = self.parse_value(header.end())
+            return value
+        
+        stream_num, index = where
+        if stream_num not in self.objstm_cache:
+            self.objstm_cache[stream_num] = self.read_object_stream(stream_num)
+        objects = self.objstm_cache[stream_num]
+        return objects[index] if index < len(objects) else None
+    
+    def read_object_stream(self, num):
+        kind, where = self.lookup(num)
+        header = self.OBJ_HEADER_RE.match(self.buf, where)
+        stream_dict, data = self.read_stream(header.end())
+        sub = PDFMetadataReader(data)
+        pairs = []
+        pos = 0
+        for _ in range(stream_dict['N']):
+            obj_num, pos = sub.parse_value(pos)
+            obj_offset, pos = sub.parse_value(pos)
+            pairs.append(obj_offset)
+        first = stream_dict['First']
+        return [sub.parse_value(first + off)[0] for off in pairs]
+    
+    def read_stream(self, pos):
+        """Read a stream object's dictionary and decoded data"""
+        buf = self.buf
+        stream_dict, pos = self.parse_value(pos)
+        pos = self.skip_ws(pos)
+        if buf[pos:pos + 6] != b'stream':
+            raise ValueError('Expected stream')
+        pos += 6
+        if buf[pos:pos + 2] == b'\r\n':
+            pos += 2
+        elif buf[pos:pos + 1] in (b'\n', b'\r'):
+            pos += 1
+        
+        length = self.resolve(stream_dict.get('Length'))
+        if not isinstance(length, int):
+            length = buf.find(b'endstream', pos) - pos
+        if length > MAX_STREAM_BYTES:
+            raise ValueError('Stream too large for metadata scan')
+        data = buf[pos:pos + length]
+        
+        filters = stream_dict.get('Filter', [])
+        if not isinstance(filters, list):
+            filters = [filters]
+        params = stream_dict.get('DecodeParms') or {}
+        if isinstance(params, list):
+            params = params[0] if params else {}
+        for name in filters:
+            if name != 'FlateDecode':
+                raise ValueError(f'Unsupported stream filter {name}')
+            # Capped output: a few KiB of deflate can expand to gigabytes
+            decompressor = zlib.decompressobj()
+            data = decompressor.decompress(data, MAX_STREAM_BYTES)
+            if decompressor.unconsumed_tail:
+                raise ValueError(f'Stream expands beyond {MAX_STREAM_BYTES} bytes')
+            if params.get('Predictor', 1) >= 10:
+                data = self.png_unpredict(data, params.get('Columns', 1))
+        return stream_dict, data
+    
+    def png_unpredict(self, data, columns):
+        row_len = columns + 1
+        prev = bytearray(columns)
+        out = bytearray()
+        for i in range(0, len(data), row_len):
+            ftype = data[i]
+            row = bytearray(data[i + 1:i + row_len])
+            if ftype == 1:
+                for j in range(1, len(row)):
+                    row[j] = (row[j] + row[j - 1]) & 0xFF
+            elif ftype == 2:
+                for j in range(len(row)):
+                    row[j] = (row[j] + prev[j]) & 0xFF
+            elif ftype != 0:
+                raise ValueError(f'Unsupported PNG predictor {ftype}')
+            out += row
+            prev = row
+        return bytes(out)
+    
+    # -- metadata ----------------------------------------------------------
+    
+    def decode_text(self, value):
+        if isinstance(value, bytes):
+            if value.startswith(b'\xfe\xff'):
+                return value[2:].decode('utf-16-be', errors='replace')
+            if value.startswith(b'\xef\xbb\xbf'):
+                return value[3:].decode('utf-8', errors='replace')
+            return value.decode('latin-1')
+        return value
+    
+    def parse_pdf_date(self, value):
+        """Convert D:YYYYMMDDHHmmSSOHH'mm' to ISO 8601"""
+        match = re.match(r"D?:?(\d{4})(\d{2})?(\d{2})?(\d{2})?(\d{2})?(\d{2})?([Zz+\-])?(\d{2})?'?(\d{2})?", value or '')
+        if not match:
+            return value
+        year, month, day, hour, minute, second, tz, tz_h, tz_m = match.groups()
+        iso = f"{year}-{month or '01'}-{day or '01'}T{hour or '00'}:{minute or '00'}:{second or '00'}"
+        if tz in ('Z', 'z'):
+            iso += '+00:00'
+        elif tz:
+            iso += f"{tz}{tz_h or '00'}:{tz_m or '00'}"
+        return iso
+    
+    def read_metadata(self) -> dict:
+        trailer = self.load_xref()
+        
+        info = {}
+        info_dict = self.resolve(trailer.get('Info'))
+        if isinstance(info_dict, dict):
+            for key in self.INFO_KEYS:
+                if key in info_dict:
+                    value = self.decode_text(self.resolve(info_dict[key]))
+                    if key in ('CreationDate', 'ModDate'):
+                        value = self.parse_pdf_date(value)
+                    info[key] = value
+        
+        xmp = {}
+        catalog = self.resolve(trailer.get('Root'))
+        if isinstance(catalog, dict) and isinstance(catalog.get('Metadata'), PDFRef):
+            location = self.lookup(catalog['Metadata'].num)
+            if location and location[0] == 'offset':
+                header = self.OBJ_HEADER_RE.match(self.buf, location[1])
+                _, packet = self.read_stream(header.end())
+                xmp = self.parse_xmp(packet)
+        
+        return {
+            'format': 'PDF',
+            'version': self.buf[5:8].decode('ascii', errors='replace') if self.buf[:5] == b'%PDF-' else None,
+            # Each incremental update appends one xref section
+            'revisions': len(self.xref_sections),
+            'info': info,
+            'xmp': xmp
+        }
+    
+    def parse_xmp(self, packet) -> dict:
+        fields = {}
+        try:
+            root = ET.fromstring(packet.strip(b'\x00 \r\n\t'))
+        except ET.ParseError:
+            return {'error': 'Malformed XMP packet'}
+        for element in root.iter():
+            name = self.XMP_FIELDS.get(element.tag)
+            if name:
+                values = [item.text.strip() for item in element.iter() if item.text and item.text.strip()]
+                if values:
+                    fields[name] = values[0] if len(values) == 1 else values
+        # Attribute-style properties (rdf:Description xmp:CreatorTool="...")
+        for element in root.iter('{http://www.w3.org/1999/02/22-rdf-syntax-ns#}Description'):
+            for attr, value in element.attrib.items():
+                name = self.XMP_FIELDS.get(attr)
+                if name and name not in fields:
+                    fields[name] = value
+        return fields
+
+def _extract_worker(path: str) -> dict:
+    """Process-pool entry point for batch extraction"""
+    return MetadataExtractor().extract_metadata(path)
+
+def batch_main(argv, prompt=None):
+    parser = argparse.ArgumentParser(description="Batch image/document metadata audit of a directory tree")
+    parser.add_argument('--batch', required=True, metavar='DIR', help="Directory to scan recursively")
+    parser.add_argument('--output', default=None, help="JSON Lines output file (.jsonl.gz to compress)")
+    parser.add_argument('--index', default='reports/metadata_index.json', help="Persistent scan index")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Ignore the index and rescan everything")
+    args = parser.parse_args(argv)
+    
+    # The whole tree is authorized as one target, before any file is opened
+    if not authorize("Metadata Extractor", args.batch, prompt, kind='path'):
+        print("Exiting - proper authorization required")
+        return
+    
+    output = args.output or f"reports/metadata_{int(datetime.now().timestamp())}.jsonl"
+    
+    extractor = MetadataExtractor(index_path=args.index)
+    summary = extractor.batch_extract(args.batch, output, workers=args.workers, force=args.force)
+    
+    print(f"\n📊 Scanned: {summary['scanned']}")
+    print(f"   Unchanged (skipped): {summary['skipped_unchanged']}")
+    print(f"   Errors: {summary['errors']}")
+    print(f"   With GPS: {summary['with_gps']}")
+    print(f"   With decodable coordinates: {summary['location_leaks']}")
+    print(f"\nResults streamed to {output}")
+    print(f"GPS table written to {summary['gps_table']}")
+    
+    # Per-file results stay in the JSONL stream; the store records the run
+    report_id = get_report_store().save_report("Metadata Extractor", args.batch,
+                                               dict(summary, results_path=output))
+    print(f"Run summary saved as #{report_id}")
 
 def main():
     print("Metadata Extractor")
     print("Educational and authorized use only!")
     
-    consent = input("\nDo you own this file or have permission to analyze it? (yes/no): ")
-    if consent.lower() != 'yes':
-        print("Exiting - proper authorization required")
+    prompt = "\nDo you own this file or have permission to analyze it? (yes/no): "
+    
+    if len(sys.argv) > 1:
+        batch_main(sys.argv[1:], prompt)
         return
     
     file_path = input("Enter file path: ")
+    if not authorize("Metadata Extractor", file_path, prompt, kind='path'):
+        print("Exiting - proper authorization required")
+        return
     
     extractor = MetadataExtractor()
-    metadata = extractor.extract_image_metadata(file_path)
+    metadata = extractor.extract_metadata(file_path)
     
-    print(json.dumps(metadata, indent=2))
+    print(json.dumps(metadata, indent=2, default=str))
+    report_id = get_report_store().save_report("Metadata Extractor", file_path, metadata)
+    print(f"\nReport saved as #{report_id}")
 
 if __name__ == "__main__":
     main()
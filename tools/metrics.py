@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Metrics Exposition
+Prometheus text-format /metrics on localhost for the monitor and other long-running modes
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+
+try:
+    from tools.perf import add_sink
+except ImportError:
+    from perf import add_sink
+
+# Port the monitor serves /metrics on when --metrics-port is not given (0 = off)
+PORT_ENV_VAR = 'OSINT_METRICS_PORT'
+# Only ever bound to loopback: the page names every host and asset the toolkit talks to
+BIND_ADDRESS = '127.0.0.1'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+WRITE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 1)
+
+# perf counter name -> exported metric
+COUNTERS = {
+    'requests': ('osint_upstream_requests_total', 'Requests sent, by upstream host'),
+    'bytes': ('osint_upstream_bytes_total', 'Bytes received (body plus a header allowance), by upstream host'),
+    'retries': ('osint_upstream_retries_total', 'Requests repeated after a throttled response'),
+    'backoffs': ('osint_rate_limit_backoffs_total', 'Throttled responses (429/503) that halved a host\'s rate'),
+    # Only incremental scans and resumed jobs count these; the monitor's checks always go upstream
+    'cache_hits': ('osint_cache_hits_total', 'Sections answered from an incremental scan or checkpoint, by cache'),
+    'cache_misses': ('osint_cache_misses_total', 'Sections an incremental scan had to refetch, by cache'),
+    'checks': ('osint_monitor_checks_total', 'Monitor checks run, by check and outcome')
+}
+# perf observation name -> exported histogram
+HISTOGRAMS = {
+    'request_seconds': ('osint_upstream_request_duration_seconds', 'Upstream request latency, by host',
+                        LATENCY_BUCKETS),
+    'rate_limit_wait_seconds': ('osint_rate_limit_wait_seconds', 'Time spent waiting for a rate-limit slot',
+                                LATENCY_BUCKETS),
+    'audit_write_seconds': ('osint_audit_write_duration_seconds', 'Audit log append latency', WRITE_BUCKETS)
+}
+# perf gauge name -> exported gauge
+GAUGES = {
+    'queue_depth': ('osint_queue_depth', 'Jobs waiting, by queue (due: ready but held back, scheduled: not yet due)'),
+    'in_flight_jobs': ('osint_in_flight_jobs', 'Jobs running right now')
+}
+
+def label_key(labels) -> tuple:
+    return tuple(sorted(labels.items()))
+
+def format_labels(key, extra=()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """perf sink that keeps Prometheus counters, histograms and gauges in memory.
+    
+    Series are keyed by metric and label set; names perf does not map are
+    ignored, so new count() calls never break a scrape.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.started = time.time()
+    
+    def count(self, counts, labels):
+        key = label_key(labels)
+        with self._lock:
+            for name, value in counts.items():
+                if name in COUNTERS and value:
+                    series = self.counters.setdefault(name, {})
+                    series[key] = series.get(key, 0) + value
+    
+    def observe(self, name, value, labels):
+        if name not in HISTOGRAMS:
+            return
+        buckets = HISTOGRAMS[name][2]
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            state = series.setdefault(label_key(labels), {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+    
+    def gauge(self, name, value, labels):
+        if name in GAUGES:
+            with self._lock:
+                self.gauges.setdefault(name, {})[label_key(labels)] = value
+    
+    def render(self) -> str:
+        """The whole registry in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (metric, help_text) in COUNTERS.items():
+                series = self.counters.get(name)
+                if not series:
+                    continue
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                lines += [f"{metric}{format_labels(key)} {format_value(value)}" for key, value in sorted(series.items())]
+            
+            for name, (metric, help_text, buckets) in HISTOGRAMS.items():
+                series = self.histograms.get(name)
+                if not series:
+                    continue
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for key, state in sorted(series.items()):
+                    for bound, hits_at in zip(buckets, state['buckets']):
+                        lines.append(f"{metric}_bucket{format_labels(key, [('le', bound)])} {hits_at}")
+                    lines.append(f"{metric}_bucket{format_labels(key, [('le', '+Inf')])} {state['count']}")
+                    lines.append(f"{metric}_sum{format_labels(key)} {format_value(state['sum'])}")
+                    lines.append(f"{metric}_count{format_labels(key)} {state['count']}")
+            
+            for name, (metric, help_text) in GAUGES.items():
+                series = self.gauges.get(name)
+                if not series:
+                    continue
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+                lines += [f"{metric}{format_labels(key)} {format_value(value)}" for key, value in sorted(series.items())]
+        
+        lines += ["# HELP osint_process_start_time_seconds Unix time the process started",
+                  "# TYPE osint_process_start_time_seconds gauge",
+                  f"osint_process_start_time_seconds {format_value(self.started)}"]
+        return '\n'.join(lines) + '\n'
+
+class MetricsServer:
+    """/metrics for one registry, served from a daemon thread on loopback"""
+    def __init__(self, registry, port):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                # Scrapes every few seconds would drown the monitor's own output
+                pass
+        
+        self.server = ThreadingHTTPServer((BIND_ADDRESS, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide registry, fed by every perf count/observe/gauge call once created"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = add_sink(MetricsRegistry())
+        return _shared_registry
+
+def serve_metrics(port) -> MetricsServer:
+    """Start /metrics on 127.0.0.1:port (0 picks a free port)"""
+    server = MetricsServer(get_metrics(), port).start()
+    print(f"📈 Metrics at http://{BIND_ADDRESS}:{server.port}/metrics")
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch and print a running process's /metrics page")
+    parser.add_argument('port', type=int)
+    args = parser.parse_args(argv)
+    
+    with urlopen(f"http://{BIND_ADDRESS}:{args.port}/metrics", timeout=5) as response:
+        print(response.read().decode('utf-8'), end='')
+
+if __name__ == "__main__":
+    main()
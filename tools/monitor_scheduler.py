@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Monitoring Scheduler
+Long-running asyncio loop that watches owned domains and IPs for drift
+"""
+import argparse
+import asyncio
+import hashlib
+import heapq
+import ipaddress
+import json
+import os
+import random
+import re
+import socket
+import ssl
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    from tools.audit_logger import get_audit_logger
+    from tools.email_domain_osint import EmailDomainOSINT
+    from tools.governor import get_governor
+    from tools.incremental import diff_values
+    from tools.ip_network_osint import IPNetworkOSINT
+    from tools.metrics import serve_metrics, PORT_ENV_VAR
+    from tools.perf import count, gauge
+    from tools.report_store import get_report_store
+    from tools.scope_manifest import ScopeError, authorize, get_active_scope
+except ImportError:
+    from audit_logger import get_audit_logger
+    from email_domain_osint import EmailDomainOSINT
+    from governor import get_governor
+    from incremental import diff_values
+    from ip_network_osint import IPNetworkOSINT
+    from metrics import serve_metrics, PORT_ENV_VAR
+    from perf import count, gauge
+    from report_store import get_report_store
+    from scope_manifest import ScopeError, authorize, get_active_scope
+
+TOOL_NAME = "Monitor Scheduler"
+# Seconds between runs of each check, before jitter
+CHECK_INTERVALS = {
+    'dns': 300,
+    'whois': 24 * 3600,
+    'certificate': 6 * 3600,
+    'headers': 3600,
+    'ip_whois': 24 * 3600,
+    'reverse_dns': 3600
+}
+# Which upstream each check talks to; each upstream has its own concurrency cap
+CHECK_UPSTREAMS = {
+    'dns': 'dns',
+    'whois': 'whois',
+    'certificate': 'http',
+    'headers': 'http',
+    'ip_whois': 'whois',
+    'reverse_dns': 'dns'
+}
+UPSTREAM_LIMITS = {'dns': 8, 'whois': 2, 'http': 4}
+DOMAIN_CHECKS = ('dns', 'whois', 'certificate', 'headers')
+IP_CHECKS = ('ip_whois', 'reverse_dns')
+EXPIRY_WARNING_DAYS = 21
+# CIDRs larger than this are not expanded into per-address jobs
+MAX_RANGE_ADDRESSES = 256
+# Seconds between power-profile rechecks while due checks are held back by it
+GOVERNOR_POLL = 5
+# The byte budget applies per window; the monitor never ends, so a lifetime budget would stop it for good
+BUDGET_WINDOW = 3600
+# Consecutive failed runs of a check before it is reported, once, as failing
+FAILURE_ALERT_AFTER = 3
+DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+def stable_hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def expires_within(date_text, days):
+    """Whether the first YYYY-MM-DD date in date_text is less than days away (None if no date)"""
+    match = DATE_RE.search(str(date_text or ''))
+    if not match:
+        return None
+    expires = datetime(*map(int, match.groups()), tzinfo=timezone.utc)
+    return (expires - datetime.now(timezone.utc)).days < days
+
+class AssetChecks:
+    """Blocking check functions; each returns a JSON-able value with only drift-relevant fields"""
+    def __init__(self):
+        self.domain_osint = EmailDomainOSINT()
+        self.ip_osint = IPNetworkOSINT()
+    
+    def dns(self, asset):
+        records = self.domain_osint.get_dns_records(asset)
+        records['MX'] = [f"{mx['priority']} {mx['server']}" for mx in self.domain_osint.get_mx_records(asset)]
+        return {record_type: sorted(values) for record_type, values in records.items()}
+    
+    def whois(self, asset):
+        info = self.domain_osint.get_whois_info(asset)
+        if 'error' not in info:
+            info['expires_soon'] = expires_within(info.get('expiration_date'), EXPIRY_WARNING_DAYS)
+        return info
+    
+    def certificate(self, asset):
+        try:
+            context = ssl.create_default_context()
+            with socket.create_connection((asset, 443), timeout=10) as sock:
+                with context.wrap_socket(sock, server_hostname=asset) as tls:
+                    cert = tls.getpeercert()
+                    der = tls.getpeercert(binary_form=True)
+        except (OSError, ssl.SSLError) as e:
+            return {'error': f"TLS check failed: {e}"}
+        not_after = datetime.fromtimestamp(ssl.cert_time_to_seconds(cert['notAfter']), timezone.utc)
+        return {
+            'sha256': hashlib.sha256(der).hexdigest(),
+            'issuer': dict(item[0] for item in cert.get('issuer', ())),
+            'not_after': not_after.isoformat(),
+            'subject_alt_names': sorted(value for kind, value in cert.get('subjectAltName', ()) if kind == 'DNS'),
+            'expires_soon': (not_after - datetime.now(timezone.utc)).days < EXPIRY_WARNING_DAYS
+        }
+    
+    def headers(self, asset):
+        return self.domain_osint.check_security_headers(asset)
+    
+    def ip_whois(self, asset):
+        info = self.ip_osint.get_whois_info(asset)
+        # The raw text carries query timestamps; drift is judged on the parsed fields
+        info.pop('raw_whois', None)
+        return info
+    
+    def reverse_dns(self, asset):
+        return self.ip_osint.reverse_dns_lookup(asset)
+
+class MonitorScheduler:
+    """Runs every (asset, check) job on its interval with jitter.
+    
+    Memory is bounded by the job list: each job keeps only its last value,
+    and a job is rescheduled only after its run finishes, so the number of
+    live tasks never exceeds the number of jobs. Alerts (stdout, audit log
+    and a stored report) fire only when a check's value changes. A failed
+    run is not a change: the job keeps its last good value, and only
+    FAILURE_ALERT_AFTER failures in a row are reported.
+    """
+    def __init__(self, domains=(), ips=(), global_limit=8, upstream_limits=None,
+                 intervals=None, jitter=0.1, checks=None, governor=None):
+        self.intervals = dict(CHECK_INTERVALS, **(intervals or {}))
+        self.jitter = jitter
+        self.global_limit = global_limit
+        self.upstream_limits = dict(UPSTREAM_LIMITS, **(upstream_limits or {}))
+        self.checks = checks or AssetChecks()
+        self.governor = governor or get_governor()
+        self.jobs = [(domain, check) for domain in domains for check in DOMAIN_CHECKS]
+        self.jobs += [(ip, check) for ip in ips for check in IP_CHECKS]
+        self.last = {}
+        self.failures = {}
+        self.stats = {'runs': 0, 'alerts': 0, 'errors': 0}
+        self._stopped = None
+    
+    def next_delay(self, check):
+        interval = self.intervals[check]
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+    
+    async def run_job(self, asset, check, loop, executor, global_sem, upstream_sems):
+        try:
+            scope = get_active_scope()
+            reason = "asset left scope" if scope is not None and not scope.check(asset)['allowed'] else None
+        except ScopeError as e:
+            # Manifest became unreadable, unsigned or tampered with: nothing can be trusted as in scope
+            reason = f"scope manifest rejected: {e}"
+        if reason is not None:
+            # Manifest expired or changed under us: stop watching this asset
+            print(f"⛔ {asset} {check}: {reason}; no longer monitored")
+            get_audit_logger().log(TOOL_NAME, 'denied', target=asset, check=check,
+                                   reason=reason, durable=True)
+            return False
+        
+        async with global_sem, upstream_sems[CHECK_UPSTREAMS[check]]:
+            try:
+                value = await loop.run_in_executor(executor, getattr(self.checks, check), asset)
+            except Exception as e:
+                value = {'error': str(e)}
+        self.stats['runs'] += 1
+        key = (asset, check)
+        if isinstance(value, dict) and 'error' in value:
+            # A timeout or a flaky upstream is not drift; compare the next good value with the last one
+            self.stats['errors'] += 1
+            count({'check': check, 'outcome': 'error'}, checks=1)
+            self.failures[key] = self.failures.get(key, 0) + 1
+            if self.failures[key] == FAILURE_ALERT_AFTER:
+                self.alert_failing(asset, check, value['error'])
+            return True
+        
+        self.failures.pop(key, None)
+        outcome = 'ok'
+        digest = stable_hash(value)
+        previous = self.last.get(key)
+        if previous is not None and previous[0] != digest:
+            outcome = 'drift'
+            # Stored only once the alert went out, so a failed alert is raised again next run
+            self.alert(asset, check, diff_values(previous[1], value), value)
+        self.last[key] = (digest, value)
+        count({'check': check, 'outcome': outcome}, checks=1)
+        return True
+    
+    def alert(self, asset, check, changes, value):
+        self.stats['alerts'] += 1
+        print(f"🚨 {datetime.now().isoformat(timespec='seconds')} {asset} {check} changed:")
+        for change in changes:
+            detail = {key: change[key] for key in ('old', 'new') if key in change}
+            print(f"   Δ {change['path'] or check} {change['op']}: {detail}")
+        get_audit_logger().log(TOOL_NAME, 'drift', target=asset, check=check, changes=len(changes))
+        get_report_store().save_report(TOOL_NAME, asset, {'check': check, 'value': value, 'changes': changes})
+    
+    def alert_failing(self, asset, check, error):
+        self.stats['alerts'] += 1
+        print(f"🚨 {datetime.now().isoformat(timespec='seconds')} {asset} {check} failed "
+              f"{FAILURE_ALERT_AFTER} times in a row: {error}")
+        get_audit_logger().log(TOOL_NAME, 'failing', target=asset, check=check, error=str(error))
+    
+    async def run(self, once=False):
+        loop = asyncio.get_running_loop()
+        global_sem = asyncio.Semaphore(self.global_limit)
+        upstream_sems = {name: asyncio.Semaphore(limit) for name, limit in self.upstream_limits.items()}
+        self._stopped = asyncio.Event()
+        wakeup = asyncio.Event()
+        
+        # Spread the first round over a short window so startup is not a burst
+        now = time.monotonic()
+        heap = [(now + random.uniform(0, min(self.intervals[check], 60) * self.jitter), i, asset, check)
+                for i, (asset, check) in enumerate(self.jobs)]
+        heapq.heapify(heap)
+        running = set()
+        
+        def finished(task, index, asset, check):
+            running.discard(task)
+            if task.cancelled():
+                keep = False
+            elif task.exception() is not None:
+                # An alert or the audit log failed, not the check; try again next interval
+                self.stats['errors'] += 1
+                print(f"⚠️  {asset} {check}: {task.exception()!r}; retrying next interval")
+                keep = True
+            else:
+                keep = task.result()
+            if keep and not once:
+                heapq.heappush(heap, (time.monotonic() + self.next_delay(check), index, asset, check))
+            wakeup.set()
+        
+        with ThreadPoolExecutor(max_workers=self.global_limit, thread_name_prefix='monitor') as executor:
+            while not self._stopped.is_set() and (heap or running):
+                now = time.monotonic()
+                # On battery or mobile data the governor holds concurrency below global_limit
+                limit = self.governor.workers(self.global_limit)
+                while heap and heap[0][0] <= now and len(running) < limit:
+                    _, index, asset, check = heapq.heappop(heap)
+                    task = loop.create_task(self.run_job(asset, check, loop, executor, global_sem, upstream_sems))
+                    running.add(task)
+                    task.add_done_callback(lambda t, i=index, a=asset, c=check: finished(t, i, a, c))
+                
+                due = sum(1 for entry in heap if entry[0] <= now)
+                gauge('queue_depth', due, queue='due')
+                gauge('queue_depth', len(heap) - due, queue='scheduled')
+                gauge('in_flight_jobs', len(running))
+                
+                if due:
+                    # Due checks held back: wake on a finished job or to recheck the profile
+                    timeout = GOVERNOR_POLL
+                else:
+                    timeout = max(0.0, heap[0][0] - time.monotonic()) if heap else None
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            
+            for task in list(running):
+                task.cancel()
+        return self.stats
+    
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+def load_assets(path=None):
+    """Domains and IPs from a JSON asset file, or from the active scope manifest"""
+    if path:
+        with open(path, 'r') as f:
+            config = json.load(f)
+        domains, networks = config.get('domains', []), config.get('ips', [])
+    else:
+        scope = get_active_scope()
+        if scope is None:
+            raise SystemExit("No asset file given and no scope manifest configured")
+        # Wildcard entries have no single host to watch
+        domains = [domain for domain in scope.domain_patterns if not domain.startswith('*.')]
+        networks = scope.networks
+    
+    ips = []
+    for entry in networks:
+        network = ipaddress.ip_network(entry, strict=False)
+        if network.num_addresses > MAX_RANGE_ADDRESSES:
+            print(f"⚠️  {entry} has {network.num_addresses} addresses; watching its first address only")
+            ips.append(str(network.network_address))
+        elif network.num_addresses == 1:
+            ips.append(str(network.network_address))
+        else:
+            ips.extend(str(address) for address in network.hosts())
+    return domains, ips
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch owned domains and IPs for DNS, WHOIS, certificate and header drift")
+    parser.add_argument('--assets', help="JSON file with 'domains' and 'ips' (default: the scope manifest); "
+                        "assets must still be in scope")
+    parser.add_argument('--global-limit', type=int, default=8, help="Checks running at once")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Interval jitter fraction")
+    parser.add_argument('--once', action='store_true', help="Run every check once and exit")
+    parser.add_argument('--metrics-port', type=int, default=int(os.environ.get(PORT_ENV_VAR) or 0),
+                        help="Serve Prometheus /metrics on 127.0.0.1:PORT (default: off)")
+    args = parser.parse_args(argv)
+    
+    domains, ips = load_assets(args.assets)
+    # Authorize every asset up front; each decision lands in the audit log
+    domains = [domain for domain in domains if authorize(TOOL_NAME, domain)]
+    ips = [ip for ip in ips if authorize(TOOL_NAME, ip)]
+    if not domains and not ips:
+        print("Nothing in scope to monitor")
+        sys.exit(1)
+    
+    # Set here, not in the scheduler, since the governor is shared by the whole process
+    get_governor().budget_window = BUDGET_WINDOW
+    scheduler = MonitorScheduler(domains, ips, global_limit=args.global_limit, jitter=args.jitter)
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    print(f"👁️  Monitoring {len(domains)} domains and {len(ips)} IPs ({len(scheduler.jobs)} checks)")
+    try:
+        stats = asyncio.run(scheduler.run(once=args.once))
+    except KeyboardInterrupt:
+        stats = scheduler.stats
+    print(f"\n📊 Runs: {stats['runs']}  Alerts: {stats['alerts']}  Errors: {stats['errors']}")
+
+if __name__ == "__main__":
+    main()
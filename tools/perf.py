@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Performance Spans
+Per-stage wall time, requests, bytes, retries and cache use, embedded in reports as '_perf'
+and passed on to metrics sinks (see metrics.py)
+"""
+import argparse
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+
+# Set to 1 (or pass --perf to a tool) to record spans; child tools inherit it
+ENV_VAR = 'OSINT_PERF'
+# Width of the widest bar in the flame summary
+BAR_WIDTH = 30
+
+_enabled = os.environ.get(ENV_VAR, '').lower() in ('1', 'true', 'yes')
+_current = contextvars.ContextVar('osint_span', default=None)
+_lock = threading.Lock()
+# Long-running processes add a sink (metrics.get_metrics) that also receives every count,
+# observation and gauge, with labels such as host or cache
+_sinks = []
+
+class Span:
+    """One timed block and the counters charged while it was innermost.
+    
+    Children are appended from whichever thread runs them (run_stages
+    copies the context, so a stage thread's spans land under the span that
+    started it). A stage abandoned at the deadline keeps running on its
+    daemon thread; its span is reported as still open.
+    """
+    __slots__ = ('name', 'children', 'counters', 'started', 'seconds')
+    
+    def __init__(self, name):
+        self.name = name
+        self.children = []
+        self.counters = {}
+        self.started = time.perf_counter()
+        self.seconds = None
+    
+    def to_dict(self) -> dict:
+        """Nested section with counters totalled over the span and its children"""
+        children = [child.to_dict() for child in list(self.children)]
+        totals = dict(self.counters)
+        for child in children:
+            for key, value in child['counters'].items():
+                totals[key] = totals.get(key, 0) + value
+        section = {
+            'name': self.name,
+            'seconds': round(self.seconds if self.seconds is not None else time.perf_counter() - self.started, 4),
+            'counters': totals,
+            'children': children
+        }
+        if self.seconds is None:
+            section['open'] = True
+        return section
+
+class _NullSpan:
+    """What span() returns while instrumentation is off: entering and leaving it does nothing"""
+    def __enter__(self):
+        return None
+    
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _ActiveSpan:
+    def __init__(self, name, root=False):
+        self.name = name
+        self.root = root
+        self.span = None
+        self.token = None
+    
+    def __enter__(self):
+        parent = None if self.root else _current.get()
+        self.span = Span(self.name)
+        if parent is not None:
+            with _lock:
+                parent.children.append(self.span)
+        self.token = _current.set(self.span)
+        return self.span
+    
+    def __exit__(self, *exc):
+        self.span.seconds = time.perf_counter() - self.span.started
+        _current.reset(self.token)
+        return False
+
+def enabled() -> bool:
+    return _enabled
+
+def enable():
+    """Turn instrumentation on for this process and the tools it starts"""
+    global _enabled
+    _enabled = True
+    os.environ[ENV_VAR] = '1'
+
+def enable_from_argv(argv) -> bool:
+    """--perf in a tool's argv turns instrumentation on"""
+    if '--perf' in argv:
+        enable()
+    return _enabled
+
+def span(name):
+    """Time a block as a child of the current span (a no-op while instrumentation is off)"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _ActiveSpan(name)
+
+def count(labels=None, **counts):
+    """Charge counters (requests=1, bytes=n, ...) to the innermost span, if any, and to the sinks.
+    
+    labels (host, cache) only reach the sinks; spans already say where the work happened.
+    """
+    current = _current.get()
+    if current is not None:
+        with _lock:
+            for key, value in counts.items():
+                current.counters[key] = current.counters.get(key, 0) + value
+    for sink in _sinks:
+        sink.count(counts, labels or {})
+
+def observe(name, value, **labels):
+    """One measurement (a latency) for the sinks' histograms"""
+    for sink in _sinks:
+        sink.observe(name, value, labels)
+
+def gauge(name, value, **labels):
+    """Current level of something (queue depth, jobs in flight) for the sinks"""
+    for sink in _sinks:
+        sink.gauge(name, value, labels)
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.started = None
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+def timed(name, **labels):
+    """Observe how long a block takes (a no-op without a sink)"""
+    if not _sinks:
+        return _NULL_SPAN
+    return _Timer(name, labels)
+
+def add_sink(sink):
+    """Receive count(counts, labels), observe(name, value, labels) and gauge(name, value, labels) calls"""
+    with _lock:
+        if sink not in _sinks:
+            _sinks.append(sink)
+    return sink
+
+def instrumented(name):
+    """Decorator for report generators: a top-level call runs in a root span and the
+    report it returns gains a '_perf' section; nested calls are ordinary child spans."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            if _current.get() is not None:
+                with _ActiveSpan(name):
+                    return function(*args, **kwargs)
+            with _ActiveSpan(name, root=True) as root:
+                result = function(*args, **kwargs)
+            if isinstance(result, dict):
+                result['_perf'] = root.to_dict()
+            return result
+        return wrapper
+    return decorate
+
+def format_counters(counters) -> str:
+    parts = []
+    if counters.get('requests'):
+        parts.append(f"{counters['requests']} req")
+    if counters.get('bytes'):
+        parts.append(f"{counters['bytes'] / 1024:.1f} KiB")
+    if counters.get('retries'):
+        parts.append(f"{counters['retries']} retries")
+    if counters.get('backoffs'):
+        parts.append(f"{counters['backoffs']} backoffs")
+    if counters.get('cache_hits') or counters.get('cache_misses'):
+        parts.append(f"cache {counters.get('cache_hits', 0)}/{counters.get('cache_hits', 0) + counters.get('cache_misses', 0)}")
+    return '  '.join(parts)
+
+def flame_summary(perf) -> str:
+    """Indented flame-style view of a '_perf' section: one line per span, bar scaled to the root's time"""
+    total = perf['seconds'] or 1e-9
+    width = max(len(name) + 2 * depth for name, depth in _walk(perf))
+    lines = []
+    
+    def render(node, depth):
+        share = node['seconds'] / total
+        bar = '█' * max(1, round(share * BAR_WIDTH)) if node['seconds'] else ''
+        label = ('  ' * depth + node['name']).ljust(width)
+        flag = ' (still running)' if node.get('open') else ''
+        lines.append(f"{label}  {node['seconds']:7.2f}s {share:5.0%} {bar:<{BAR_WIDTH}} "
+                     f"{format_counters(node['counters'])}{flag}".rstrip())
+        # Slowest first, as a flame graph stacks them
+        for child in sorted(node['children'], key=lambda c: c['seconds'], reverse=True):
+            render(child, depth + 1)
+    
+    render(perf, 0)
+    return '\n'.join(lines)
+
+def _walk(node, depth=0):
+    yield node['name'], depth
+    for child in node['children']:
+        yield from _walk(child, depth + 1)
+
+def print_flame(report):
+    """Print the report's flame summary when it carries a '_perf' section"""
+    perf = report.get('_perf') if isinstance(report, dict) else None
+    if perf:
+        print(f"\n⏱️  PERFORMANCE:")
+        for line in flame_summary(perf).splitlines():
+            print(f"   {line}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flame-style summary of a stored report's '_perf' section")
+    parser.add_argument('report_id', type=int)
+    args = parser.parse_args(argv)
+    
+    try:
+        from tools.report_store import get_report_store
+    except ImportError:
+        from report_store import get_report_store
+    report = get_report_store().get_report(args.report_id)
+    if report is None:
+        print(f"❌ No report #{args.report_id}")
+        sys.exit(1)
+    if not report.get('_perf'):
+        print(f"❌ Report #{args.report_id} has no performance data (rerun the tool with --perf)")
+        sys.exit(1)
+    print(flame_summary(report['_perf']))
+
+if __name__ == "__main__":
+    main()
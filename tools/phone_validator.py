@@ -4,13 +4,38 @@ Phone Number Validation and Basic OSINT
 Educational purposes only - requires explicit consent
 """
 import re
-import requests
 import json
+import sys
 from typing import Dict, List, Optional
 
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+try:
+    from tools.deadline import deadline_scope, stage_timeout, budget_from_argv
+except ImportError:
+    from deadline import deadline_scope, stage_timeout, budget_from_argv
+
+try:
+    from tools.rate_limiter import RateLimitedSession
+except ImportError:
+    from rate_limiter import RateLimitedSession
+
+try:
+    from tools.perf import instrumented, span, enable_from_argv, print_flame
+except ImportError:
+    from perf import instrumented, span, enable_from_argv, print_flame
+
 class PhoneOSINT:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = RateLimitedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -84,7 +109,7 @@ class PhoneOSINT:
         try:
             # Check public Telegram info (t.me links)
             url = f"https://t.me/{username}"
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, timeout=stage_timeout(10))
             
             if response.status_code == 200:
                 results['username_exists'] = True
@@ -100,6 +125,7 @@ class PhoneOSINT:
         
         return results
     
+    @instrumented('generate_report')
     def generate_report(self, phone: str) -> Dict:
         """Generate comprehensive OSINT report"""
         print(f"\n{'='*50}")
@@ -109,10 +135,15 @@ class PhoneOSINT:
         print(f"Timestamp: {json.dumps(None, default=str)}")
         print(f"{'='*50}")
         
+        with span('phone_validation'):
+            validation = self.validate_phone_format(phone)
+        with span('whatsapp_business'):
+            whatsapp_business = self.check_whatsapp_business(phone)
+        
         report = {
             'target': phone,
-            'phone_validation': self.validate_phone_format(phone),
-            'whatsapp_business': self.check_whatsapp_business(phone),
+            'phone_validation': validation,
+            'whatsapp_business': whatsapp_business,
             'telegram_check': None,
             'recommendations': []
         }
@@ -144,22 +175,22 @@ def main():
     print("Messaging App OSINT Toolkit")
     print("Educational and authorized use only!")
     
-    # Get user consent
-    consent = input("\nDo you have explicit permission to test this number? (yes/no): ")
-    if consent.lower() != 'yes':
+    phone = input("Enter phone number (with country code): ")
+    if not authorize("Phone Validator", phone, "\nDo you have explicit permission to test this number? (yes/no): "):
         print("Exiting - proper authorization required")
         return
     
-    phone = input("Enter phone number (with country code): ")
-    
     osint = PhoneOSINT()
-    report = osint.generate_report(phone)
+    # python tools/phone_validator.py --deadline 60 --perf
+    enable_from_argv(sys.argv[1:])
+    with deadline_scope(budget_from_argv(sys.argv[1:])):
+        report = osint.generate_report(phone)
+    print_flame(report)
     
     # Save report
-    with open(f'report_{phone.replace("+", "").replace(" ", "")}.json', 'w') as f:
-        json.dump(report, f, indent=2)
+    report_id = get_report_store().save_report("Phone Validator", phone, report)
     
-    print(f"\nReport saved to report_{phone.replace('+', '').replace(' ', '')}.json")
+    print(f"\nReport saved as #{report_id} (python tools/report_store.py show {report_id})")
 
 if __name__ == "__main__":
     main()
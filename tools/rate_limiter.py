@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Per-host Rate Limiter
+AIMD request pacing per upstream host, shared by every tool process through SQLite
+"""
+import argparse
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    from tools.cassette import get_cassette
+    from tools.deadline import wait_budget
+    from tools.governor import get_governor
+    from tools.perf import count, observe, timed
+except ImportError:
+    from cassette import get_cassette
+    from deadline import wait_budget
+    from governor import get_governor
+    from perf import count, observe, timed
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.path.join(ROOT_DIR, 'reports', 'rate_limits.db')
+# Requests per second a host starts at, and the bounds AIMD moves within
+INITIAL_RATE = 2.0
+MIN_RATE = 0.05
+MAX_RATE = 10.0
+# Additive increase per successful response, multiplicative decrease per throttle
+RATE_STEP = 0.25
+BACKOFF = 0.5
+# Published free-tier limits: the starting rate and ceiling for those hosts, so they are
+# never discovered with 429s
+HOST_RATES = {
+    'ip-api.com': 0.75,                 # 45 requests/minute
+    'ipapi.co': 0.5,
+    'api.pwnedpasswords.com': 5.0,
+    'check.torproject.org': 0.2
+}
+THROTTLE_STATUSES = (429, 503)
+# Retry-After values beyond this are treated as this (a misconfigured server can say "a week")
+MAX_RETRY_AFTER = 3600
+# Longest a single request waits in-process for its slot; longer waits are deferred to the caller
+MAX_INLINE_WAIT = 30
+MAX_RETRIES = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    rate REAL NOT NULL,
+    next_slot REAL NOT NULL,
+    blocked_until REAL NOT NULL,
+    throttled INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL
+)
+"""
+
+class RateLimitDeferred(requests.exceptions.RequestException):
+    """The host's next free slot is further away than the caller can wait"""
+    def __init__(self, host, ready_at):
+        super().__init__(f"{host} is rate limited for another {ready_at - time.time():.1f}s")
+        self.host = host
+        self.ready_at = ready_at
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), None if absent or unreadable"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+class HostRateLimiter:
+    """Hands out request slots per host; state lives in SQLite so concurrent processes share it.
+    
+    Each host has a rate in requests per second. A slot is reserved by
+    moving the host's next_slot forward by 1/rate inside an IMMEDIATE
+    transaction, so two processes never get the same slot. Successful
+    responses raise the rate by RATE_STEP, 429/503 halve it and block the
+    host until Retry-After (or one interval) has passed.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH, timeout=30.0):
+        self.db_path = db_path
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+    
+    def _update(self, host, change):
+        """Run change(state, now) on the host's row in one write transaction and store the result"""
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                row = self.conn.execute('SELECT * FROM hosts WHERE host = ?', (host,)).fetchone()
+                state = dict(row) if row else {'host': host, 'rate': HOST_RATES.get(host, INITIAL_RATE),
+                                               'next_slot': now, 'blocked_until': 0.0, 'throttled': 0}
+                result = change(state, now)
+                state['updated'] = now
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO hosts (host, rate, next_slot, blocked_until, throttled, updated) '
+                    'VALUES (:host, :rate, :next_slot, :blocked_until, :throttled, :updated)', state)
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return result
+    
+    def acquire(self, host, max_wait=None) -> float:
+        """Reserve the host's next slot and sleep until it; returns the seconds waited.
+        
+        Raises RateLimitDeferred without reserving anything when the slot is
+        more than max_wait seconds away.
+        """
+        def reserve(state, now):
+            slot = max(now, state['next_slot'], state['blocked_until'])
+            if max_wait is not None and slot - now > max_wait:
+                raise RateLimitDeferred(host, slot)
+            state['next_slot'] = slot + 1.0 / state['rate']
+            return slot - now
+        
+        wait = self._update(host, reserve)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def record(self, host, status, retry_after=None):
+        """Adapt the host's rate to a response status"""
+        def adapt(state, now):
+            if status in THROTTLE_STATUSES:
+                state['rate'] = max(MIN_RATE, state['rate'] * BACKOFF)
+                pause = retry_after if retry_after is not None else 1.0 / state['rate']
+                state['blocked_until'] = max(state['blocked_until'], now + pause)
+                state['next_slot'] = max(state['next_slot'], state['blocked_until'])
+                state['throttled'] += 1
+            elif status < 500:
+                state['rate'] = min(HOST_RATES.get(host, MAX_RATE), state['rate'] + RATE_STEP)
+        self._update(host, adapt)
+    
+    def ready_at(self, host) -> float:
+        """Unix time of the host's next free slot"""
+        with self._lock:
+            row = self.conn.execute('SELECT next_slot, blocked_until FROM hosts WHERE host = ?',
+                                    (host,)).fetchone()
+        return max(row['next_slot'], row['blocked_until']) if row else time.time()
+    
+    def hosts(self) -> list:
+        with self._lock:
+            return [dict(row) for row in self.conn.execute('SELECT * FROM hosts ORDER BY host')]
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that paces every request through the shared per-host limiter.
+    
+    Downloaded bytes count against the power governor's budget; once it is
+    spent, requests raise ByteBudgetExceeded instead of going out.
+    
+    Throttled responses are retried in place while the wait fits in
+    MAX_INLINE_WAIT and the run's deadline; otherwise the 429/503 response
+    is returned so the caller can defer the request (see ready_at).
+    
+    With a cassette (see cassette.py) every transport adapter is wrapped
+    to record the exchange, or to replay it without pacing or charging the
+    budget, since nothing leaves the device.
+    """
+    def __init__(self, limiter=None, max_retries=MAX_RETRIES):
+        super().__init__()
+        self._limiter = limiter
+        self.max_retries = max_retries
+    
+    @property
+    def limiter(self) -> HostRateLimiter:
+        # Opened on first use so tools that never go online never touch the database
+        if self._limiter is None:
+            self._limiter = get_rate_limiter()
+        return self._limiter
+    
+    def paced(self, host):
+        """Wait for the host's next slot, within what the deadline allows"""
+        wait = self.limiter.acquire(host, max_wait=wait_budget(MAX_INLINE_WAIT))
+        if wait > 0:
+            observe('rate_limit_wait_seconds', wait, host=host)
+    
+    def get_adapter(self, url):
+        adapter = super().get_adapter(url)
+        cassette = get_cassette()
+        return adapter if cassette is None else cassette.wrap(adapter)
+    
+    def request(self, method, url, **kwargs):
+        host = urlsplit(url).hostname or ''
+        labels = {'host': host}
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            count(labels, requests=1)
+            with timed('request_seconds', **labels):
+                response = super().request(method, url, **kwargs)
+            count(labels, bytes=len(response.content) + 512)
+            return response
+        governor = get_governor()
+        governor.check_budget()
+        self.paced(host)
+        for attempt in range(self.max_retries + 1):
+            # Counted before sending, so requests that fail still show up in the report's '_perf'
+            count(labels, requests=1, retries=1 if attempt else 0)
+            with timed('request_seconds', **labels):
+                response = super().request(method, url, **kwargs)
+                # Body plus a rough allowance for headers, against the power profile's byte budget
+                nbytes = len(response.content) + 512
+            governor.charge(nbytes)
+            count(labels, bytes=nbytes)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.limiter.record(host, response.status_code, retry_after)
+            if response.status_code in THROTTLE_STATUSES:
+                count(labels, backoffs=1)
+            if response.status_code not in THROTTLE_STATUSES or attempt == self.max_retries:
+                return response
+            try:
+                self.paced(host)
+            except RateLimitDeferred:
+                return response
+            response.close()
+        return response
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Process-wide limiter (OSINT_RATE_DB overrides the database path)"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter(os.environ.get('OSINT_RATE_DB', DEFAULT_DB_PATH))
+            atexit.register(_shared_limiter.close)
+        return _shared_limiter
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or reset shared per-host rate limits")
+    parser.add_argument('--reset', metavar='HOST', help="Forget the learned rate for HOST")
+    args = parser.parse_args(argv)
+    
+    limiter = get_rate_limiter()
+    if args.reset:
+        with limiter._lock:
+            limiter.conn.execute('DELETE FROM hosts WHERE host = ?', (args.reset,))
+        print(f"✅ Reset {args.reset}")
+        return
+    
+    now = time.time()
+    for host in limiter.hosts():
+        blocked = max(0.0, host['blocked_until'] - now)
+        print(f"{host['host']:<32} {host['rate']:6.2f}/s  throttled {host['throttled']:<4}"
+              + (f" blocked {blocked:.0f}s" if blocked else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Report Store
+SQLite database holding every tool's reports, indexed by target, tool and time
+"""
+import argparse
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from datetime import datetime
+
+try:
+    from tools.events import emit
+except ImportError:
+    from events import emit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.path.join(ROOT_DIR, 'reports', 'osint_reports.db')
+ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+SCHEMA_VERSION = 2
+# Strings at least this long, and artifact dicts this large once encoded,
+# are moved into the blob table and replaced by {"$blob": digest, "bytes": n}
+BLOB_MIN_BYTES = 512
+ARTIFACT_KEYS = {'raw_whois', 'exif_data', 'headers', 'raw_headers'}
+BLOB_MARKER = '"$blob"'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    target TEXT,
+    timestamp TEXT NOT NULL,
+    session_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_target ON reports (target, tool, timestamp);
+CREATE INDEX IF NOT EXISTS idx_reports_tool ON reports (tool, timestamp);
+CREATE INDEX IF NOT EXISTS idx_reports_timestamp ON reports (timestamp);
+
+CREATE TABLE IF NOT EXISTS sections (
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    section TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (report_id, section)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sections_section ON sections (section, report_id);
+
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+class ReportStore:
+    """One row per report plus one row per top-level report section.
+    
+    The database runs in WAL mode so several tool processes can write at
+    once while readers keep working; each write is a single short
+    transaction.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH, timeout=30.0):
+        self.db_path = db_path
+        # Digests known to be stored already, so repeat artifacts skip compression and the insert
+        self._known_blobs = set()
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+    
+    # -- writing -----------------------------------------------------------
+    
+    def save_report(self, tool, target, report, session_id=None, timestamp=None) -> int:
+        """Store a report dict; each top-level key becomes a section. Returns the report id"""
+        if not isinstance(report, dict):
+            report = {'result': report}
+        timestamp = timestamp or report.get('timestamp') or datetime.now().isoformat()
+        # Launchers export OSINT_SESSION_ID so every tool they start shares one session
+        session_id = session_id or os.environ.get('OSINT_SESSION_ID')
+        with self._lock:
+            try:
+                with self.conn:
+                    cursor = self.conn.execute(
+                        'INSERT INTO reports (tool, target, timestamp, session_id) VALUES (?, ?, ?, ?)',
+                        (tool, target, str(timestamp), session_id))
+                    report_id = cursor.lastrowid
+                    self.conn.executemany(
+                        'INSERT INTO sections (report_id, section, data) VALUES (?, ?, ?)',
+                        [(report_id, str(section), ENCODER.encode(self._externalize(data)))
+                         for section, data in report.items()])
+            except sqlite3.Error:
+                # Blob inserts rolled back with the report; forget what we thought was stored
+                self._known_blobs.clear()
+                raise
+        # Every tool saves through here, so this is the one place the result event comes from
+        emit('result', report_id=report_id, tool=tool, target=target, session_id=session_id,
+             sections=list(report))
+        return report_id
+    
+    # -- blobs -------------------------------------------------------------
+    
+    def _externalize(self, value, key=None):
+        """Swap large raw artifacts for blob references; called inside the write transaction"""
+        if isinstance(value, str):
+            if len(value) >= BLOB_MIN_BYTES:
+                return self._put_blob('text', value.encode('utf-8'))
+            return value
+        if isinstance(value, dict):
+            if key in ARTIFACT_KEYS:
+                encoded = ENCODER.encode(value).encode('utf-8')
+                if len(encoded) >= BLOB_MIN_BYTES:
+                    return self._put_blob('json', encoded)
+            return {k: self._externalize(v, k) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._externalize(item) for item in value]
+        return value
+    
+    def _put_blob(self, kind, data):
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self._known_blobs:
+            exists = self.conn.execute('SELECT 1 FROM blobs WHERE digest = ?', (digest,)).fetchone()
+            if not exists:
+                self.conn.execute('INSERT OR IGNORE INTO blobs (digest, kind, size, data) VALUES (?, ?, ?, ?)',
+                                  (digest, kind, len(data), zlib.compress(data, 6)))
+            self._known_blobs.add(digest)
+        return {'$blob': digest, 'bytes': len(data)}
+    
+    def get_blob(self, digest):
+        """The original artifact (str or decoded JSON) for a digest, or None"""
+        with self._lock:
+            row = self.conn.execute('SELECT kind, data FROM blobs WHERE digest = ?', (digest,)).fetchone()
+        if row is None:
+            return None
+        data = zlib.decompress(row['data']).decode('utf-8')
+        return json.loads(data) if row['kind'] == 'json' else data
+    
+    def _resolve(self, value):
+        if isinstance(value, dict):
+            if '$blob' in value and len(value) == 2:
+                return self.get_blob(value['$blob'])
+            return {k: self._resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        return value
+    
+    def _decode(self, data, resolve_blobs):
+        value = json.loads(data)
+        if resolve_blobs and BLOB_MARKER in data:
+            value = self._resolve(value)
+        return value
+    
+    # -- reading -----------------------------------------------------------
+    
+    def get_report(self, report_id, resolve_blobs=True) -> dict:
+        """The report as it was saved, plus its store metadata under '_report'"""
+        with self._lock:
+            row = self.conn.execute('SELECT * FROM reports WHERE id = ?', (report_id,)).fetchone()
+            if row is None:
+                return None
+            sections = self.conn.execute(
+                'SELECT section, data FROM sections WHERE report_id = ?', (report_id,)).fetchall()
+        report = {section: self._decode(data, resolve_blobs) for section, data in sections}
+        report['_report'] = dict(row)
+        return report
+    
+    @staticmethod
+    def _where(target=None, tool=None, session_id=None, since=None, until=None):
+        clauses = []
+        params = []
+        for column, value in (('target', target), ('tool', tool), ('session_id', session_id)):
+            if value is not None:
+                clauses.append(f'reports.{column} = ?')
+                params.append(value)
+        if since is not None:
+            clauses.append('reports.timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('reports.timestamp < ?')
+            params.append(until)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+    
+    def find(self, target=None, tool=None, session_id=None, since=None, until=None, limit=None) -> list:
+        """Report metadata rows matching the filters, newest first"""
+        where, params = self._where(target, tool, session_id, since, until)
+        sql = 'SELECT * FROM reports' + where
+        sql += ' ORDER BY timestamp DESC, id DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+    
+    def iter_sections(self, target=None, tool=None, session_id=None, since=None, until=None, batch=64,
+                      resolve_blobs=True):
+        """Stream (report row, section, data) oldest first, one section decoded at a time"""
+        where, params = self._where(target, tool, session_id, since, until)
+        sql = ('SELECT reports.*, sections.section, sections.data FROM reports '
+               'JOIN sections ON sections.report_id = reports.id' + where +
+               ' ORDER BY reports.timestamp, reports.id, sections.section')
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            for row in rows:
+                meta = {key: row[key] for key in ('id', 'tool', 'target', 'timestamp', 'session_id')}
+                yield meta, row['section'], self._decode(row['data'], resolve_blobs)
+    
+    def iter_reports(self, resolve_blobs=True, **filters):
+        """Full reports matching find() filters, newest first"""
+        for row in self.find(**filters):
+            yield self.get_report(row['id'], resolve_blobs=resolve_blobs)
+    
+    def export(self, output_path, fmt='json', resolve_blobs=True, **filters) -> int:
+        """Write matching reports as a JSON array, JSON Lines, or gzipped JSON Lines; returns the count"""
+        count = 0
+        tmp_path = f"{output_path}.tmp"
+        opener = gzip.open if fmt == 'jsonl.gz' else open
+        with opener(tmp_path, 'wt') as f:
+            if fmt == 'json':
+                f.write('[\n')
+            for report in self.iter_reports(resolve_blobs=resolve_blobs, **filters):
+                if fmt == 'json':
+                    f.write((',\n' if count else '') + json.dumps(report, indent=2, default=str))
+                else:
+                    f.write(ENCODER.encode(report) + '\n')
+                count += 1
+            if fmt == 'json':
+                f.write('\n]\n')
+        os.replace(tmp_path, output_path)
+        return count
+    
+    def import_files(self, paths, tool=None) -> int:
+        """Load legacy report_*.json style files; the tool defaults to the file name prefix"""
+        imported = 0
+        for path in paths:
+            try:
+                with open(path, 'r') as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                continue
+            name = tool or os.path.basename(path).split('_report')[0].split('.')[0] or 'legacy'
+            target = None
+            if isinstance(report, dict):
+                target = report.get('target') or report.get('phone') or report.get('username') \
+                    or report.get('domain') or report.get('email') or report.get('ip')
+            timestamp = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            self.save_report(name, str(target) if target is not None else None, report, timestamp=timestamp)
+            imported += 1
+        return imported
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+def get_report_store() -> ReportStore:
+    """Process-wide report store (OSINT_REPORT_DB overrides the database path)"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ReportStore(os.environ.get('OSINT_REPORT_DB', DEFAULT_DB_PATH))
+            atexit.register(_shared_store.close)
+        return _shared_store
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and export stored OSINT reports")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    def add_filters(command):
+        command.add_argument('--target')
+        command.add_argument('--tool')
+        command.add_argument('--session', dest='session_id')
+        command.add_argument('--since', help="ISO timestamp")
+        command.add_argument('--until', help="ISO timestamp, exclusive")
+        command.add_argument('--limit', type=int)
+    
+    add_filters(commands.add_parser('list', help="List stored reports"))
+    show = commands.add_parser('show', help="Print one report")
+    show.add_argument('report_id', type=int)
+    blob = commands.add_parser('blob', help="Print a stored raw artifact by digest")
+    blob.add_argument('digest')
+    export = commands.add_parser('export', help="Export reports to a file")
+    export.add_argument('output')
+    export.add_argument('--format', choices=['json', 'jsonl', 'jsonl.gz'], default='json')
+    export.add_argument('--blob-refs', action='store_true',
+                        help="Keep blob digests instead of inlining raw artifacts")
+    add_filters(export)
+    legacy = commands.add_parser('import', help="Import legacy JSON report files")
+    legacy.add_argument('files', nargs='+')
+    legacy.add_argument('--tool', help="Tool name to record (default: from file name)")
+    args = parser.parse_args(argv)
+    
+    store = get_report_store()
+    
+    if args.command == 'show':
+        report = store.get_report(args.report_id)
+        if report is None:
+            print(f"❌ No report #{args.report_id}")
+            sys.exit(1)
+        print(json.dumps(report, indent=2, default=str))
+    elif args.command == 'blob':
+        artifact = store.get_blob(args.digest)
+        if artifact is None:
+            print(f"❌ No blob {args.digest}")
+            sys.exit(1)
+        print(artifact if isinstance(artifact, str) else json.dumps(artifact, indent=2))
+    elif args.command == 'import':
+        print(f"✅ Imported {store.import_files(args.files, tool=args.tool)} reports")
+    else:
+        filters = {'target': args.target, 'tool': args.tool, 'session_id': args.session_id,
+                   'since': args.since, 'until': args.until, 'limit': args.limit}
+        if args.command == 'export':
+            count = store.export(args.output, fmt=args.format, resolve_blobs=not args.blob_refs, **filters)
+            print(f"✅ Exported {count} reports to {args.output}")
+        else:
+            rows = store.find(**filters)
+            for row in rows:
+                print(f"#{row['id']:<6} {row['timestamp']}  {row['tool']:<22} {row['target']}")
+            print(f"📊 {len(rows)} reports")
+
+if __name__ == "__main__":
+    main()
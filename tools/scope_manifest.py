@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Engagement Scope Manifest
+Signed list of authorized targets checked by every tool before it runs
+"""
+import argparse
+import bisect
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+try:
+    from tools.audit_logger import get_audit_logger
+except ImportError:
+    from audit_logger import get_audit_logger
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MANIFEST_PATH = os.path.join(ROOT_DIR, 'config', 'scope_manifest.json')
+MANIFEST_FIELDS = ('engagement_id', 'client_reference', 'expires', 'domains', 'cidrs', 'identifiers', 'paths')
+PHONE_RE = re.compile(r'^\+?[\d\s()-]{7,}$')
+DOMAIN_RE = re.compile(r'^(?=.{1,253}$)([a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)+[a-z][a-z0-9-]{0,62}$')
+
+class ScopeError(Exception):
+    """Manifest missing, tampered with, or expired"""
+
+class DomainTrie:
+    """Reversed-label trie: 'example.com' covers itself and every subdomain,
+    '*.example.com' covers subdomains only"""
+    TERMINAL = '$'
+    
+    def __init__(self, patterns=()):
+        self.root = {}
+        for pattern in patterns:
+            self.add(pattern)
+    
+    def add(self, pattern):
+        pattern = pattern.strip().lower().rstrip('.')
+        subdomains_only = pattern.startswith('*.')
+        if subdomains_only:
+            pattern = pattern[2:]
+        node = self.root
+        for label in reversed(pattern.split('.')):
+            node = node.setdefault(label, {})
+        # A plain entry beats a wildcard for the same name
+        if node.get(self.TERMINAL) != 'tree':
+            node[self.TERMINAL] = 'subdomains' if subdomains_only else 'tree'
+    
+    def match(self, host):
+        """The covering pattern for host, or None"""
+        labels = host.lower().rstrip('.').split('.')
+        node = self.root
+        depth = 0
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                return None
+            depth += 1
+            kind = node.get(self.TERMINAL)
+            if kind == 'tree' or (kind == 'subdomains' and depth < len(labels)):
+                suffix = '.'.join(labels[-depth:])
+                return suffix if kind == 'tree' else f"*.{suffix}"
+        return None
+
+class CIDRIndex:
+    """Merged, sorted address intervals per IP version; lookups are one bisect"""
+    def __init__(self, networks=()):
+        intervals = {4: [], 6: []}
+        for network in networks:
+            net = ipaddress.ip_network(network.strip(), strict=False)
+            intervals[net.version].append((int(net.network_address), int(net.broadcast_address), str(net)))
+        self.starts = {}
+        self.ends = {}
+        self.labels = {}
+        for version, spans in intervals.items():
+            spans.sort()
+            merged = []
+            for start, end, label in spans:
+                if merged and start <= merged[-1][1] + 1:
+                    if end > merged[-1][1]:
+                        merged[-1] = (merged[-1][0], end, f"{merged[-1][2]}+{label}")
+                else:
+                    merged.append((start, end, label))
+            self.starts[version] = [span[0] for span in merged]
+            self.ends[version] = [span[1] for span in merged]
+            self.labels[version] = [span[2] for span in merged]
+    
+    def match(self, address):
+        """The covering range for an ip_address, or None"""
+        value = int(address)
+        starts = self.starts[address.version]
+        i = bisect.bisect_right(starts, value) - 1
+        if i >= 0 and value <= self.ends[address.version][i]:
+            return self.labels[address.version][i]
+        return None
+
+def normalize_identifier(value):
+    """Canonical form used for identifier comparison (phones keep only digits)"""
+    value = value.strip()
+    if PHONE_RE.match(value):
+        return re.sub(r'\D', '', value)
+    return value.casefold()
+
+def canonical_payload(manifest):
+    body = {key: manifest[key] for key in sorted(manifest) if key != 'signature'}
+    return json.dumps(body, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def sign_manifest(manifest, key):
+    return hmac.new(key, canonical_payload(manifest), hashlib.sha256).hexdigest()
+
+def signing_key():
+    """HMAC key from OSINT_SCOPE_KEY (hex, or used verbatim)"""
+    value = os.environ.get('OSINT_SCOPE_KEY')
+    if not value:
+        raise ScopeError("OSINT_SCOPE_KEY is not set; cannot verify the scope manifest")
+    try:
+        return bytes.fromhex(value)
+    except ValueError:
+        return value.encode('utf-8')
+
+def parse_expiry(value):
+    expires = datetime.fromisoformat(value)
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=timezone.utc)
+    return expires
+
+class ScopeManifest:
+    """A verified engagement manifest with prebuilt matchers"""
+    def __init__(self, manifest, key=None, verify=True):
+        if verify:
+            signature = manifest.get('signature', '')
+            expected = sign_manifest(manifest, key if key is not None else signing_key())
+            if not hmac.compare_digest(signature, expected):
+                raise ScopeError("Scope manifest signature does not match; refusing to use it")
+        
+        self.engagement_id = manifest.get('engagement_id')
+        self.client_reference = manifest.get('client_reference')
+        if not manifest.get('expires'):
+            raise ScopeError("Scope manifest has no expiry")
+        self.expires = parse_expiry(manifest['expires'])
+        self.domain_patterns = list(manifest.get('domains', []))
+        self.networks = list(manifest.get('cidrs', []))
+        self.domains = DomainTrie(self.domain_patterns)
+        self.cidrs = CIDRIndex(self.networks)
+        self.identifiers = {normalize_identifier(value) for value in manifest.get('identifiers', [])}
+        self.paths = [os.path.realpath(path) for path in manifest.get('paths', [])]
+    
+    @classmethod
+    def load(cls, path, key=None):
+        try:
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ScopeError(f"Cannot read scope manifest {path}: {e}")
+        return cls(manifest, key=key)
+    
+    def expired(self):
+        return datetime.now(timezone.utc) >= self.expires
+    
+    def check(self, target, kind=None) -> dict:
+        """Decide whether target is in scope.
+        
+        kind='path' checks a local file against the manifest's paths;
+        everything else is classified from the target itself (URL, IP,
+        email, domain, then plain identifier).
+        """
+        decision = {'allowed': False, 'target': target, 'matched': None, 'reason': None}
+        if self.expired():
+            decision['reason'] = f"engagement expired {self.expires.isoformat()}"
+            return decision
+        if not target or not target.strip():
+            decision['reason'] = "empty target"
+            return decision
+        target = target.strip()
+        
+        if kind == 'path':
+            real = os.path.realpath(target)
+            for root in self.paths:
+                if real == root or real.startswith(root.rstrip(os.sep) + os.sep):
+                    decision.update(allowed=True, matched=root)
+                    return decision
+            decision['reason'] = "path outside authorized directories"
+            return decision
+        
+        if normalize_identifier(target) in self.identifiers:
+            decision.update(allowed=True, matched='identifier')
+            return decision
+        
+        host = target
+        if '://' in target:
+            host = urlsplit(target).hostname or ''
+        elif '@' in target:
+            host = target.rsplit('@', 1)[1]
+        
+        try:
+            address = ipaddress.ip_address(host.strip('[]'))
+        except ValueError:
+            address = None
+        if address is not None:
+            matched = self.cidrs.match(address)
+            decision.update(allowed=matched is not None, matched=matched,
+                            reason=None if matched else "address outside authorized ranges")
+            return decision
+        
+        if DOMAIN_RE.match(host.lower()):
+            matched = self.domains.match(host)
+            decision.update(allowed=matched is not None, matched=matched,
+                            reason=None if matched else "domain outside authorized scope")
+            return decision
+        
+        decision['reason'] = "identifier not listed in scope manifest"
+        return decision
+
+_active_scope = {}
+
+def get_active_scope():
+    """Manifest named by OSINT_SCOPE_MANIFEST (or config/scope_manifest.json), reloaded when it changes.
+    
+    Returns None when no manifest is configured; raises ScopeError when one
+    is configured but cannot be trusted.
+    """
+    path = os.environ.get('OSINT_SCOPE_MANIFEST', DEFAULT_MANIFEST_PATH)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        if 'OSINT_SCOPE_MANIFEST' in os.environ:
+            raise ScopeError(f"Scope manifest {path} not found")
+        return None
+    cached = _active_scope.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, ScopeManifest.load(path))
+        _active_scope[path] = cached
+    return cached[1]
+
+def authorize(tool_name, target, prompt=None, kind=None) -> bool:
+    """Single authorization gate for every tool; each decision is audit logged.
+    
+    With a scope manifest the decision is made against it and no prompt is
+    shown. Without one, an interactive terminal falls back to the consent
+    prompt; piped (automated) runs are refused. kind='device' (the
+    operator's own handset data) is never in a manifest and always prompts.
+    """
+    logger = get_audit_logger()
+    try:
+        scope = get_active_scope() if kind != 'device' else None
+    except ScopeError as e:
+        logger.log(tool_name, 'denied', target=target, basis='scope-manifest',
+                   reason=str(e), consent_given=False, durable=True)
+        print(f"⛔ {e}")
+        return False
+    
+    if scope is not None:
+        decision = scope.check(target, kind=kind)
+        logger.log(tool_name, 'authorized' if decision['allowed'] else 'denied', target=target,
+                   basis='scope-manifest', engagement_id=scope.engagement_id,
+                   client_reference=scope.client_reference, matched=decision['matched'],
+                   reason=decision['reason'], consent_given=decision['allowed'], durable=True)
+        if not decision['allowed']:
+            print(f"⛔ {target} is out of scope for {scope.engagement_id}: {decision['reason']}")
+        return decision['allowed']
+    
+    if prompt is None or not sys.stdin.isatty():
+        logger.log(tool_name, 'denied', target=target, basis='none',
+                   reason="no scope manifest for non-interactive run", consent_given=False, durable=True)
+        print("⛔ No scope manifest configured (set OSINT_SCOPE_MANIFEST); refusing non-interactive run")
+        return False
+    
+    consent = input(prompt)
+    allowed = consent.lower() == 'yes'
+    logger.log(tool_name, 'authorized' if allowed else 'denied', target=target,
+               basis='interactive', consent_given=allowed, durable=True)
+    return allowed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engagement scope manifest tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    sign = commands.add_parser('sign', help="Sign a manifest in place with OSINT_SCOPE_KEY")
+    sign.add_argument('manifest')
+    check = commands.add_parser('check', help="Check targets against a manifest")
+    check.add_argument('manifest')
+    check.add_argument('targets', nargs='+')
+    check.add_argument('--path', action='store_true', help="Treat targets as local file paths")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.command == 'sign':
+            with open(args.manifest, 'r') as f:
+                manifest = json.load(f)
+            unknown = set(manifest) - set(MANIFEST_FIELDS) - {'signature'}
+            if unknown:
+                raise ScopeError(f"Unknown manifest fields: {', '.join(sorted(unknown))}")
+            ScopeManifest(manifest, verify=False)
+            manifest['signature'] = sign_manifest(manifest, signing_key())
+            tmp_path = f"{args.manifest}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, args.manifest)
+            print(f"✅ Signed {args.manifest} (expires {manifest['expires']})")
+            return
+        
+        scope = ScopeManifest.load(args.manifest)
+    except ScopeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    for target in args.targets:
+        decision = scope.check(target, kind='path' if args.path else None)
+        if decision['allowed']:
+            print(f"✅ {target}  ({decision['matched']})")
+        else:
+            print(f"⛔ {target}  ({decision['reason']})")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ Social Media Cross-Reference Tool
 Educational purposes - requires explicit consent
 """
 
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
 def check_social_platforms(phone_or_username):
     """
     Check various platforms for username/phone presence
@@ -29,4 +34,7 @@ if __name__ == "__main__":
     print("Requires explicit consent and authorization")
     
     target = input("Enter username or phone: ")
-    check_social_platforms(target)
+    if authorize("Social Lookup", target, "\nDo you have permission to look up this target? (yes/no): "):
+        check_social_platforms(target)
+    else:
+        print("Exiting - proper authorization required")
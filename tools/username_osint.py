@@ -4,13 +4,57 @@ Username OSINT Tool
 Educational and authorized use only
 """
 import requests
-import json
 from datetime import datetime
 import time
+import sys
+from urllib.parse import urlsplit
+
+try:
+    from tools.scope_manifest import authorize
+except ImportError:
+    from scope_manifest import authorize
+
+try:
+    from tools.report_store import get_report_store
+except ImportError:
+    from report_store import get_report_store
+
+try:
+    from tools.deadline import DeadlineExceeded, current_deadline, deadline_scope, stage_timeout, budget_from_argv
+except ImportError:
+    from deadline import DeadlineExceeded, current_deadline, deadline_scope, stage_timeout, budget_from_argv
+
+try:
+    from tools.rate_limiter import RateLimitedSession, RateLimitDeferred, THROTTLE_STATUSES
+except ImportError:
+    from rate_limiter import RateLimitedSession, RateLimitDeferred, THROTTLE_STATUSES
+
+try:
+    from tools.checkpoint import open_journal, finish_journal, job_from_argv
+except ImportError:
+    from checkpoint import open_journal, finish_journal, job_from_argv
+
+try:
+    from tools.events import emit, stage
+except ImportError:
+    from events import emit, stage
+
+try:
+    from tools.cassette import cassette_from_argv
+except ImportError:
+    from cassette import cassette_from_argv
+
+try:
+    from tools.perf import instrumented, count, span, enable_from_argv, print_flame
+except ImportError:
+    from perf import instrumented, count, span, enable_from_argv, print_flame
+
+# Longest a throttled platform is waited for before it is reported as rate limited
+MAX_DEFER_WAIT = 60
 
 class UsernameOSINT:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = RateLimitedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -60,8 +104,8 @@ class UsernameOSINT:
             'whatsapp': 'WhatsApp usernames not publicly searchable'
         }
     
-    def check_username_availability(self, username: str) -> dict:
-        """Check username across multiple platforms"""
+    def check_username_availability(self, username: str, journal=None) -> dict:
+        """Check username across multiple platforms; platforms already in the job's journal are not re-checked"""
         results = {
             'username': username,
             'timestamp': datetime.now().isoformat(),
@@ -69,44 +113,80 @@ class UsernameOSINT:
             'found_profiles': [],
             'not_found': [],
             'errors': [],
-            'rate_limited': []
+            'rate_limited': [],
+            'skipped': [],
+            'incomplete': False
         }
+        deadline = current_deadline()
+        deferred = []
         
         print(f"\n🔍 Checking username '{username}' across platforms...")
         print("Note: This checks public availability only")
         
         for platform, url_template in self.platforms.items():
             if isinstance(url_template, str) and '{}' in url_template:
+                if deadline.expired():
+                    # Out of time: record what was not checked rather than running over
+                    results['skipped'].append(platform)
+                    results['incomplete'] = True
+                    continue
                 url = url_template.format(username)
-                status = self.check_url_exists(url, platform)
-                
-                results['platforms_checked'] += 1
-                
-                if status == 'found':
-                    results['found_profiles'].append({
-                        'platform': platform,
-                        'url': url,
-                        'status': 'Profile exists'
-                    })
-                    print(f"   ✓ {platform}: {url}")
-                elif status == 'not_found':
-                    results['not_found'].append(platform)
-                elif status == 'error':
-                    results['errors'].append(platform)
-                elif status == 'rate_limited':
-                    results['rate_limited'].append(platform)
-                
-                # Rate limiting to be respectful
-                time.sleep(0.5)
+                if journal is not None and platform in journal:
+                    self.record_status(results, platform, url, journal.get(platform))
+                    continue
+                with span(platform):
+                    status = self.check_url_exists(url, platform)
+                if status == 'rate_limited':
+                    # Come back once the host's backoff has passed instead of dropping it
+                    deferred.append((platform, url))
+                    continue
+                self.record_status(results, platform, url, status, journal)
             else:
                 results['not_found'].append(f"{platform}: {url_template}")
         
+        # Deferred retries, soonest-free host first, for as long as the deadline allows
+        limiter = self.session.limiter
+        deferred.sort(key=lambda item: limiter.ready_at(urlsplit(item[1]).hostname))
+        for platform, url in deferred:
+            wait = limiter.ready_at(urlsplit(url).hostname) - time.time()
+            if wait > min(MAX_DEFER_WAIT, deadline.remaining()):
+                status = 'rate_limited'
+            else:
+                time.sleep(max(0.0, wait))
+                count(retries=1)
+                with span(f"{platform} (deferred)"):
+                    status = self.check_url_exists(url, platform)
+            if status == 'rate_limited':
+                results['incomplete'] = True
+            self.record_status(results, platform, url, status, journal)
+        
         return results
     
+    def record_status(self, results, platform, url, status, journal=None):
+        """File one platform's result into the availability report (and the journal, if final)"""
+        results['platforms_checked'] += 1
+        if journal is not None and status in ('found', 'not_found'):
+            journal.record(platform, status)
+        
+        if status == 'found':
+            results['found_profiles'].append({
+                'platform': platform,
+                'url': url,
+                'status': 'Profile exists'
+            })
+            print(f"   ✓ {platform}: {url}")
+            emit('record_found', kind='profile', value=url, platform=platform)
+        elif status == 'not_found':
+            results['not_found'].append(platform)
+        elif status == 'error':
+            results['errors'].append(platform)
+        elif status == 'rate_limited':
+            results['rate_limited'].append(platform)
+    
     def check_url_exists(self, url: str, platform: str) -> str:
         """Check if URL exists and profile is active"""
         try:
-            response = self.session.get(url, timeout=10, allow_redirects=True)
+            response = self.session.get(url, timeout=stage_timeout(10), allow_redirects=True)
             
             # Platform-specific checks
             if platform == 'github':
@@ -129,12 +209,15 @@ class UsernameOSINT:
                 if response.status_code == 200:
                     return 'found'
             
-            if response.status_code == 429:
+            if response.status_code in THROTTLE_STATUSES:
                 return 'rate_limited'
             
             return 'not_found'
             
-        except requests.exceptions.Timeout:
+        except RateLimitDeferred:
+            # Another process has this host backed off; the caller retries later
+            return 'rate_limited'
+        except (requests.exceptions.Timeout, DeadlineExceeded):
             return 'error'
         except requests.exceptions.RequestException:
             return 'error'
@@ -207,7 +290,8 @@ class UsernameOSINT:
             'recommendation': 'Use unique, non-predictable usernames' if issues else 'Username appears secure'
         }
     
-    def generate_report(self, username: str) -> dict:
+    @instrumented('generate_report')
+    def generate_report(self, username: str, journal=None) -> dict:
         """Generate comprehensive username OSINT report"""
         print(f"\n{'='*60}")
         print(f"USERNAME OSINT REPORT")
@@ -217,16 +301,19 @@ class UsernameOSINT:
         print(f"{'='*60}")
         
         # Check availability
-        availability = self.check_username_availability(username)
+        with stage('availability_check'):
+            availability = self.check_username_availability(username, journal)
         
         # Analyze patterns
-        patterns = self.analyze_username_patterns(username)
+        with stage('pattern_analysis'):
+            patterns = self.analyze_username_patterns(username)
         
         report = {
             'target': username,
             'timestamp': datetime.now().isoformat(),
             'availability_check': availability,
-            'pattern_analysis': patterns
+            'pattern_analysis': patterns,
+            'incomplete': availability['incomplete']
         }
         
         self.display_username_report(report)
@@ -242,6 +329,8 @@ class UsernameOSINT:
         print(f"   Profiles Found: {len(availability['found_profiles'])}")
         print(f"   Not Found: {len(availability['not_found'])}")
         print(f"   Errors: {len(availability['errors'])}")
+        if availability.get('skipped'):
+            print(f"   ⏱️  Skipped (deadline): {len(availability['skipped'])}")
         
         if availability['found_profiles']:
             print(f"\n✅ FOUND PROFILES:")
@@ -261,22 +350,26 @@ def main():
     print("Username OSINT Tool")
     print("Educational and authorized use only!")
     
-    consent = input("\nDo you have permission to search for this username? (yes/no): ")
-    if consent.lower() != 'yes':
+    username = input("Enter username to search: ")
+    if not authorize("Username OSINT", username, "\nDo you have permission to search for this username? (yes/no): "):
         print("Exiting - proper authorization required")
         return
     
-    username = input("Enter username to search: ")
-    
     osint = UsernameOSINT()
-    report = osint.generate_report(username)
+    # python tools/username_osint.py --deadline 60 --job ID --perf
+    #   --record FILE | --replay FILE [--replay-timing exact]
+    enable_from_argv(sys.argv[1:])
+    cassette_from_argv(sys.argv[1:])
+    journal = open_journal(job_from_argv(sys.argv[1:]), "Username OSINT", username)
+    with deadline_scope(budget_from_argv(sys.argv[1:])):
+        report = osint.generate_report(username, journal)
+    print_flame(report)
     
-    # Save report
-    filename = f"username_report_{username}.json"
-    with open(filename, 'w') as f:
-        json.dump(report, f, indent=2, default=str)
+    # Save report; every run is kept, repeated lookups no longer overwrite each other
+    report_id = get_report_store().save_report("Username OSINT", username, report)
+    finish_journal(journal, report, report_id)
     
-    print(f"\nReport saved to {filename}")
+    print(f"\nReport saved as #{report_id} (python tools/report_store.py show {report_id})")
 
 if __name__ == "__main__":
     main()
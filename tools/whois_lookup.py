@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+WHOIS Lookups
+Domain and IP WHOIS for every tool, optionally answered by one configured server
+"""
+import ipaddress
+import os
+import socket
+import subprocess
+import sys
+
+import whois
+from whois.parser import WhoisEntry
+
+try:
+    from tools.cassette import exchange
+except ImportError:
+    from cassette import exchange
+
+# host[:port] that answers every WHOIS query instead of the registries
+# (a local WHOIS proxy, or the benchmark stand-in server)
+SERVER_ENV_VAR = 'OSINT_WHOIS_SERVER'
+WHOIS_PORT = 43
+QUERY_TIMEOUT = 10
+
+def configured_server():
+    """(host, port) from OSINT_WHOIS_SERVER, None when queries go to the registries"""
+    value = os.environ.get(SERVER_ENV_VAR)
+    if not value:
+        return None
+    host, sep, port = value.rpartition(':')
+    if sep and port.isdigit():
+        return host, int(port)
+    return value, WHOIS_PORT
+
+def query(server, text, timeout=QUERY_TIMEOUT) -> str:
+    """One RFC 3912 exchange: send the query line, read until the server closes"""
+    chunks = []
+    with socket.create_connection(server, timeout=timeout) as sock:
+        sock.sendall(text.encode('utf-8') + b'\r\n')
+        while True:
+            data = sock.recv(4096)
+            if not data:
+                break
+            chunks.append(data)
+    return b''.join(chunks).decode('utf-8', 'replace')
+
+def domain_whois(domain, timeout=QUERY_TIMEOUT):
+    """Parsed python-whois entry for a domain (a cassette keeps the raw text and reparses it)"""
+    return exchange('whois', domain, lambda: _domain_whois(domain, timeout),
+                    encode=lambda entry: entry.text, decode=lambda text: WhoisEntry.load(domain, text))
+
+def _domain_whois(domain, timeout):
+    server = configured_server()
+    if server is None:
+        return whois.whois(domain)
+    return WhoisEntry.load(domain, query(server, domain, timeout))
+
+def ip_whois(ip, timeout=QUERY_TIMEOUT):
+    """Raw WHOIS text for an IP address; None when the system whois command fails"""
+    return exchange('whois', ip, lambda: _ip_whois(ip, timeout))
+
+def _ip_whois(ip, timeout):
+    server = configured_server()
+    if server is not None:
+        return query(server, ip, timeout)
+    result = subprocess.run(['whois', ip], capture_output=True, text=True, timeout=timeout)
+    return result.stdout if result.returncode == 0 else None
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python tools/whois_lookup.py DOMAIN|IP")
+        sys.exit(1)
+    target = sys.argv[1]
+    server = configured_server()
+    if server is None:
+        print("Querying the registries (set OSINT_WHOIS_SERVER=host[:port] to use one server)")
+    try:
+        ipaddress.ip_address(target)
+    except ValueError:
+        print(domain_whois(target))
+    else:
+        print(ip_whois(target) or "❌ whois command failed")
+
+if __name__ == "__main__":
+    main()
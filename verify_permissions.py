@@ -4,22 +4,24 @@ Verify all permissions are working
 """
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Overall budget for the whole verification run (seconds)
+VERIFY_DEADLINE = 15
 
 def test_permission(name, command, args=[]):
+    """Run one probe; returns (working, status line)"""
     try:
         result = subprocess.run([command] + args, 
                               capture_output=True, 
                               text=True, 
                               timeout=5)
         if result.returncode == 0:
-            print(f"✅ {name}: Working")
-            return True
+            return True, f"✅ {name}: Working"
         else:
-            print(f"❌ {name}: Failed - {result.stderr.strip()}")
-            return False
+            return False, f"❌ {name}: Failed - {result.stderr.strip()}"
     except Exception as e:
-        print(f"❌ {name}: Error - {e}")
-        return False
+        return False, f"❌ {name}: Error - {e}"
 
 def main():
     print("🔐 Verifying Termux Permissions")
@@ -45,8 +47,22 @@ def main():
     working = 0
     total = len(permissions)
     
-    for perm in permissions:
-        if test_permission(*perm):
+    # Probe everything concurrently; report in the usual order
+    executor = ThreadPoolExecutor(max_workers=8)
+    futures = [executor.submit(test_permission, *perm) for perm in permissions]
+    wait(futures, timeout=VERIFY_DEADLINE)
+    # shutdown(cancel_futures=True) needs Python 3.9
+    for future in futures:
+        future.cancel()
+    executor.shutdown(wait=False)
+    
+    for perm, future in zip(permissions, futures):
+        if not future.done():
+            print(f"❌ {perm[0]}: Timed out")
+            continue
+        ok, line = future.result()
+        print(line)
+        if ok:
             working += 1
     
     print(f"\n📊 Results: {working}/{total} permissions working")